@@ -28,6 +28,8 @@ from .core.booleans import *
 from .core.modeling_tools import *
 from .core.simulation_tools import *
 from .core.modifiers import *
+from .core.viewport_lod import *
+from .core import mesh_analysis
 from .core.property_range_overrides import *
 from .core.rigging_tools import RyModel_PrepareRigifyForVRChat
 from .core.exporting_tools import RyModel_Export
@@ -62,6 +64,7 @@ classes = (
     RyModel_SelectNgons,
     RyModel_DrawShape,
     RyModel_FillNonManifold,
+    RyModel_DedupeMeshes,
     RyModel_DeformArrayAlongCurve,
     RyModel_ArrayAlongCurve,
     RyModel_DeleteCurveArray,
@@ -87,10 +90,14 @@ classes = (
     # Mirroring
     RyModel_DeleteVerticesPastAxis,
     RyModel_MirrorByFace,
+    RyModel_BakeMirror,
+    RyModel_SelectAsymmetricVertices,
+    RyModel_SymmetrizePositions,
 
     # Modifiers
     RyModel_AddBevelModifier,
     RyModel_AddWeightedNormalModifier,
+    RyModel_BakeWeightedNormals,
     RyModel_AddSolidifyModifier,
     RyModel_AddArrayModifier,
     RyModel_AddMultiResModifier,
@@ -98,6 +105,7 @@ classes = (
     RyModel_AddShrinkWrapModifier,
     RyModel_AddTriangulateModifier,
     RyModel_AddSmoothModifier,
+    RyModel_BakeSmoothing,
     RyModel_ApplyModifier,
     RyModel_DuplicateModifier,
     RyModel_MoveModifierToFirst,
@@ -175,6 +183,10 @@ def load_handler(dummy):
             hide_booleans()
         update_property_range_overrides()
 
+    # Restart viewport LOD swapping for files saved with viewport LODs turned on.
+    if bpy.context.scene.rymodel_viewport_lods:
+        start_viewport_lods()
+
 # Run startup functions when a new blend file is loaded.
 bpy.app.handlers.load_post.append(load_handler)
 
@@ -184,6 +196,15 @@ def register():
     # Import custom icons.
     custom_icons = load_custom_icons()
 
+    # Always render and save full detail meshes when viewport LODs are on.
+    bpy.app.handlers.render_pre.append(suspend_viewport_lods)
+    bpy.app.handlers.render_post.append(resume_viewport_lods)
+    bpy.app.handlers.render_cancel.append(resume_viewport_lods)
+    bpy.app.handlers.save_pre.append(restore_lods_before_saving)
+
+    # Track mesh geometry revisions so cached mesh measurements are invalidated when meshes are edited.
+    bpy.app.handlers.depsgraph_update_post.append(update_mesh_revisions)
+
     # Register classes.
     for cls in classes:
         bpy.utils.register_class(cls)
@@ -239,9 +260,30 @@ def register():
     bpy.types.Scene.retopology_snapping_toggle = BoolProperty(default=False, description="Toggles between ideal snapping settings for manual retopology in Blender and commonly used snapping settings for modeling. Toggles snapping, project individual elements, face snapping, and automerge", update=toggle_retopology_snapping)
 
     # General Settings
-    bpy.types.Scene.auto_sharpen_angle = FloatProperty(name="Auto Sharpen Angle", description="Angle in which to apply auto sharpening. Default = 30 degrees", default=0.523599, min=0, max=3.14159, unit='ROTATION')
+    bpy.types.Scene.auto_sharpen_angle = FloatProperty(name="Auto Sharpen Angle", description="Angle in which to apply auto sharpening. Default = 30 degrees", default=0.523599, min=0, max=3.14159, unit='ROTATION', update=update_auto_sharpen_angle)
+    bpy.types.Scene.rymodel_viewport_lods = BoolProperty(default=False, description="Swaps objects with generated LODs to lower detail LODs in the viewport based on their size on screen. Full detail meshes are always used for rendering, saving and exporting", update=update_viewport_lod_toggle)
+    bpy.types.Scene.rymodel_viewport_lod_threshold = FloatProperty(name="LOD Screen Size", description="Screen size (fraction of the half viewport height) below which LOD1 is displayed. Each further LOD is displayed at half the screen size of the previous one", default=0.25, min=0.001, max=1.0, update=update_viewport_lod_threshold)
+    bpy.types.Scene.auto_sharpen_live_preview = BoolProperty(default=False, description="When enabled, changing the auto sharpen angle immediately re-sharpens the active mesh (object mode only)")
 
 def unregister():
+    # Show full detail meshes again before the viewport LOD manager is removed.
+    restore_all_lods()
+    if bpy.app.timers.is_registered(update_viewport_lods):
+        bpy.app.timers.unregister(update_viewport_lods)
+    for handlers, handler in (
+        (bpy.app.handlers.render_pre, suspend_viewport_lods),
+        (bpy.app.handlers.render_post, resume_viewport_lods),
+        (bpy.app.handlers.render_cancel, resume_viewport_lods),
+        (bpy.app.handlers.save_pre, restore_lods_before_saving),
+        (bpy.app.handlers.depsgraph_update_post, update_mesh_revisions)
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
+
+    # Stop pending mesh health updates.
+    if bpy.app.timers.is_registered(mesh_analysis.update_pending_mesh_health):
+        bpy.app.timers.unregister(mesh_analysis.update_pending_mesh_health)
+
     # Remove custom icons.
     remove_custom_icons()
 
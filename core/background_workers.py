@@ -0,0 +1,66 @@
+# This module contains helpers for farming work out to background Blender processes, so heavy batch jobs (decimation, exporting) can run in parallel on multiple cores.
+
+import bpy
+import os
+import subprocess
+import tempfile
+import time
+from ..core import rylog
+
+WORKER_SCRIPTS_FOLDER = os.path.join(os.path.dirname(__file__), "workers")
+
+def get_worker_script_path(script_name):
+    '''Returns the absolute path of the provided worker script.'''
+    return os.path.join(WORKER_SCRIPTS_FOLDER, script_name)
+
+def get_worker_count(max_workers=0):
+    '''Returns the number of background workers to run at once. Uses all but one core when no maximum (0) is provided.'''
+    core_count = max((os.cpu_count() or 2) - 1, 1)
+    if max_workers > 0:
+        return min(max_workers, core_count)
+    return core_count
+
+def get_worker_command(script_path, script_arguments, blend_path=None):
+    '''Returns the command line which runs the provided worker script in a background Blender process, optionally opening the provided blend file first.'''
+    command = [bpy.app.binary_path, "--background", "--factory-startup"]
+    if blend_path:
+        command.append(blend_path)
+    # Exceptions raised by the worker script exit with an error code instead of Blender's default of 0, so failed jobs are never mistaken for finished ones.
+    return command + ["--python-exit-code", "1", "--python", script_path, "--"] + [str(argument) for argument in script_arguments]
+
+def create_job_folder():
+    '''Creates and returns a new temporary folder for exchanging data with background workers.'''
+    return tempfile.mkdtemp(prefix="rymodel_")
+
+def run_background_jobs(jobs, max_workers=0, poll_interval=0.05, blend_path=None):
+    '''Runs the provided jobs, each a (script path, script arguments) pair, in parallel background Blender processes which optionally open the provided blend file. Returns the exit code and error output of every job in the order provided.'''
+    worker_count = get_worker_count(max_workers)
+    exit_codes = [None] * len(jobs)
+    error_outputs = [""] * len(jobs)
+    pending_jobs = list(enumerate(jobs))
+    running_jobs = {}
+
+    while pending_jobs or running_jobs:
+        while pending_jobs and len(running_jobs) < worker_count:
+            job_index, (script_path, script_arguments) = pending_jobs.pop(0)
+
+            # Error output goes to a temporary file rather than a pipe, a pipe that isn't read while the worker runs blocks the worker once it fills up.
+            error_file = tempfile.TemporaryFile()
+            process = subprocess.Popen(get_worker_command(script_path, script_arguments, blend_path), stdout=subprocess.DEVNULL, stderr=error_file)
+            running_jobs[job_index] = (process, error_file)
+
+        for job_index, (process, error_file) in list(running_jobs.items()):
+            if process.poll() is None:
+                continue
+            exit_codes[job_index] = process.returncode
+            error_file.seek(0)
+            error_outputs[job_index] = error_file.read().decode(errors='replace').strip()
+            error_file.close()
+            if process.returncode != 0:
+                rylog.log("Background job {0} failed: {1}".format(job_index, error_outputs[job_index]))
+            del running_jobs[job_index]
+
+        if running_jobs:
+            time.sleep(poll_interval)
+
+    return exit_codes, error_outputs
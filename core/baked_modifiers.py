@@ -0,0 +1,254 @@
+# This module contains NumPy implementations of modifier effects (such as weighted normals) which are computed once and written directly to mesh data, replacing modifiers which would otherwise re-run on every evaluation.
+
+import bpy
+from collections import OrderedDict
+import math
+import numpy as np
+from ..core import internal_utils
+from ..core import mesh_analysis
+
+# Cached vertex group weights keyed by mesh pointer and vertex group index (least recently used first), each entry holds the mesh topology key the weights were read for.
+_vertex_group_mask_cache = OrderedDict()
+MAX_CACHED_VERTEX_GROUP_MASKS = 16
+
+# Smoothing methods available when baking smoothing.
+SMOOTHING_METHODS = [
+    ("LAPLACIAN", "Laplacian", "Moves vertices towards the average of their neighbours, which shrinks the mesh over many iterations"),
+    ("TAUBIN", "Taubin", "Alternates shrinking and inflating Laplacian passes, which smooths without shrinking the mesh")
+]
+
+# Face weighting modes, matching the modes of the weighted normal modifier.
+WEIGHTED_NORMAL_MODES = [
+    ("FACE_AREA", "Face Area", "Weights face normals by the area of each face"),
+    ("CORNER_ANGLE", "Corner Angle", "Weights face normals by the angle of each face corner"),
+    ("FACE_AREA_WITH_ANGLE", "Face Area & Angle", "Weights face normals by the area of each face multiplied by the angle of each face corner")
+]
+
+def get_corner_angles(positions, corner_verts, loop_starts, loop_totals):
+    '''Returns the angle of every face corner (between the edges to the previous and next corner of its face).'''
+    corner_faces = np.repeat(np.arange(len(loop_starts)), loop_totals)
+    corner_offsets = np.arange(len(corner_verts)) - loop_starts[corner_faces]
+    next_corners = loop_starts[corner_faces] + (corner_offsets + 1) % loop_totals[corner_faces]
+    previous_corners = loop_starts[corner_faces] + (corner_offsets - 1) % loop_totals[corner_faces]
+
+    corner_positions = positions[corner_verts]
+    to_next = positions[corner_verts[next_corners]] - corner_positions
+    to_previous = positions[corner_verts[previous_corners]] - corner_positions
+    lengths = np.linalg.norm(to_next, axis=1) * np.linalg.norm(to_previous, axis=1)
+    dots = np.einsum('ij,ij->i', to_next, to_previous) / np.maximum(lengths, 1e-12)
+    return np.where(lengths > 1e-12, np.arccos(np.clip(dots, -1.0, 1.0)), 0.0)
+
+def get_sharp_edge_mask(mesh):
+    '''Returns a mask of the edges in the provided mesh which split smooth shading (edges marked sharp, and edges above the auto smooth angle when auto smooth is on).'''
+    sharp_edges = np.zeros(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", sharp_edges)
+    if mesh.use_auto_smooth:
+        sharp_edges |= internal_utils.get_edge_dihedral_angles(mesh) > mesh.auto_smooth_angle
+    return sharp_edges
+
+def get_smooth_fans(mesh, corner_verts, corner_faces, smooth_faces, sharp_edges):
+    '''Groups the face corners of the provided mesh into smooth fans, corners around the same vertex which are connected through smooth faces and manifold edges that aren't sharp. Returns a fan label per corner and the number of fans.'''
+    manifold_edges, first_faces, second_faces = internal_utils.get_manifold_edge_faces(mesh)
+    smooth = ~sharp_edges[manifold_edges] & smooth_faces[first_faces] & smooth_faces[second_faces]
+    manifold_edges = manifold_edges[smooth]
+    first_faces = first_faces[smooth]
+    second_faces = second_faces[smooth]
+
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    edge_vertices = edge_vertices.reshape(-1, 2)
+
+    # Find the corner of a face at a vertex by searching sorted (face, vertex) keys.
+    vertex_count = len(mesh.vertices)
+    corner_keys = corner_faces.astype(np.int64) * vertex_count + corner_verts
+    corner_order = np.argsort(corner_keys, kind='stable')
+    sorted_keys = corner_keys[corner_order]
+
+    def get_face_corners(faces, vertices):
+        keys = faces.astype(np.int64) * vertex_count + vertices
+        return corner_order[np.searchsorted(sorted_keys, keys)]
+
+    # Both faces of a smooth edge share a fan at each of the edge's vertices.
+    first_corners = []
+    second_corners = []
+    for side in range(2):
+        vertices = edge_vertices[manifold_edges, side]
+        first_corners.append(get_face_corners(first_faces, vertices))
+        second_corners.append(get_face_corners(second_faces, vertices))
+
+    return mesh_analysis.label_connected_components(len(corner_verts), np.concatenate(first_corners), np.concatenate(second_corners))
+
+def get_weighted_corner_normals(mesh, mode='FACE_AREA_WITH_ANGLE'):
+    '''Returns weighted custom normals for every face corner of the provided mesh. Each corner normal is the average of the face normals in its smooth fan, weighted by face area and / or corner angle.'''
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3).astype(np.float64)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+
+    polygon_count = len(mesh.polygons)
+    loop_starts = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    face_normals = np.empty(polygon_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", face_normals)
+    face_normals = face_normals.reshape(-1, 3)
+    face_areas = np.empty(polygon_count, dtype=np.float32)
+    mesh.polygons.foreach_get("area", face_areas)
+    smooth_faces = np.empty(polygon_count, dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", smooth_faces)
+    corner_faces = np.repeat(np.arange(polygon_count, dtype=np.int32), loop_totals)
+
+    match mode:
+        case 'FACE_AREA':
+            weights = face_areas[corner_faces].astype(np.float64)
+        case 'CORNER_ANGLE':
+            weights = get_corner_angles(positions, corner_verts, loop_starts, loop_totals)
+        case _:
+            weights = face_areas[corner_faces] * get_corner_angles(positions, corner_verts, loop_starts, loop_totals)
+
+    fan_labels, fan_count = get_smooth_fans(mesh, corner_verts, corner_faces, smooth_faces, get_sharp_edge_mask(mesh))
+    fan_normals = np.zeros((fan_count, 3), dtype=np.float64)
+    np.add.at(fan_normals, fan_labels, face_normals[corner_faces] * weights[:, None])
+
+    # Fans with no weight (degenerate faces) fall back to their face normal.
+    lengths = np.linalg.norm(fan_normals, axis=1)
+    corner_normals = fan_normals[fan_labels] / np.maximum(lengths[fan_labels], 1e-12)[:, None]
+    degenerate = lengths[fan_labels] < 1e-12
+    corner_normals[degenerate] = face_normals[corner_faces[degenerate]]
+    return corner_normals
+
+def bake_weighted_normals(mesh, mode='FACE_AREA_WITH_ANGLE'):
+    '''Writes weighted custom normals to the provided mesh. Auto smooth is turned on (custom normals require it), without splitting by angle if it was off.'''
+    if len(mesh.polygons) == 0:
+        return False
+
+    if not mesh.use_auto_smooth:
+        mesh.use_auto_smooth = True
+        mesh.auto_smooth_angle = math.pi
+
+    corner_normals = get_weighted_corner_normals(mesh, mode)
+    mesh.normals_split_custom_set(corner_normals.astype(np.float32))
+    internal_utils.bump_mesh_revision(mesh)
+    return True
+
+def bake_weighted_normals_for_objects(objects, mode='FACE_AREA_WITH_ANGLE', remove_modifiers=True):
+    '''Bakes weighted custom normals for the meshes of all provided mesh objects, optionally removing weighted normal modifiers the baked normals replace. Returns the number of meshes baked.'''
+    baked_meshes = set()
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        if obj.data not in baked_meshes and bake_weighted_normals(obj.data, mode):
+            baked_meshes.add(obj.data)
+        if remove_modifiers:
+            for modifier in [modifier for modifier in obj.modifiers if modifier.type == 'WEIGHTED_NORMAL']:
+                obj.modifiers.remove(modifier)
+    return len(baked_meshes)
+
+def get_vertex_group_mask(obj, vertex_group_name):
+    '''Returns the weight of every vertex of the provided object in the vertex group with the provided name (0 for unweighted vertices), or None if the object has no such vertex group. Masks are cached per mesh revision, a copy is returned so callers can modify it.'''
+    vertex_group = obj.vertex_groups.get(vertex_group_name)
+    if not vertex_group:
+        return None
+
+    mesh = obj.data
+    cache_key = (mesh.as_pointer(), vertex_group.index)
+    topology_key = internal_utils.get_mesh_topology_key(mesh)
+    cached = _vertex_group_mask_cache.get(cache_key)
+    if cached and cached[0] == topology_key:
+        _vertex_group_mask_cache.move_to_end(cache_key)
+        return cached[1].copy()
+
+    # Vertex group weights aren't exposed as attributes or through foreach_get in Blender 4.0, so weights of the requested group are gathered per vertex and scattered into the mask.
+    group_index = vertex_group.index
+    group_weights = [(vertex.index, group_element.weight) for vertex in mesh.vertices for group_element in vertex.groups if group_element.group == group_index]
+    weights = np.zeros(len(mesh.vertices), dtype=np.float32)
+    if group_weights:
+        vertex_indices, vertex_weights = zip(*group_weights)
+        weights[np.array(vertex_indices, dtype=np.int32)] = vertex_weights
+
+    weights.flags.writeable = False
+    _vertex_group_mask_cache[cache_key] = (topology_key, weights)
+    while len(_vertex_group_mask_cache) > MAX_CACHED_VERTEX_GROUP_MASKS:
+        _vertex_group_mask_cache.popitem(last=False)
+    return weights.copy()
+
+def refresh_vertex_group_masks(mesh):
+    '''Keeps the cached vertex group masks of the provided mesh valid for its current revision. Called after edits which move vertices without changing their weights.'''
+    mesh_pointer = mesh.as_pointer()
+    topology_key = internal_utils.get_mesh_topology_key(mesh)
+    for cache_key, (cached_topology_key, weights) in _vertex_group_mask_cache.items():
+        if cache_key[0] == mesh_pointer and len(weights) == len(mesh.vertices):
+            _vertex_group_mask_cache[cache_key] = (topology_key, weights)
+
+def get_boundary_vertex_mask(mesh):
+    '''Returns a mask of the vertices of the provided mesh which lie on open boundaries (edges used by a single face).'''
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    boundary_edges = internal_utils.get_edge_face_counts(mesh) == 1
+    boundary_vertices = np.zeros(len(mesh.vertices), dtype=bool)
+    boundary_vertices[edge_vertices.reshape(-1, 2)[boundary_edges].ravel()] = True
+    return boundary_vertices
+
+def smooth_positions(positions, adjacency, vertex_weights, step_factors):
+    '''Moves the provided positions towards the average of their neighbours once per step factor (negative factors inflate), scaled per vertex by the provided weights. Neighbour averages are sparse matrix-vector products over the provided vertex to vertex CSR adjacency.'''
+    offsets, neighbours = adjacency
+    degrees = np.diff(offsets)
+    connected = degrees > 0
+
+    # Slicing (rather than masking) avoids copying positions every pass when all vertices have neighbours.
+    if connected.all():
+        connected = slice(None)
+    starts = offsets[:-1][connected]
+    neighbours = neighbours.astype(np.intp)
+    inverse_degrees = (1.0 / degrees[connected]).astype(np.float32)[:, None]
+    weights = vertex_weights[connected][:, None]
+
+    # Buffers are reused between iterations, since allocation dominates at high vertex counts.
+    neighbour_positions = np.empty((len(neighbours), 3), dtype=np.float32)
+    neighbour_sums = np.empty((len(starts), 3), dtype=np.float32)
+    for step_factor in step_factors:
+        np.take(positions, neighbours, axis=0, out=neighbour_positions)
+        np.add.reduceat(neighbour_positions, starts, axis=0, out=neighbour_sums)
+        neighbour_sums *= inverse_degrees
+        neighbour_sums -= positions[connected]
+        neighbour_sums *= weights * step_factor
+        positions[connected] += neighbour_sums
+    return positions
+
+def get_smoothing_step_factors(method, iterations, factor):
+    '''Returns the step factor of every smoothing pass. Taubin smoothing follows each shrinking pass with a slightly stronger inflating pass, so the mesh keeps its volume.'''
+    if method == 'TAUBIN':
+        inflate_factor = -factor / (1.0 - 0.1 * factor)
+        return [factor, inflate_factor] * iterations
+    return [factor] * iterations
+
+def bake_smoothing(obj, method='LAPLACIAN', iterations=10, factor=0.5, vertex_group_name="", pin_boundaries=True):
+    '''Smooths the vertex positions of the provided mesh object with Laplacian or Taubin smoothing, limited by a vertex group (if provided) and optionally pinning open boundaries. Returns false if there was nothing to smooth.'''
+    mesh = obj.data
+    if len(mesh.vertices) == 0 or len(mesh.edges) == 0:
+        return False
+
+    vertex_weights = np.ones(len(mesh.vertices), dtype=np.float32)
+    if vertex_group_name:
+        vertex_group_weights = get_vertex_group_mask(obj, vertex_group_name)
+        if vertex_group_weights is not None:
+            vertex_weights = vertex_group_weights
+    if pin_boundaries:
+        vertex_weights[get_boundary_vertex_mask(mesh)] = 0.0
+
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+
+    adjacency = internal_utils.get_mesh_adjacency(mesh, 'VERTEX_VERTICES')
+    smooth_positions(positions, adjacency, vertex_weights, get_smoothing_step_factors(method, iterations, factor))
+
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.update()
+    internal_utils.bump_mesh_revision(mesh)
+
+    # Smoothing only moves vertices, so vertex group masks stay valid for repeated bakes.
+    refresh_vertex_group_masks(mesh)
+    return True
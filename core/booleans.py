@@ -5,6 +5,7 @@ import bmesh
 from ..core import internal_utils
 from ..core import modifiers
 from ..core import rylog
+from ..core import transform_tools
 import numpy as np
 import math
 
@@ -143,7 +144,7 @@ def create_new_boolean_shape(shape):
 
     new_boolean_object = bpy.context.active_object                                  # The active object is the new boolean object.
     new_boolean_object.name = new_boolean_name
-    bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)       # Ensure scale is applied by default.
+    transform_tools.apply_object_transform(new_boolean_object)                     # Ensure scale is applied by default.
     return new_boolean_object
 
 def setup_new_boolean(new_boolean_object, active_object, boolean_modifiers, set_location=True):
@@ -230,7 +231,7 @@ def setup_plane_boolean(new_boolean_object):
     '''Applies settings and adjusts modes the be optimal for adjusting a plane boolean.'''
     # Rotate the new boolean object to match the viewport rotation.
     rotate_plane_boolean_to_view(new_boolean_object)
-    bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
+    transform_tools.apply_object_transform(new_boolean_object)
 
     # Select two vertices so users can instantly start extruding them to make a custom shape.
     bpy.ops.object.mode_set(mode='EDIT', toggle=False)
@@ -268,7 +269,7 @@ def add_new_boolean_shape(self, shape):
     bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
     
     # Apply scale before adding a new boolean object (otherwise booleans will be created with incorrect sizes).
-    bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
+    transform_tools.apply_transforms(bpy.context.selected_objects)
 
     active_object = bpy.context.active_object
     original_object_dimensions = [active_object.dimensions[0], active_object.dimensions[1], active_object.dimensions[2]]
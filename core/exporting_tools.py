@@ -1,140 +1,366 @@
 import bpy
 from bpy.types import Operator
+from bpy.props import BoolProperty
+import hashlib
+import json
+import numpy as np
 import os
+import shutil
 from .. import preferences
+from ..core import background_workers
 from ..core import modifiers
-from ..core import internal_utils
+from ..core import mesh_cleanup
 from ..core import rylog
+from ..core import viewport_lod
 
+EXPORT_WORKER_SCRIPT = "export_worker.py"
+EXPORT_MANIFEST_SUFFIX = "_export_manifest.json"
+EXPORT_MANIFEST_VERSION = 1
 
-def export_by_template(template_name, export_path, self):
-    '''Exports the provided object using settings defined for the provided template name'''
-    match template_name:
-        case 'FBX':
-            export_filepath = export_path + ".fbx"
-            bpy.ops.export_scene.fbx(
-                filepath=export_filepath,
-                check_existing=False, 
-                filter_glob='*.fbx', 
-                use_selection=True, 
-                use_visible=False, 
-                use_active_collection=False,
-                global_scale=1.0, 
-                apply_unit_scale=True, 
-                apply_scale_options='FBX_SCALE_NONE', 
-                use_space_transform=True, 
-                bake_space_transform=False, 
-                object_types={'ARMATURE', 'CAMERA', 'EMPTY', 'LIGHT', 'MESH', 'OTHER'}, 
-                use_mesh_modifiers=True, 
-                use_mesh_modifiers_render=True, 
-                mesh_smooth_type='OFF',
-                colors_type='SRGB', 
-                prioritize_active_color=False, 
-                use_subsurf=False, 
-                use_mesh_edges=False, 
-                use_tspace=False, 
-                use_triangles=False, 
-                use_custom_props=False, 
-                add_leaf_bones=True, 
-                primary_bone_axis='Y', 
-                secondary_bone_axis='X', 
-                use_armature_deform_only=False, 
-                armature_nodetype='NULL', 
-                bake_anim=True, 
-                bake_anim_use_all_bones=True, 
-                bake_anim_use_nla_strips=True, 
-                bake_anim_use_all_actions=True, 
-                bake_anim_force_startend_keying=True, 
-                bake_anim_step=1.0, bake_anim_simplify_factor=1.0, 
-                path_mode='AUTO', 
-                embed_textures=False,
-                batch_mode='OFF', 
-                use_batch_own_dir=True, 
-                use_metadata=True, 
-                axis_forward='-Z',
-                axis_up='Y'
-            )
-
-        case 'OBJ':
-            export_filepath = export_path + ".obj"
-            bpy.ops.export_scene.obj(
-                filepath=export_filepath, 
-                check_existing=False, 
-                filter_glob='*.obj;*.mtl', 
-                use_selection=False, 
-                use_animation=False, 
-                use_mesh_modifiers=True, 
-                use_edges=True, 
-                use_smooth_groups=False, 
-                use_smooth_groups_bitflags=False, 
-                use_normals=True, use_uvs=True, 
-                use_materials=True, use_triangles=False, 
-                use_nurbs=False, 
-                use_vertex_groups=False,
-                use_blen_objects=True, 
-                group_by_object=False, 
-                group_by_material=False, 
-                keep_vertex_order=False, 
-                global_scale=1.0, 
-                path_mode='AUTO', 
-                axis_forward='-Z', 
-                axis_up='Y'
-            )
-
-        case 'UNITY_FBX':
-            export_filepath = export_path + ".fbx"
-            bpy.ops.export_scene.fbx(
-                filepath=export_filepath, 
-                check_existing=False, 
-                filter_glob='*.fbx', 
-                use_selection=True, 
-                use_visible=False, 
-                use_active_collection=False, 
-                global_scale=1.0, 
-                apply_unit_scale=True, 
-                apply_scale_options='FBX_SCALE_NONE', 
-                use_space_transform=True, 
-                bake_space_transform=False, 
-                object_types={'ARMATURE', 'CAMERA', 'EMPTY', 'LIGHT', 'MESH', 'OTHER'}, 
-                use_mesh_modifiers=True, 
-                use_mesh_modifiers_render=True, 
-                mesh_smooth_type='FACE', 
-                colors_type='SRGB', 
-                prioritize_active_color=False, 
-                use_subsurf=False, 
-                use_mesh_edges=False, 
-                use_tspace=False, 
-                use_triangles=False, 
-                use_custom_props=False, 
-                add_leaf_bones=True, 
-                primary_bone_axis='Y', 
-                secondary_bone_axis='X', 
-                use_armature_deform_only=False, 
-                armature_nodetype='NULL', 
-                bake_anim=True, 
-                bake_anim_use_all_bones=True, 
-                bake_anim_use_nla_strips=True, 
-                bake_anim_use_all_actions=True, 
-                bake_anim_force_startend_keying=True, 
-                bake_anim_step=1.0, bake_anim_simplify_factor=1.0, 
-                path_mode='AUTO', 
-                embed_textures=False, 
-                batch_mode='OFF', 
-                use_batch_own_dir=True, 
-                use_metadata=True, 
-                axis_forward='X',
-                axis_up='Y'
-            )
-
-    rylog.log_status("Exported selected objects to: {0}".format(export_filepath), self, 'INFO')
+# Object types whose evaluated geometry can be read as a mesh for export fingerprints.
+MESH_CONVERTIBLE_TYPES = {'MESH', 'CURVE', 'SURFACE', 'FONT', 'META'}
+
+# Exporter, file extension and exporter settings used by each export template.
+EXPORT_TEMPLATES = {
+    'FBX': {
+        'exporter': 'fbx',
+        'extension': '.fbx',
+        'settings': {
+            'check_existing': False,
+            'filter_glob': '*.fbx',
+            'use_selection': True,
+            'use_visible': False,
+            'use_active_collection': False,
+            'global_scale': 1.0,
+            'apply_unit_scale': True,
+            'apply_scale_options': 'FBX_SCALE_NONE',
+            'use_space_transform': True,
+            'bake_space_transform': False,
+            'object_types': {'ARMATURE', 'CAMERA', 'EMPTY', 'LIGHT', 'MESH', 'OTHER'},
+            'use_mesh_modifiers': True,
+            'use_mesh_modifiers_render': True,
+            'mesh_smooth_type': 'OFF',
+            'colors_type': 'SRGB',
+            'prioritize_active_color': False,
+            'use_subsurf': False,
+            'use_mesh_edges': False,
+            'use_tspace': False,
+            'use_triangles': False,
+            'use_custom_props': False,
+            'add_leaf_bones': True,
+            'primary_bone_axis': 'Y',
+            'secondary_bone_axis': 'X',
+            'use_armature_deform_only': False,
+            'armature_nodetype': 'NULL',
+            'bake_anim': True,
+            'bake_anim_use_all_bones': True,
+            'bake_anim_use_nla_strips': True,
+            'bake_anim_use_all_actions': True,
+            'bake_anim_force_startend_keying': True,
+            'bake_anim_step': 1.0,
+            'bake_anim_simplify_factor': 1.0,
+            'path_mode': 'AUTO',
+            'embed_textures': False,
+            'batch_mode': 'OFF',
+            'use_batch_own_dir': True,
+            'use_metadata': True,
+            'axis_forward': '-Z',
+            'axis_up': 'Y'
+        }
+    },
+    'OBJ': {
+        'exporter': 'obj',
+        'extension': '.obj',
+        'settings': {
+            'check_existing': False,
+            'filter_glob': '*.obj;*.mtl',
+            'use_selection': True,
+            'use_animation': False,
+            'use_mesh_modifiers': True,
+            'use_edges': True,
+            'use_smooth_groups': False,
+            'use_smooth_groups_bitflags': False,
+            'use_normals': True,
+            'use_uvs': True,
+            'use_materials': True,
+            'use_triangles': False,
+            'use_nurbs': False,
+            'use_vertex_groups': False,
+            'use_blen_objects': True,
+            'group_by_object': False,
+            'group_by_material': False,
+            'keep_vertex_order': False,
+            'global_scale': 1.0,
+            'path_mode': 'AUTO',
+            'axis_forward': '-Z',
+            'axis_up': 'Y'
+        }
+    },
+    'UNITY_FBX': {
+        'exporter': 'fbx',
+        'extension': '.fbx',
+        'settings': {
+            'check_existing': False,
+            'filter_glob': '*.fbx',
+            'use_selection': True,
+            'use_visible': False,
+            'use_active_collection': False,
+            'global_scale': 1.0,
+            'apply_unit_scale': True,
+            'apply_scale_options': 'FBX_SCALE_NONE',
+            'use_space_transform': True,
+            'bake_space_transform': False,
+            'object_types': {'ARMATURE', 'CAMERA', 'EMPTY', 'LIGHT', 'MESH', 'OTHER'},
+            'use_mesh_modifiers': True,
+            'use_mesh_modifiers_render': True,
+            'mesh_smooth_type': 'FACE',
+            'colors_type': 'SRGB',
+            'prioritize_active_color': False,
+            'use_subsurf': False,
+            'use_mesh_edges': False,
+            'use_tspace': False,
+            'use_triangles': False,
+            'use_custom_props': False,
+            'add_leaf_bones': True,
+            'primary_bone_axis': 'Y',
+            'secondary_bone_axis': 'X',
+            'use_armature_deform_only': False,
+            'armature_nodetype': 'NULL',
+            'bake_anim': True,
+            'bake_anim_use_all_bones': True,
+            'bake_anim_use_nla_strips': True,
+            'bake_anim_use_all_actions': True,
+            'bake_anim_force_startend_keying': True,
+            'bake_anim_step': 1.0,
+            'bake_anim_simplify_factor': 1.0,
+            'path_mode': 'AUTO',
+            'embed_textures': False,
+            'batch_mode': 'OFF',
+            'use_batch_own_dir': True,
+            'use_metadata': True,
+            'axis_forward': 'X',
+            'axis_up': 'Y'
+        }
+    }
+}
+
+def export_by_template(template_name, export_path, self, objects=None):
+    '''Exports the provided object using settings defined for the provided template name. When objects are provided, they're exported through a context override instead of the selection, so the user's selection and active object are never changed.'''
+    export_template = EXPORT_TEMPLATES[template_name]
+    export_filepath = export_path + export_template['extension']
+    exporter = getattr(bpy.ops.export_scene, export_template['exporter'])
+    if objects is None:
+        exporter(filepath=export_filepath, **export_template['settings'])
+    else:
+        active_object = bpy.context.active_object if bpy.context.active_object in objects else objects[0]
+        with bpy.context.temp_override(selected_objects=objects, selected_editable_objects=objects, active_object=active_object, object=active_object):
+            exporter(filepath=export_filepath, **export_template['settings'])
+
+    if self:
+        rylog.log_status("Exported selected objects to: {0}".format(export_filepath), self, 'INFO')
+    else:
+        rylog.log("Exported selected objects to: {0}".format(export_filepath))
+    return export_filepath
+
+def replace_obj_material_library(obj_path, temporary_name, export_name):
+    '''Points the material library reference of the provided OBJ file from its temporary material library name to its final name.'''
+    rewritten_path = obj_path + ".rewrite"
+    with open(obj_path, 'r', encoding='utf-8', errors='surrogateescape') as obj_file, open(rewritten_path, 'w', encoding='utf-8', errors='surrogateescape') as rewritten_file:
+        for line in obj_file:
+            if line.startswith("mtllib "):
+                line = line.replace(temporary_name + ".mtl", export_name + ".mtl")
+            rewritten_file.write(line)
+    os.replace(rewritten_path, obj_path)
+
+def export_atomically(template_name, export_path, self, objects=None):
+    '''Exports using the provided template to temporary file names in the export directory, then moves the exported files into place with renames, so existing exports are never left partially written. Returns the exported file path.'''
+    directory, export_name = os.path.split(export_path)
+    extension = EXPORT_TEMPLATES[template_name]['extension']
+
+    # Temporary files are written to the export directory itself, so relative texture paths resolve the same as they do for the final files.
+    temporary_name = ".{0}.rymodel_tmp".format(export_name)
+    temporary_prefix = os.path.join(directory, temporary_name)
+    try:
+        export_by_template(template_name, temporary_prefix, None, objects)
+
+        # Files written alongside the export (e.g. material libraries) are moved first, so the export never references a missing file.
+        for filename in os.listdir(directory):
+            if filename.startswith(temporary_name + ".") and filename != temporary_name + extension:
+                os.replace(os.path.join(directory, filename), os.path.join(directory, export_name + filename[len(temporary_name):]))
+        if extension == '.obj':
+            replace_obj_material_library(temporary_prefix + extension, temporary_name, export_name)
+        os.replace(temporary_prefix + extension, export_path + extension)
+    finally:
+        for filename in os.listdir(directory):
+            if filename.startswith(temporary_name + "."):
+                os.remove(os.path.join(directory, filename))
+
+    export_filepath = export_path + extension
+    if self:
+        rylog.log_status("Exported selected objects to: {0}".format(export_filepath), self, 'INFO')
+    return export_filepath
+
+def get_export_manifest_path():
+    '''Returns the path of the export manifest of the open blend file, which is saved next to it.'''
+    return os.path.splitext(bpy.data.filepath)[0] + EXPORT_MANIFEST_SUFFIX
+
+def load_export_manifest(manifest_path):
+    '''Returns the export fingerprint of every output file recorded in the provided export manifest, keyed by file name. Returns an empty manifest if the file doesn't exist or can't be read.'''
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError) as error:
+        rylog.log("Ignoring unreadable export manifest {0}: {1}".format(manifest_path, error))
+        return {}
+    if manifest.get('version') != EXPORT_MANIFEST_VERSION:
+        return {}
+    return manifest.get('outputs', {})
+
+def save_export_manifest(manifest_path, outputs):
+    '''Writes the provided output fingerprints to the export manifest, replacing the previous manifest with a rename.'''
+    temporary_path = manifest_path + ".tmp"
+    with open(temporary_path, 'w') as manifest_file:
+        json.dump({'version': EXPORT_MANIFEST_VERSION, 'outputs': outputs}, manifest_file, indent=4, sort_keys=True)
+    os.replace(temporary_path, manifest_path)
+
+def has_animation(id_data):
+    '''Returns true if the provided data-block is driven by an action, NLA tracks or drivers.'''
+    animation_data = getattr(id_data, "animation_data", None)
+    if not animation_data:
+        return False
+    return bool(animation_data.action or len(animation_data.nla_tracks) or len(animation_data.drivers))
+
+def can_fingerprint_object(obj):
+    '''Returns true if everything exported for the provided object is covered by its export fingerprint. Animated and skinned objects export data (actions, poses, vertex weights) which isn't fingerprinted, so they're always exported.'''
+    if obj.type == 'ARMATURE' or (obj.parent and obj.parent.type == 'ARMATURE'):
+        return False
+    if any(modifier.type == 'ARMATURE' for modifier in obj.modifiers):
+        return False
+    shape_keys = getattr(obj.data, "shape_keys", None)
+    return not any(has_animation(id_data) for id_data in (obj, obj.data, shape_keys) if id_data)
+
+def get_material_fingerprint(material):
+    '''Returns the exported settings of the provided material: its base settings and the type, image and input values of every node.'''
+    if not material:
+        return None
+    material_fingerprint = [material.name, list(material.diffuse_color), material.metallic, material.roughness]
+    if material.node_tree:
+        for node in sorted(material.node_tree.nodes, key=lambda node: node.name):
+            image = getattr(node, "image", None)
+            input_values = []
+            for node_input in node.inputs:
+                value = getattr(node_input, "default_value", None)
+                input_values.append([node_input.identifier, list(value) if hasattr(value, "__len__") else value, node_input.is_linked])
+            material_fingerprint.append([node.name, node.bl_idname, image.filepath if image else "", input_values])
+        material_fingerprint.append(sorted([link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier] for link in material.node_tree.links))
+    return material_fingerprint
+
+def update_export_fingerprint(fingerprint, obj, depsgraph):
+    '''Adds the exported content of the provided object (name, type, world transform, material contents, modifier settings, shape keys and evaluated geometry arrays) to the provided fingerprint hash.'''
+    object_header = [
+        obj.name,
+        obj.type,
+        obj.parent.name if obj.parent else "",
+        [list(row) for row in obj.matrix_world],
+        [get_material_fingerprint(material_slot.material) for material_slot in obj.material_slots],
+
+        # Geometry is fingerprinted from the viewport evaluation, while exporters may apply render modifier settings, so modifier settings are fingerprinted as well.
+        modifiers.get_modifier_stack_key(obj.modifiers)
+    ]
+    fingerprint.update(json.dumps(object_header, default=str).encode())
+
+    # Shape keys are exported separately from the evaluated geometry.
+    shape_keys = getattr(obj.data, "shape_keys", None)
+    if shape_keys:
+        for key_block in shape_keys.key_blocks:
+            fingerprint.update(json.dumps([key_block.name, key_block.value, key_block.relative_key.name, key_block.vertex_group, key_block.mute]).encode())
+            key_positions = np.empty(len(key_block.data) * 3, dtype=np.float32)
+            key_block.data.foreach_get("co", key_positions)
+            fingerprint.update(key_positions.tobytes())
+
+    if obj.type not in MESH_CONVERTIBLE_TYPES:
+        return
+    evaluated_object = obj.evaluated_get(depsgraph)
+    evaluated_mesh = evaluated_object.to_mesh()
+    if evaluated_mesh:
+        for array in mesh_cleanup.get_mesh_arrays(evaluated_mesh):
+            fingerprint.update(array.tobytes())
+    evaluated_object.to_mesh_clear()
+
+def get_export_fingerprint(objects, template_name, depsgraph):
+    '''Returns a fingerprint of everything exported to one file: the provided objects, the export template and its exporter settings. Returns None if any object exports data the fingerprint doesn't cover.'''
+    if not all(can_fingerprint_object(obj) for obj in objects):
+        return None
+    fingerprint = hashlib.sha1()
+    fingerprint.update(json.dumps([template_name, EXPORT_TEMPLATES[template_name]], sort_keys=True, default=sorted).encode())
+    for obj in sorted(objects, key=lambda obj: obj.name):
+        update_export_fingerprint(fingerprint, obj, depsgraph)
+    return fingerprint.hexdigest()
+
+def get_export_source_blend(job_folder):
+    '''Returns the path of a blend file holding the current state of the open file for background workers to export from. The saved file is reused when it has no unsaved changes, otherwise a copy is written to the provided job folder.'''
+    if bpy.data.filepath and not bpy.data.is_dirty:
+        return bpy.data.filepath
+    source_path = os.path.join(job_folder, "export_source.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=source_path, check_existing=False, copy=True)
+    return source_path
+
+def export_objects_in_parallel(objects, template_name, directory, max_workers=0):
+    '''Exports each provided object to its own file using background Blender processes, each exporting a share of the objects. Returns the exported file path of every exported object and the error of every object that failed, keyed by object name.'''
+    job_folder = background_workers.create_job_folder()
+    addon_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    worker_script = background_workers.get_worker_script_path(EXPORT_WORKER_SCRIPT)
+    object_names = [obj.name for obj in objects]
+
+    try:
+        source_path = get_export_source_blend(job_folder)
+
+        # Objects are dealt out to workers in turn, so large and small objects are spread evenly.
+        worker_count = min(background_workers.get_worker_count(max_workers), len(object_names))
+        jobs = []
+        report_paths = []
+        for worker_index in range(worker_count):
+            objects_path = os.path.join(job_folder, "objects_{0}.json".format(worker_index))
+            report_path = os.path.join(job_folder, "report_{0}.json".format(worker_index))
+            with open(objects_path, 'w') as objects_file:
+                json.dump(object_names[worker_index::worker_count], objects_file)
+            jobs.append((worker_script, [addon_folder, template_name, directory, objects_path, report_path]))
+            report_paths.append(report_path)
+
+        exit_codes, error_outputs = background_workers.run_background_jobs(jobs, max_workers, blend_path=source_path)
+
+        exported = {}
+        errors = {}
+        for worker_index, (report_path, exit_code, error_output) in enumerate(zip(report_paths, exit_codes, error_outputs)):
+            if not os.path.exists(report_path):
+                rylog.log("Export worker {0} exited with code {1} without a report: {2}".format(worker_index, exit_code, error_output))
+                for object_name in object_names[worker_index::worker_count]:
+                    errors[object_name] = "Export worker exited with code {0}: {1}".format(exit_code, error_output.splitlines()[-1] if error_output else "no error output")
+                continue
+
+            with open(report_path, 'r') as report_file:
+                report = json.load(report_file)
+            for object_name, result in report.items():
+                if result['error']:
+                    errors[object_name] = result['error']
+                else:
+                    exported[object_name] = result['filepath']
+    finally:
+        shutil.rmtree(job_folder, ignore_errors=True)
+
+    return exported, errors
 
 
 class RyModel_Export(Operator):
     bl_idname = "rymodel.export"
     bl_label = "Export"
-    bl_description = "Automatically exports selected objects to a path next to the open blend file. This operator requries the blend file to be saved"
+    bl_description = "Automatically exports selected objects to a path next to the open blend file. Files whose exported content didn't change since the last export are skipped. This operator requries the blend file to be saved"
     bl_options = {'REGISTER', 'UNDO'}
 
+    force: BoolProperty(name="Force", default=False, description="Re-exports all files, including files whose exported content didn't change since the last export")
+
     def execute(self, context):
         # Export based on the selected export template.
         addon_preferences = bpy.context.preferences.addons[preferences.ADDON_NAME].preferences
@@ -149,24 +375,64 @@ class RyModel_Export(Operator):
             return {'FINISHED'}
         directory = os.path.dirname(open_blend_path)
 
+        # Always export full detail meshes, viewport LODs are swapped back in on the next viewport update.
+        viewport_lod.restore_all_lods()
+
         # Apply a triangulate modifier to the object being exported, if one does not exist already.
         selected_objects = bpy.context.selected_objects
         for obj in selected_objects:
             modifiers.get_modifier_of_type(obj.modifiers, '')
 
-        # Export all selected objects as individual files (use the name of each object as the filename).
-        addon_preferences = bpy.context.preferences.addons[preferences.ADDON_NAME].preferences
+        # Export all selected objects as individual files (use the name of each object as the filename), or as a single file (use the name of the active object as the filename).
+        template_name = addon_preferences.export_template
         if addon_preferences.export_selected_objects_individually:
-            
-            # Select 1 object at a time for export as individual files.
-            for obj in selected_objects:
-                internal_utils.select_only(obj)
-                export_path = os.path.join(directory, obj.name)
-                export_by_template(addon_preferences.export_template, export_path, self)
-            
-        # Export all selected objects as a single file (use the name of the active object as the filename).
+            outputs = [(obj.name, [obj]) for obj in selected_objects]
         else:
-            export_path = os.path.join(directory, active_object.name)
-            export_by_template(addon_preferences.export_template, export_path, self)
+            outputs = [(active_object.name, selected_objects)]
+
+        # Skip outputs whose fingerprint matches the one recorded in the export manifest when they were last exported.
+        manifest_path = get_export_manifest_path()
+        manifest = load_export_manifest(manifest_path)
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        extension = EXPORT_TEMPLATES[template_name]['extension']
+        pending_outputs = []
+        skipped_count = 0
+        for output_name, output_objects in outputs:
+            filename = output_name + extension
+            fingerprint = get_export_fingerprint(output_objects, template_name, depsgraph)
+            if not self.force and fingerprint and manifest.get(filename) == fingerprint and os.path.exists(os.path.join(directory, filename)):
+                skipped_count += 1
+                continue
+            pending_outputs.append((output_name, output_objects, fingerprint))
+
+        exported = {}
+        errors = {}
+
+        # Split objects between background Blender processes which export in parallel.
+        if addon_preferences.export_selected_objects_individually and addon_preferences.export_in_parallel and len(pending_outputs) > 1:
+            exported, errors = export_objects_in_parallel([output_objects[0] for _, output_objects, _ in pending_outputs], template_name, directory, addon_preferences.export_workers)
 
-        return {'FINISHED'}
\ No newline at end of file
+        else:
+            # Objects are passed to the exporter explicitly, so the selection, active object and mode are left exactly as they are.
+            for output_name, output_objects, fingerprint in pending_outputs:
+                try:
+                    exported[output_name] = export_atomically(template_name, os.path.join(directory, output_name), None, output_objects)
+                except Exception as error:
+                    errors[output_name] = str(error)
+
+        for output_name, output_objects, fingerprint in pending_outputs:
+            filename = output_name + extension
+            if output_name in exported and fingerprint:
+                manifest[filename] = fingerprint
+            else:
+                manifest.pop(filename, None)
+        save_export_manifest(manifest_path, manifest)
+
+        for output_name, error in errors.items():
+            rylog.log("Failed to export {0}: {1}".format(output_name, error))
+        message = "Exported {0} file(s), skipped {1} unchanged, {2} failed".format(len(exported), skipped_count, len(errors))
+        if errors:
+            rylog.log_status(message + " (see console for details).", self, 'WARNING')
+        else:
+            rylog.log_status(message + " in: {0}".format(directory), self, 'INFO')
+        return {'FINISHED'}
@@ -1,9 +1,49 @@
 # This module contains misc utility functions (used for in-code use only, as opposed to utility operators available in the add-on user interface) for this add-on.
 
 import bpy
+from bpy.app.handlers import persistent
+from collections import OrderedDict
 import mathutils
+import numpy as np
+import zlib
 from ..core import modifiers
 from ..core import rylog
+from .. import preferences
+
+# Foreach property name, number of components and buffer type used to read and write each attribute data type.
+ATTRIBUTE_ARRAY_FORMATS = {
+    'FLOAT': ('value', 1, np.float32),
+    'INT': ('value', 1, np.int32),
+    'INT8': ('value', 1, np.int32),
+    'BOOLEAN': ('value', 1, bool),
+    'FLOAT2': ('vector', 2, np.float32),
+    'INT32_2D': ('value', 2, np.int32),
+    'FLOAT_VECTOR': ('vector', 3, np.float32),
+    'QUATERNION': ('value', 4, np.float32),
+    'FLOAT_COLOR': ('color', 4, np.float32),
+    'BYTE_COLOR': ('color', 4, np.float32)
+}
+
+# Per-edge dihedral angles for the most recently measured mesh, keyed by the mesh fingerprint they were computed for.
+_dihedral_angle_cache = {'fingerprint': None, 'angles': None}
+
+# Compressed sparse row adjacency arrays keyed by mesh pointer and adjacency type, least recently used first. Entries store the topology key they were built for.
+_adjacency_cache = OrderedDict()
+_adjacency_cache_state = {'bytes': 0}
+MAX_ADJACENCY_CACHE_BYTES = 128 * 1024 * 1024
+
+# Adjacency types available through get_mesh_adjacency, named source element to neighbouring elements.
+ADJACENCY_TYPES = ('EDGE_FACES', 'FACE_EDGES', 'VERTEX_EDGES', 'VERTEX_FACES', 'VERTEX_VERTICES')
+
+# Geometry revision per mesh pointer, bumped by a depsgraph handler whenever a mesh's geometry is updated.
+_mesh_revisions = {}
+
+# Meshes whose revision was already bumped by add-on code since the last depsgraph update, so the depsgraph update reporting the same edit doesn't bump it again.
+_pending_revision_bumps = set()
+
+# Local space mesh centers keyed by mesh pointer, revision, element counts and center type.
+_mesh_center_cache = {}
+MAX_CACHED_CENTERS = 256
 
 def verify_active_mesh(self=None):
     '''Verifies the active (selected) object exists an is a mesh.'''
@@ -23,13 +63,102 @@ def verify_active_mesh(self=None):
         return False
     return True
 
-def get_object_true_center(obj):
-    '''Returns the center point of the object accounting for applied mirror modifiers.'''
+def increment_mesh_revision(mesh_pointer):
+    '''Increments the geometry revision of the mesh with the provided pointer.'''
+    _mesh_revisions[mesh_pointer] = _mesh_revisions.get(mesh_pointer, 0) + 1
+
+def bump_mesh_revision(mesh):
+    '''Marks the geometry of the provided mesh as changed, invalidating values cached for its previous revision.'''
+    mesh_pointer = mesh.original.as_pointer()
+    increment_mesh_revision(mesh_pointer)
+    _pending_revision_bumps.add(mesh_pointer)
+
+def get_mesh_revision(mesh):
+    '''Returns the geometry revision of the provided mesh, which increases every time its geometry is updated.'''
+    return _mesh_revisions.get(mesh.original.as_pointer(), 0)
+
+@persistent
+def update_mesh_revisions(scene, depsgraph):
+    '''Bumps the revision of all meshes with geometry updates in the provided depsgraph. Meshes already bumped by the add-on code which edited them are only bumped once.'''
+    updated_meshes = set()
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        data = update.id
+        if isinstance(data, bpy.types.Object):
+            data = data.data
+        if isinstance(data, bpy.types.Mesh):
+            updated_meshes.add(data.original.as_pointer())
+
+    for mesh_pointer in updated_meshes:
+        if mesh_pointer in _pending_revision_bumps:
+            continue
+        increment_mesh_revision(mesh_pointer)
+    _pending_revision_bumps.clear()
+
+def get_vertex_average_center(mesh):
+    '''Returns the local space average of all vertex positions in the provided mesh.'''
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    return positions.reshape(-1, 3).mean(axis=0, dtype=np.float64)
+
+def get_volume_center(mesh):
+    '''Returns the local space centroid of the volume enclosed by the provided mesh, or None if the mesh encloses no volume.'''
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3).astype(np.float64)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+
+    # Fan triangulate every face from its first corner, each triangle forms a signed tetrahedron with the local origin.
+    fan_counts = np.maximum(loop_totals - 2, 0)
+    fan_starts = np.repeat(loop_starts, fan_counts)
+    fan_offsets = np.arange(fan_counts.sum()) - np.repeat(np.cumsum(fan_counts) - fan_counts, fan_counts)
+    a = positions[corner_verts[fan_starts]]
+    b = positions[corner_verts[fan_starts + fan_offsets + 1]]
+    c = positions[corner_verts[fan_starts + fan_offsets + 2]]
+    volumes = np.einsum('ij,ij->i', a, np.cross(b, c)) / 6.0
+
+    total_volume = volumes.sum()
+    if abs(total_volume) < 1e-12:
+        return None
+    return (volumes[:, np.newaxis] * (a + b + c)).sum(axis=0) / (4.0 * total_volume)
 
-    # Get the center of the object based on the average of vertices.
-    x, y, z = [ sum( [v.co[i] for v in obj.data.vertices] ) for i in range(3)]
-    count = float(len(obj.data.vertices))
-    center = obj.matrix_world @ (mathutils.Vector( (x, y, z ) ) / count)
+def get_mesh_center(mesh, use_volume=False):
+    '''Returns the local space center of the provided mesh, either the vertex average or the volume centroid. Centers are cached per mesh revision.'''
+    cache_key = (mesh.original.as_pointer(), get_mesh_revision(mesh), len(mesh.vertices), len(mesh.polygons), use_volume)
+    cached_center = _mesh_center_cache.get(cache_key)
+    if cached_center is not None:
+        return cached_center
+
+    center = None
+    if use_volume:
+        center = get_volume_center(mesh)
+
+    # Open or flat meshes enclose no volume, fall back to the vertex average for them.
+    if center is None:
+        center = get_vertex_average_center(mesh)
+
+    center = mathutils.Vector(center)
+    if len(_mesh_center_cache) >= MAX_CACHED_CENTERS:
+        _mesh_center_cache.clear()
+    _mesh_center_cache[cache_key] = center
+    return center
+
+def get_object_true_center(obj, use_volume=None):
+    '''Returns the center point of the object accounting for applied mirror modifiers. Uses the add-on preference to pick between the vertex average and the volume centroid unless specified.'''
+    if len(obj.data.vertices) == 0:
+        return obj.matrix_world.translation.copy()
+
+    if use_volume is None:
+        addon_preferences = bpy.context.preferences.addons[preferences.ADDON_NAME].preferences
+        use_volume = addon_preferences.use_volume_center
+
+    center = obj.matrix_world @ get_mesh_center(obj.data, use_volume)
 
     # Center axis values for mirror modifiers
     mirror_modifier = modifiers.get_modifier_of_type(obj.modifiers, 'MIRROR')
@@ -42,6 +171,255 @@ def get_object_true_center(obj):
             center[2] = 0
     return center
 
+def get_mesh_fingerprint(mesh, include_topology=True, include_positions=True):
+    '''Returns a key that changes whenever the element counts, and optionally the topology or vertex positions, of the provided mesh change.'''
+    fingerprint = [
+        mesh.as_pointer(),
+        len(mesh.vertices),
+        len(mesh.edges),
+        len(mesh.loops),
+        len(mesh.polygons)
+    ]
+
+    if include_topology:
+        corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+        corner_edges = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", corner_verts)
+        mesh.loops.foreach_get("edge_index", corner_edges)
+        fingerprint.append(zlib.crc32(corner_verts))
+        fingerprint.append(zlib.crc32(corner_edges))
+
+    if include_positions:
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+        fingerprint.append(zlib.crc32(positions))
+
+    return tuple(fingerprint)
+
+def build_csr_adjacency(element_count, elements, neighbours):
+    '''Builds compressed sparse row adjacency from pairs of element and neighbour indices. Returns int32 offsets (one more than the element count) and indices arrays, where the neighbours of element i are indices[offsets[i]:offsets[i + 1]] in the order they were provided.'''
+    offsets = np.zeros(element_count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(elements, minlength=element_count), out=offsets[1:])
+    order = np.argsort(elements, kind='stable')
+    return offsets, np.ascontiguousarray(np.asarray(neighbours)[order], dtype=np.int32)
+
+def get_mesh_topology_key(mesh):
+    '''Returns a key that changes whenever the geometry revision or element counts of the provided mesh change. Reading the key is constant time, so it can be checked on every cache lookup.'''
+    return (get_mesh_revision(mesh), len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons))
+
+def build_mesh_adjacency(mesh, adjacency_type):
+    '''Builds compressed sparse row adjacency of the provided type (see ADJACENCY_TYPES) for the provided mesh from foreach_get arrays.'''
+    vertex_count = len(mesh.vertices)
+    edge_count = len(mesh.edges)
+    polygon_count = len(mesh.polygons)
+
+    if adjacency_type in ('VERTEX_EDGES', 'VERTEX_VERTICES'):
+        edge_vertices = np.empty(edge_count * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edge_vertices)
+        edge_vertices = edge_vertices.reshape(-1, 2)
+        elements = np.concatenate((edge_vertices[:, 0], edge_vertices[:, 1]))
+        if adjacency_type == 'VERTEX_EDGES':
+            edge_indices = np.arange(edge_count, dtype=np.int32)
+            return build_csr_adjacency(vertex_count, elements, np.concatenate((edge_indices, edge_indices)))
+        return build_csr_adjacency(vertex_count, elements, np.concatenate((edge_vertices[:, 1], edge_vertices[:, 0])))
+
+    loop_totals = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    corner_faces = np.repeat(np.arange(polygon_count, dtype=np.int32), loop_totals)
+    match adjacency_type:
+        case 'EDGE_FACES':
+            corner_edges = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.loops.foreach_get("edge_index", corner_edges)
+            return build_csr_adjacency(edge_count, corner_edges, corner_faces)
+        case 'FACE_EDGES':
+            # Face corners are already stored face by face, so the loop layout is the adjacency.
+            corner_edges = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.loops.foreach_get("edge_index", corner_edges)
+            offsets = np.zeros(polygon_count + 1, dtype=np.int32)
+            np.cumsum(loop_totals, out=offsets[1:])
+            return offsets, corner_edges
+        case 'VERTEX_FACES':
+            corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.loops.foreach_get("vertex_index", corner_verts)
+            return build_csr_adjacency(vertex_count, corner_verts, corner_faces)
+    raise ValueError("Unknown adjacency type: {0}".format(adjacency_type))
+
+def get_mesh_adjacency(mesh, adjacency_type):
+    '''Returns cached compressed sparse row adjacency (int32 offsets and indices arrays) of the provided type (see ADJACENCY_TYPES) for the provided mesh. Adjacency is rebuilt when the mesh topology changes, least recently used adjacency is evicted once the cache grows past its byte limit.'''
+    cache_key = (mesh.as_pointer(), adjacency_type)
+    topology_key = get_mesh_topology_key(mesh)
+    cached = _adjacency_cache.get(cache_key)
+    if cached and cached[0] == topology_key:
+        _adjacency_cache.move_to_end(cache_key)
+        return cached[1]
+
+    if cached:
+        del _adjacency_cache[cache_key]
+        _adjacency_cache_state['bytes'] -= cached[2]
+
+    # Cached arrays are shared between callers, so they're made read only.
+    adjacency = build_mesh_adjacency(mesh, adjacency_type)
+    for array in adjacency:
+        array.flags.writeable = False
+    adjacency_bytes = adjacency[0].nbytes + adjacency[1].nbytes
+    _adjacency_cache[cache_key] = (topology_key, adjacency, adjacency_bytes)
+    _adjacency_cache_state['bytes'] += adjacency_bytes
+
+    while _adjacency_cache_state['bytes'] > MAX_ADJACENCY_CACHE_BYTES and len(_adjacency_cache) > 1:
+        evicted = _adjacency_cache.popitem(last=False)[1]
+        _adjacency_cache_state['bytes'] -= evicted[2]
+    return adjacency
+
+def clear_adjacency_cache():
+    '''Removes all cached mesh adjacency.'''
+    _adjacency_cache.clear()
+    _adjacency_cache_state['bytes'] = 0
+
+def get_manifold_edge_faces(mesh):
+    '''Returns the indices of all edges shared by exactly two faces in the provided mesh, along with the first and second face of each of those edges.'''
+    offsets, edge_faces = get_mesh_adjacency(mesh, 'EDGE_FACES')
+    manifold_edges = np.flatnonzero(np.diff(offsets) == 2)
+    first_faces = edge_faces[offsets[manifold_edges]]
+    second_faces = edge_faces[offsets[manifold_edges] + 1]
+    return manifold_edges, first_faces, second_faces
+
+def get_edge_dihedral_angles(mesh):
+    '''Returns the angle between the two faces of every edge in the provided mesh (-1 for edges not shared by exactly two faces). Angles are cached until the mesh changes.'''
+    fingerprint = get_mesh_fingerprint(mesh)
+    if _dihedral_angle_cache['fingerprint'] == fingerprint:
+        return _dihedral_angle_cache['angles']
+
+    face_normals = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", face_normals)
+    face_normals = face_normals.reshape(-1, 3)
+
+    angles = np.full(len(mesh.edges), -1.0, dtype=np.float32)
+    manifold_edges, first_faces, second_faces = get_manifold_edge_faces(mesh)
+    dots = np.einsum('ij,ij->i', face_normals[first_faces], face_normals[second_faces])
+    angles[manifold_edges] = np.arccos(np.clip(dots, -1.0, 1.0))
+
+    _dihedral_angle_cache['fingerprint'] = fingerprint
+    _dihedral_angle_cache['angles'] = angles
+    return angles
+
+def get_edge_face_counts(mesh):
+    '''Returns the number of faces using each edge of the provided mesh.'''
+    return np.diff(get_mesh_adjacency(mesh, 'EDGE_FACES')[0])
+
+def get_edge_chains(edge_vertices):
+    '''Groups edges (an (N, 2) array of vertex indices) into connected chains, breaking chains at vertices that don't link exactly two edges. Returns a list of (vertex_indices, edge_rows, is_closed) tuples, where edge rows index into the provided array.'''
+    edge_vertices = np.asarray(edge_vertices).reshape(-1, 2)
+    vertex_ids, compact_edges = np.unique(edge_vertices, return_inverse=True)
+    compact_edges = compact_edges.reshape(-1, 2)
+    edge_rows = np.arange(len(edge_vertices))
+    offsets, vertex_edges = build_csr_adjacency(
+        len(vertex_ids),
+        np.concatenate((compact_edges[:, 0], compact_edges[:, 1])),
+        np.concatenate((edge_rows, edge_rows))
+    )
+    offsets = offsets.tolist()
+    vertex_edges = vertex_edges.tolist()
+    edge_vertex_sums = compact_edges.sum(axis=1).tolist()
+    vertex_ids = vertex_ids.tolist()
+
+    visited_edges = np.zeros(len(edge_vertices), dtype=bool)
+    chains = []
+
+    # Walk open chains from their end points first, so the remaining unvisited edges only form closed loops.
+    link_counts = np.diff(offsets)
+    end_points = np.flatnonzero(link_counts != 2).tolist()
+    for start_vertex in end_points + list(range(len(vertex_ids))):
+        for edge_row in vertex_edges[offsets[start_vertex]:offsets[start_vertex + 1]]:
+            if visited_edges[edge_row]:
+                continue
+
+            chain_vertices = [start_vertex]
+            chain_edges = []
+            next_vertex = edge_vertex_sums[edge_row] - start_vertex
+            while True:
+                visited_edges[edge_row] = True
+                chain_edges.append(edge_row)
+                chain_vertices.append(next_vertex)
+                if link_counts[next_vertex] != 2:
+                    break
+                unvisited_edges = [link_edge for link_edge in vertex_edges[offsets[next_vertex]:offsets[next_vertex + 1]] if not visited_edges[link_edge]]
+                if not unvisited_edges:
+                    break
+                edge_row = unvisited_edges[0]
+                next_vertex = edge_vertex_sums[edge_row] - next_vertex
+
+            is_closed = len(chain_edges) > 1 and chain_vertices[0] == chain_vertices[-1]
+            if is_closed:
+                chain_vertices.pop()
+            chains.append(([vertex_ids[vertex] for vertex in chain_vertices], chain_edges, is_closed))
+    return chains
+
+def get_or_create_attribute(mesh, name, data_type, domain):
+    '''Returns the mesh attribute with the provided name, creating it if it doesn't exist.'''
+    attribute = mesh.attributes.get(name)
+    if not attribute:
+        attribute = mesh.attributes.new(name, data_type, domain)
+    return attribute
+
+def get_attribute_array(attribute):
+    '''Reads the values of the provided attribute into a NumPy array with one row per element.'''
+    property_name, components, buffer_type = ATTRIBUTE_ARRAY_FORMATS[attribute.data_type]
+    values = np.empty(len(attribute.data) * components, dtype=buffer_type)
+    attribute.data.foreach_get(property_name, values)
+    return values.reshape(len(attribute.data), components) if components > 1 else values
+
+def set_attribute_array(attribute, values):
+    '''Writes the provided NumPy array (one row per element) to the provided attribute.'''
+    property_name, components, buffer_type = ATTRIBUTE_ARRAY_FORMATS[attribute.data_type]
+    attribute.data.foreach_set(property_name, np.ascontiguousarray(values, dtype=buffer_type).ravel())
+
+def get_copyable_attributes(mesh):
+    '''Returns user and built-in attributes of the provided mesh that can be copied between meshes (excluding positions, internal and string attributes).'''
+    return [
+        attribute for attribute in mesh.attributes
+        if attribute.name != 'position' and not attribute.name.startswith('.') and attribute.data_type in ATTRIBUTE_ARRAY_FORMATS
+    ]
+
+def read_attributes(mesh):
+    '''Returns a snapshot of the copyable attributes of the provided mesh as (name, domain, data type, values) tuples, so they can be written back after the mesh geometry is replaced.'''
+    return [(attribute.name, attribute.domain, attribute.data_type, get_attribute_array(attribute)) for attribute in get_copyable_attributes(mesh)]
+
+def write_attributes(target_mesh, attributes, element_indices):
+    '''Writes the provided attribute snapshots (see read_attributes) to the target mesh. Element indices maps an attribute domain to the source element index of each target element (-1 for elements which get default values), domains not provided are skipped.'''
+    for name, domain, data_type, values in attributes:
+        indices = element_indices.get(domain)
+        if indices is None:
+            continue
+        indices = np.asarray(indices)
+        target_values = values[np.maximum(indices, 0)] if len(values) > 0 else np.zeros((len(indices),) + values.shape[1:], dtype=values.dtype)
+        target_values[indices < 0] = 0
+        target_attribute = get_or_create_attribute(target_mesh, name, data_type, domain)
+        set_attribute_array(target_attribute, target_values)
+
+def copy_attributes(source_mesh, target_mesh, element_indices):
+    '''Copies attributes from the source mesh to the target mesh. Element indices maps an attribute domain to the source element index of each target element (-1 for elements which get default values), domains not provided are skipped.'''
+    write_attributes(target_mesh, read_attributes(source_mesh), element_indices)
+
+def get_edge_source_indices(source_edge_vertices, target_edge_vertices, vertex_count):
+    '''Returns the index of the source edge matching each target edge by its vertices (both given as (N, 2) arrays using the same vertex indices), or -1 where a target edge has no match.'''
+    source_keys = np.sort(source_edge_vertices, axis=1).astype(np.int64)
+    source_keys = source_keys[:, 0] * vertex_count + source_keys[:, 1]
+    target_keys = np.sort(target_edge_vertices, axis=1).astype(np.int64)
+    target_keys = target_keys[:, 0] * vertex_count + target_keys[:, 1]
+
+    order = np.argsort(source_keys)
+    positions = np.clip(np.searchsorted(source_keys[order], target_keys), 0, max(len(order) - 1, 0))
+    if len(order) == 0:
+        return np.full(len(target_keys), -1, dtype=np.int64)
+    matches = order[positions]
+    return np.where(source_keys[matches] == target_keys, matches, -1)
+
+def link_object_like(new_object, reference_object):
+    '''Links the provided new object to the same collections as the reference object, using the reference object's world transform.'''
+    for collection in reference_object.users_collection:
+        collection.objects.link(new_object)
+    new_object.matrix_world = reference_object.matrix_world.copy()
+
 def select_only(obj):
     '''Ensures only the provided object is selected.'''
     for obj in bpy.context.selected_objects:
@@ -0,0 +1,319 @@
+# This module contains the level of detail (LOD) generator which builds applied, decimated LOD meshes for many objects, skipping objects whose LODs are up to date and farming large batches out to background Blender workers.
+
+import bpy
+import json
+import numpy as np
+import os
+import shutil
+import zlib
+from mathutils.bvhtree import BVHTree
+from ..core import background_workers
+from ..core import internal_utils
+from ..core import mesh_analysis
+from ..core import rylog
+
+LOD_HASH_PROPERTY = "rymodel_lod_hash"
+LOD_COLLECTION_PROPERTY = "rymodel_lod_collection"
+LOD_SOURCE_PROPERTY = "rymodel_lod_source"
+LOD_INDEX_PROPERTY = "rymodel_lod_index"
+LOD_REPORT_PROPERTY = "rymodel_lod_report"
+DECIMATE_WORKER_SCRIPT = "decimate_worker.py"
+
+# Ratios tried (from least to most aggressive) when picking LOD ratios by geometric error.
+ERROR_CANDIDATE_RATIOS = [0.75, 0.5, 0.35, 0.25, 0.175, 0.125, 0.09, 0.0625, 0.045, 0.03125]
+MAX_ERROR_SAMPLES = 20000
+
+def parse_lod_levels(levels_text):
+    '''Returns the LOD levels in the provided comma separated text as a list of numbers, ignoring invalid or non-positive values.'''
+    levels = []
+    for level_text in levels_text.split(","):
+        try:
+            level = float(level_text)
+        except ValueError:
+            continue
+        if level > 0:
+            levels.append(level)
+    return levels
+
+def get_triangle_count(mesh):
+    '''Returns the number of triangles the provided mesh has once triangulated.'''
+    return int(np.maximum(mesh_analysis.get_face_sizes(mesh) - 2, 0).sum())
+
+def get_lod_ratios(mesh, levels, level_type='RATIO'):
+    '''Returns the decimation ratio of every LOD level. Levels are either ratios of the original triangle count, or triangle budgets ('TRIANGLES'). The provided mesh should be the evaluated mesh, since ratios are applied after modifiers.'''
+    if level_type == 'TRIANGLES':
+        triangle_count = max(get_triangle_count(mesh), 1)
+        return [min(budget / triangle_count, 1.0) for budget in levels]
+    return [min(ratio, 1.0) for ratio in levels]
+
+def get_lod_hash(obj, lod_settings, depsgraph):
+    '''Returns a hash of the provided object's evaluated mesh (which changes with the mesh and any modifier settings) and modifier stack along with the provided LOD settings (ratios or error budgets). LODs don't need to be regenerated while the hash is unchanged.'''
+    fingerprint = internal_utils.get_mesh_fingerprint(obj.evaluated_get(depsgraph).data)[1:]
+    modifier_stack = tuple((modifier.type, modifier.show_viewport) for modifier in obj.modifiers)
+    return "{0:08x}".format(zlib.crc32(repr((fingerprint, modifier_stack, tuple(round(value, 6) for value in lod_settings))).encode()))
+
+def get_lod_name(obj, lod_index):
+    '''Returns the name of the provided LOD level of the provided object, following the common game engine LOD group naming.'''
+    return "{0}_LOD{1}".format(obj.name, lod_index)
+
+def get_lod_objects(obj):
+    '''Returns all existing LOD objects (excluding LOD0) generated for the provided object, in LOD order. LODs are found through the LOD group collection stored on the object, so duplicates of the object share its LODs.'''
+    lod_collection = obj.get(LOD_COLLECTION_PROPERTY)
+    if not lod_collection:
+        return []
+    lod_objects = [lod_object for lod_object in lod_collection.objects if LOD_INDEX_PROPERTY in lod_object]
+    return sorted(lod_objects, key=lambda lod_object: lod_object[LOD_INDEX_PROPERTY])
+
+def is_lod_cache_valid(obj, lod_hash, lod_count):
+    '''Returns true if the LODs of the provided object were generated from the same mesh and settings, and all of them still exist.'''
+    return obj.get(LOD_HASH_PROPERTY) == lod_hash and len(get_lod_objects(obj)) == lod_count
+
+def get_lod_group_collection(obj):
+    '''Returns the LOD group collection owned by the provided object, creating it in the scene if it doesn't exist. Duplicates of an object share its collection until their own LODs are generated.'''
+    collection = obj.get(LOD_COLLECTION_PROPERTY)
+    if collection and collection.get(LOD_SOURCE_PROPERTY) == obj:
+        return collection
+
+    collection = bpy.data.collections.new("{0}_LODGroup".format(obj.name))
+    collection[LOD_SOURCE_PROPERTY] = obj
+    bpy.context.scene.collection.children.link(collection)
+    obj[LOD_COLLECTION_PROPERTY] = collection
+    return collection
+
+def decimate_object(obj, ratios):
+    '''Returns an applied, decimated copy of the provided object's evaluated mesh for every provided ratio. A single temporary decimate modifier is used for all ratios.'''
+    decimate_modifier = obj.modifiers.new("LODDecimate", 'DECIMATE')
+    lod_meshes = []
+    try:
+        for ratio in ratios:
+            decimate_modifier.ratio = ratio
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            depsgraph.update()
+            lod_meshes.append(bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph)))
+    finally:
+        obj.modifiers.remove(decimate_modifier)
+    return lod_meshes
+
+def get_mesh_sample_points(mesh, max_samples=MAX_ERROR_SAMPLES):
+    '''Returns points sampled on the surface of the provided mesh (vertices and face centers), randomly thinned out to the provided maximum.'''
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    face_centers = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("center", face_centers)
+    sample_points = np.concatenate((positions.reshape(-1, 3), face_centers.reshape(-1, 3)))
+
+    # A fixed seed keeps measured errors identical between runs on the same mesh.
+    if len(sample_points) > max_samples:
+        sample_points = sample_points[np.random.default_rng(0).choice(len(sample_points), max_samples, replace=False)]
+    return sample_points
+
+def get_nearest_distances(points, bvh):
+    '''Returns the distance from each provided point to the nearest surface in the provided BVH tree.'''
+    distances = np.zeros(len(points))
+    for point_index, point in enumerate(points):
+        distance = bvh.find_nearest(point)[3]
+        if distance is not None:
+            distances[point_index] = distance
+    return distances
+
+def measure_lod_error(lod_mesh, source_points, source_bvh):
+    '''Returns the symmetric Hausdorff distance between the provided LOD mesh and the source surface (its sampled points and BVH tree), measured on sampled points. Measuring both directions catches LOD surfaces drifting away from the source as well as source details (e.g. thin parts) the LOD collapsed.'''
+    lod_positions = np.empty(len(lod_mesh.vertices) * 3, dtype=np.float32)
+    lod_mesh.vertices.foreach_get("co", lod_positions)
+    lod_bvh = BVHTree.FromPolygons(lod_positions.reshape(-1, 3).tolist(), [tuple(polygon.vertices) for polygon in lod_mesh.polygons])
+    lod_to_source = get_nearest_distances(get_mesh_sample_points(lod_mesh), source_bvh)
+    source_to_lod = get_nearest_distances(source_points, lod_bvh)
+    return float(max(lod_to_source.max(initial=0.0), source_to_lod.max(initial=0.0)))
+
+def get_bounding_radius(obj):
+    '''Returns the local space radius of the bounding sphere of the provided object (including modifiers), the same sphere the viewport LOD manager projects to find screen sizes.'''
+    bounds = np.array(obj.bound_box)
+    return float(np.linalg.norm(bounds - bounds.mean(axis=0), axis=1).max())
+
+def get_lod_switch_screen_size(lod_index, screen_size_threshold):
+    '''Returns the largest screen size (fraction of the half viewport height) the provided LOD is displayed at, matching viewport_lod.get_lod_index.'''
+    return screen_size_threshold / 2 ** (lod_index - 1)
+
+def get_allowed_lod_errors(obj, error_budgets, screen_size_threshold):
+    '''Converts the provided screen space error budgets (in percent of the half viewport height) to local space distances. Each LOD is displayed at most at its switch screen size, where one unit of local distance covers screen size / bounding radius of the half viewport height.'''
+    radius = max(get_bounding_radius(obj), 1e-6)
+    return [budget / 100 * radius / get_lod_switch_screen_size(lod_index, screen_size_threshold) for lod_index, budget in enumerate(error_budgets, start=1)]
+
+def decimate_object_by_error(obj, error_budgets, screen_size_threshold):
+    '''Returns a decimated copy of the provided object's evaluated mesh for every provided screen space error budget, using the most aggressive candidate ratio whose measured error stays within the budget at the LOD's switch screen size, along with a report of the ratios chosen.'''
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated_object = obj.evaluated_get(depsgraph)
+    source_bvh = BVHTree.FromObject(evaluated_object, depsgraph)
+
+    # Source points are sampled before the decimate modifier is added, which changes the evaluated mesh.
+    source_points = get_mesh_sample_points(evaluated_object.data)
+    allowed_errors = get_allowed_lod_errors(obj, error_budgets, screen_size_threshold)
+
+    # Decimation error grows as the ratio shrinks, stop measuring once the largest budget is exceeded.
+    candidates = []
+    decimate_modifier = obj.modifiers.new("LODDecimate", 'DECIMATE')
+    try:
+        for ratio in ERROR_CANDIDATE_RATIOS:
+            decimate_modifier.ratio = ratio
+            depsgraph.update()
+            candidate_mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+            candidate_error = measure_lod_error(candidate_mesh, source_points, source_bvh)
+            candidates.append((ratio, candidate_mesh, candidate_error))
+            if candidate_error > max(allowed_errors):
+                break
+    finally:
+        obj.modifiers.remove(decimate_modifier)
+
+    lod_meshes = []
+    report = []
+    used_meshes = set()
+    for budget, allowed_error in zip(error_budgets, allowed_errors):
+        within_budget = [candidate for candidate in candidates if candidate[2] <= allowed_error]
+        ratio, candidate_mesh, candidate_error = within_budget[-1] if within_budget else candidates[0]
+
+        # Budgets choosing the same ratio share the measured candidate, later ones get a copy of it.
+        lod_mesh = candidate_mesh.copy() if candidate_mesh in used_meshes else candidate_mesh
+        used_meshes.add(candidate_mesh)
+        lod_meshes.append(lod_mesh)
+        report.append({
+            'budget': budget,
+            'ratio': ratio,
+            'error': candidate_error,
+            'allowed_error': allowed_error,
+            'triangles': get_triangle_count(lod_mesh),
+            'within_budget': bool(within_budget)
+        })
+
+    for ratio, candidate_mesh, candidate_error in candidates:
+        if candidate_mesh not in used_meshes:
+            bpy.data.meshes.remove(candidate_mesh)
+    return lod_meshes, report
+
+def decimate_objects_in_background(objects, object_ratios, max_workers=0):
+    '''Decimates the provided objects in parallel background Blender processes. Returns the LOD meshes of every object, or None for objects that failed.'''
+    job_folder = background_workers.create_job_folder()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    worker_script = background_workers.get_worker_script_path(DECIMATE_WORKER_SCRIPT)
+
+    try:
+        # Workers receive the evaluated mesh so modifiers are applied to LODs the same way they are in process.
+        jobs = []
+        output_paths = []
+        for object_index, obj in enumerate(objects):
+            input_path = os.path.join(job_folder, "input_{0}.blend".format(object_index))
+            output_path = os.path.join(job_folder, "output_{0}.blend".format(object_index))
+            evaluated_mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+            bpy.data.libraries.write(input_path, {evaluated_mesh}, fake_user=True)
+            bpy.data.meshes.remove(evaluated_mesh)
+            jobs.append((worker_script, [input_path, output_path, ",".join(str(ratio) for ratio in object_ratios[object_index])]))
+            output_paths.append(output_path)
+
+        exit_codes = background_workers.run_background_jobs(jobs, max_workers)[0]
+
+        object_lod_meshes = []
+        for obj, output_path, exit_code in zip(objects, output_paths, exit_codes):
+            if exit_code != 0 or not os.path.exists(output_path):
+                object_lod_meshes.append(None)
+                continue
+
+            with bpy.data.libraries.load(output_path) as (data_from, data_to):
+                data_to.meshes = sorted(data_from.meshes, key=lambda name: int(name[3:]))
+            lod_meshes = list(data_to.meshes)
+            for lod_mesh in lod_meshes:
+                lod_mesh.use_fake_user = False
+                for material in obj.data.materials:
+                    lod_mesh.materials.append(material)
+            object_lod_meshes.append(lod_meshes)
+    finally:
+        shutil.rmtree(job_folder, ignore_errors=True)
+    return object_lod_meshes
+
+def set_lod_meshes(obj, lod_meshes, lod_hash):
+    '''Creates (or updates) the LOD objects of the provided object using the provided meshes, and groups them with the object in its LOD group collection. LOD objects are hidden in viewports and renders, the viewport LOD manager displays their meshes on the object itself.'''
+    existing_objects = get_lod_objects(obj) if obj.get(LOD_COLLECTION_PROPERTY) and obj[LOD_COLLECTION_PROPERTY].get(LOD_SOURCE_PROPERTY) == obj else []
+    lod_collection = get_lod_group_collection(obj)
+    if obj.name not in lod_collection.objects:
+        lod_collection.objects.link(obj)
+
+    for lod_index, lod_mesh in enumerate(lod_meshes, start=1):
+        lod_name = get_lod_name(obj, lod_index)
+        lod_mesh.name = lod_name
+        if lod_index <= len(existing_objects):
+            lod_object = existing_objects[lod_index - 1]
+            old_mesh = lod_object.data
+            lod_object.data = lod_mesh
+            if old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+        else:
+            lod_object = bpy.data.objects.new(lod_name, lod_mesh)
+            lod_collection.objects.link(lod_object)
+        lod_object[LOD_INDEX_PROPERTY] = lod_index
+        lod_object.hide_viewport = True
+        lod_object.hide_render = True
+        lod_object.matrix_world = obj.matrix_world.copy()
+
+    # Remove LOD objects left over from a previous generation with more levels.
+    stale_objects = existing_objects[len(lod_meshes):]
+    if stale_objects:
+        stale_meshes = {lod_object.data for lod_object in stale_objects if lod_object.data.users == 1}
+        bpy.data.batch_remove(set(stale_objects) | stale_meshes)
+
+    obj[LOD_HASH_PROPERTY] = lod_hash
+
+def generate_lods(objects, levels, level_type='RATIO', use_background_workers=True, background_threshold=8, max_workers=0, force=False, screen_size_threshold=0.25):
+    '''Generates applied LOD meshes for all provided mesh objects. Levels are ratios, triangle budgets ('TRIANGLES') or screen space error budgets in percent of the half viewport height ('ERROR'), measured at the screen size each LOD is switched to with the provided LOD1 screen size threshold. Objects with up to date LODs are skipped unless forced. Returns the number of objects generated and skipped.'''
+    pending_objects = []
+    pending_ratios = []
+    pending_hashes = []
+    skipped_count = 0
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        if level_type == 'ERROR':
+            ratios = None
+            lod_hash = get_lod_hash(obj, [-1.0, screen_size_threshold] + levels, depsgraph)
+        else:
+            ratios = get_lod_ratios(obj.evaluated_get(depsgraph).data, levels, level_type)
+            lod_hash = get_lod_hash(obj, ratios, depsgraph)
+        if not force and is_lod_cache_valid(obj, lod_hash, len(levels)):
+            skipped_count += 1
+            continue
+        pending_objects.append(obj)
+        pending_ratios.append(ratios)
+        pending_hashes.append(lod_hash)
+
+    # Error driven ratios are measured against the source surface in this process, only fixed ratios are farmed out to background workers.
+    object_reports = [None] * len(pending_objects)
+    if level_type == 'ERROR':
+        object_lod_meshes = []
+        for object_index, obj in enumerate(pending_objects):
+            lod_meshes, object_reports[object_index] = decimate_object_by_error(obj, levels, screen_size_threshold)
+            object_lod_meshes.append(lod_meshes)
+    elif use_background_workers and len(pending_objects) >= background_threshold:
+        rylog.log("Generating LODs for {0} objects with {1} background workers.".format(len(pending_objects), background_workers.get_worker_count(max_workers)))
+        object_lod_meshes = decimate_objects_in_background(pending_objects, pending_ratios, max_workers)
+    else:
+        object_lod_meshes = [decimate_object(obj, ratios) for obj, ratios in zip(pending_objects, pending_ratios)]
+
+    generated_count = 0
+    for obj, lod_meshes, lod_hash, report in zip(pending_objects, object_lod_meshes, pending_hashes, object_reports):
+        if lod_meshes is None:
+            rylog.log("Failed generating LODs for {0}.".format(obj.name))
+            continue
+        set_lod_meshes(obj, lod_meshes, lod_hash)
+        if report is not None:
+            obj[LOD_REPORT_PROPERTY] = json.dumps(report)
+            for lod_index, lod_report in enumerate(report, start=1):
+                rylog.log("{0} LOD{1}: ratio {2}, error {3:.5f} of {4:.5f} allowed ({5}% screen budget{6}), {7} triangles.".format(
+                    obj.name,
+                    lod_index,
+                    lod_report['ratio'],
+                    lod_report['error'],
+                    lod_report['allowed_error'],
+                    lod_report['budget'],
+                    "" if lod_report['within_budget'] else " exceeded",
+                    lod_report['triangles']
+                ))
+        generated_count += 1
+    return generated_count, skipped_count
@@ -0,0 +1,167 @@
+# This module contains vectorized mesh analysis functions. Results are cached per mesh version so the user interface can display them without re-scanning meshes on every redraw.
+
+import bpy
+from collections import OrderedDict
+import numpy as np
+import time
+from ..core import internal_utils
+
+# Cached topology statistics keyed by mesh pointer (least recently used first), each entry holds the mesh topology key (geometry revision and element counts) the statistics were computed for.
+_topology_stats_cache = OrderedDict()
+MAX_CACHED_MESHES = 256
+
+# Cached mesh health keyed by mesh pointer (least recently used first), each entry holds the mesh topology key (geometry revision and element counts) the health was computed for. Health is recomputed by a debounced timer, never while drawing.
+_mesh_health_cache = OrderedDict()
+_mesh_health_state = {'pending': {}, 'requested': 0.0}
+MESH_HEALTH_UPDATE_DELAY = 0.5
+
+def get_face_sizes(mesh):
+    '''Returns the number of sides of every face in the provided mesh.'''
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    return loop_totals
+
+def get_topology_stats(mesh):
+    '''Returns triangle, quad and ngon counts along with a face size histogram for the provided mesh. Results are cached per mesh version.'''
+    topology_key = internal_utils.get_mesh_topology_key(mesh)
+    cached = _topology_stats_cache.get(mesh.as_pointer())
+    if cached and cached[0] == topology_key:
+        _topology_stats_cache.move_to_end(mesh.as_pointer())
+        return cached[1]
+
+    face_sizes = get_face_sizes(mesh)
+    histogram = np.bincount(face_sizes) if len(face_sizes) > 0 else np.zeros(0, dtype=np.int64)
+    stats = {
+        'tris': int(np.count_nonzero(face_sizes == 3)),
+        'quads': int(np.count_nonzero(face_sizes == 4)),
+        'ngons': int(np.count_nonzero(face_sizes > 4)),
+        'histogram': {sides: int(count) for sides, count in enumerate(histogram) if count > 0}
+    }
+
+    _topology_stats_cache[mesh.as_pointer()] = (topology_key, stats)
+    _topology_stats_cache.move_to_end(mesh.as_pointer())
+    while len(_topology_stats_cache) > MAX_CACHED_MESHES:
+        _topology_stats_cache.popitem(last=False)
+    return stats
+
+def select_faces(mesh, face_mask):
+    '''Selects faces (and their vertices and edges) in the provided mesh using the provided boolean mask, deselecting all other geometry.'''
+    face_sizes = get_face_sizes(mesh)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    corner_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    mesh.loops.foreach_get("edge_index", corner_edges)
+    selected_corners = np.repeat(face_mask, face_sizes)
+
+    vertex_selection = np.zeros(len(mesh.vertices), dtype=bool)
+    vertex_selection[corner_verts[selected_corners]] = True
+    edge_selection = np.zeros(len(mesh.edges), dtype=bool)
+    edge_selection[corner_edges[selected_corners]] = True
+
+    mesh.vertices.foreach_set("select", vertex_selection)
+    mesh.edges.foreach_set("select", edge_selection)
+    mesh.polygons.foreach_set("select", face_mask)
+    mesh.update()
+
+def select_ngons(mesh):
+    '''Selects all ngons (faces with more than 4 sides) in the provided mesh. Returns the number of ngons selected.'''
+    ngons = get_face_sizes(mesh) > 4
+    select_faces(mesh, ngons)
+    return int(np.count_nonzero(ngons))
+
+def label_connected_components(element_count, first_elements, second_elements):
+    '''Labels the connected components of a graph with the provided number of elements, connected by the provided pairs of element indices. Returns a label per element (numbered from 0) and the number of components.'''
+    labels = np.arange(element_count)
+    if len(first_elements) > 0:
+        while True:
+            # Hook the larger label of every connected pair onto the smaller one, then flatten label chains by pointer jumping.
+            first_labels = labels[first_elements]
+            second_labels = labels[second_elements]
+            if np.array_equal(first_labels, second_labels):
+                break
+            np.minimum.at(labels, np.maximum(first_labels, second_labels), np.minimum(first_labels, second_labels))
+            while True:
+                jumped_labels = labels[labels]
+                if np.array_equal(jumped_labels, labels):
+                    break
+                labels = jumped_labels
+
+    component_roots, labels = np.unique(labels, return_inverse=True)
+    return labels, len(component_roots)
+
+def get_face_islands(mesh, seam_mask, manifold_edge_faces=None):
+    '''Returns an island label per face of the provided mesh and the number of islands. Faces belong to the same island when connected through manifold edges that aren't marked in the provided seam mask.'''
+    if manifold_edge_faces is None:
+        manifold_edge_faces = internal_utils.get_manifold_edge_faces(mesh)
+    manifold_edges, first_faces, second_faces = manifold_edge_faces
+    connected = ~seam_mask[manifold_edges]
+    return label_connected_components(len(mesh.polygons), first_faces[connected], second_faces[connected])
+
+def compute_mesh_health(mesh):
+    '''Returns triangle, quad, ngon, non-manifold edge (edges not shared by exactly two faces) and loose vertex (vertices without edges) counts for the provided mesh. Face counts come from the cached topology statistics.'''
+    stats = get_topology_stats(mesh)
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    vertex_edge_counts = np.bincount(edge_vertices, minlength=len(mesh.vertices))
+    return {
+        'tris': stats['tris'],
+        'quads': stats['quads'],
+        'ngons': stats['ngons'],
+        'non_manifold_edges': int(np.count_nonzero(internal_utils.get_edge_face_counts(mesh) != 2)),
+        'loose_verts': int(np.count_nonzero(vertex_edge_counts == 0))
+    }
+
+def tag_3d_views_for_redraw():
+    '''Redraws all 3D viewports (and their side panels).'''
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def update_pending_mesh_health():
+    '''Timer which recomputes the health of meshes that changed, once no further changes were requested for the update delay.'''
+    remaining_delay = MESH_HEALTH_UPDATE_DELAY - (time.monotonic() - _mesh_health_state['requested'])
+    if remaining_delay > 0:
+        return remaining_delay
+
+    # Meshes are found again by name, pending meshes that were renamed or removed since they were requested are skipped.
+    pending_meshes = _mesh_health_state['pending']
+    _mesh_health_state['pending'] = {}
+    for mesh_pointer, (mesh_name, mesh_version) in pending_meshes.items():
+        mesh = bpy.data.meshes.get(mesh_name)
+        if not mesh or mesh.as_pointer() != mesh_pointer or mesh.is_editmode:
+            continue
+        _mesh_health_cache[mesh_pointer] = (internal_utils.get_mesh_topology_key(mesh), compute_mesh_health(mesh))
+        _mesh_health_cache.move_to_end(mesh_pointer)
+        while len(_mesh_health_cache) > MAX_CACHED_MESHES:
+            _mesh_health_cache.popitem(last=False)
+
+    tag_3d_views_for_redraw()
+    return None
+
+def request_mesh_health_update(mesh, mesh_version):
+    '''Schedules the health of the provided mesh to be recomputed after the update delay. Requests for a new mesh version restart the delay, so health isn't recomputed while a mesh is being edited continuously.'''
+    pending_request = (mesh.name, mesh_version)
+    if _mesh_health_state['pending'].get(mesh.as_pointer()) == pending_request:
+        return
+    _mesh_health_state['pending'][mesh.as_pointer()] = pending_request
+    _mesh_health_state['requested'] = time.monotonic()
+    if not bpy.app.timers.is_registered(update_pending_mesh_health):
+        bpy.app.timers.register(update_pending_mesh_health, first_interval=MESH_HEALTH_UPDATE_DELAY)
+
+def get_mesh_health(obj):
+    '''Returns the last computed health of the mesh of the provided object without computing anything (None if it was never computed), along with whether the health is out of date. Out of date health is scheduled to be recomputed.'''
+    mesh = obj.data
+    mesh_version = internal_utils.get_mesh_topology_key(mesh)
+    cached = _mesh_health_cache.get(mesh.as_pointer())
+    if cached:
+        _mesh_health_cache.move_to_end(mesh.as_pointer())
+    is_current = cached is not None and cached[0] == mesh_version
+    if not is_current and not mesh.is_editmode:
+        request_mesh_health_update(mesh, mesh_version)
+
+    return (cached[1] if cached else None), is_current
+
+def has_unapplied_scale(obj):
+    '''Returns true if the provided object has a scale other than 1 on any axis.'''
+    return any(abs(value - 1.0) > 1e-6 for value in obj.scale)
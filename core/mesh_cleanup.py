@@ -0,0 +1,289 @@
+# This module contains batched mesh cleanup and repair functions which work directly on mesh data (rather than through edit mode operators) so they can run on many objects at once.
+
+import bpy
+import bmesh
+import numpy as np
+import time
+import zlib
+from ..core import internal_utils
+from ..core import rylog
+from ..core import transform_tools
+
+def clean_mesh_object(obj, apply_transform=True, apply_rotation=True, merge_by_distance=True, merge_distance=0.0001, remove_degenerate=True, remove_loose=True, loose_verts_only=False, recalculate_normals=True):
+    '''Cleans the mesh of the provided object in a single bmesh pass. Applying transforms applies scale, and rotation unless turned off. Removing loose geometry removes loose faces, edges and vertices, or only vertices without edges. Returns a report of the geometry removed and the time taken.'''
+    start_time = time.perf_counter()
+    mesh = obj.data
+    report = {
+        'merged_verts': 0,
+        'degenerate_faces': 0,
+        'loose_faces': 0,
+        'loose_edges': 0,
+        'loose_verts': 0,
+        'transform_applied': False,
+        'seconds': 0.0
+    }
+
+    # Applying transforms to a mesh shared by multiple objects would move the other objects, skip it for shared meshes.
+    if apply_transform and transform_tools.can_transform_data(obj):
+        transform_tools.apply_object_transform(obj, location=False, rotation=apply_rotation, scale=True)
+        report['transform_applied'] = True
+
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+
+    if merge_by_distance:
+        vertex_count = len(bm.verts)
+        bmesh.ops.remove_doubles(bm, verts=bm.verts[:], dist=merge_distance)
+        report['merged_verts'] = vertex_count - len(bm.verts)
+
+    # Merging vertices can collapse faces, remove degenerate geometry after merging.
+    if remove_degenerate:
+        face_count = len(bm.faces)
+        bmesh.ops.dissolve_degenerate(bm, dist=merge_distance, edges=bm.edges[:])
+        report['degenerate_faces'] = face_count - len(bm.faces)
+
+    if remove_loose and not loose_verts_only:
+        # Loose faces are faces that don't share an edge with any other face.
+        loose_faces = [f for f in bm.faces if all(len(e.link_faces) == 1 for e in f.edges)]
+        if loose_faces:
+            bmesh.ops.delete(bm, geom=loose_faces, context='FACES')
+        report['loose_faces'] = len(loose_faces)
+
+        loose_edges = [e for e in bm.edges if not e.link_faces]
+        if loose_edges:
+            bmesh.ops.delete(bm, geom=loose_edges, context='EDGES')
+        report['loose_edges'] = len(loose_edges)
+
+    if remove_loose:
+        loose_verts = [v for v in bm.verts if not v.link_edges]
+        if loose_verts:
+            bmesh.ops.delete(bm, geom=loose_verts, context='VERTS')
+        report['loose_verts'] = len(loose_verts)
+
+    if recalculate_normals:
+        bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
+
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
+
+    report['seconds'] = time.perf_counter() - start_time
+    return report
+
+def clean_mesh_objects(objects, **clean_settings):
+    '''Cleans all provided mesh objects, cleaning meshes shared by multiple objects only once. Returns a report per object name.'''
+    reports = {}
+    cleaned_meshes = set()
+    for obj in objects:
+        if obj.type != 'MESH' or obj.data in cleaned_meshes:
+            continue
+        cleaned_meshes.add(obj.data)
+
+        report = clean_mesh_object(obj, **clean_settings)
+        reports[obj.name] = report
+        rylog.log("Cleaned {0} in {1:.3f}s: merged {2} vertices, removed {3} degenerate faces, {4} loose faces, {5} loose edges, {6} loose vertices.".format(
+            obj.name,
+            report['seconds'],
+            report['merged_verts'],
+            report['degenerate_faces'],
+            report['loose_faces'],
+            report['loose_edges'],
+            report['loose_verts']
+        ))
+    return reports
+
+def orient_fill_faces(bm, fill_faces, boundary_edges):
+    '''Flips the provided newly filled faces if their winding doesn't match the faces surrounding the hole they fill.'''
+    fill_face_set = set(fill_faces)
+    for edge in boundary_edges:
+        existing_faces = [f for f in edge.link_faces if f not in fill_face_set]
+        new_faces = [f for f in edge.link_faces if f in fill_face_set]
+        if not existing_faces or not new_faces:
+            continue
+
+        # Consistently wound neighbouring faces traverse their shared edge in opposite directions.
+        existing_start = [loop.vert for loop in existing_faces[0].loops if loop.edge == edge][0]
+        new_start = [loop.vert for loop in new_faces[0].loops if loop.edge == edge][0]
+        if existing_start == new_start:
+            bmesh.ops.reverse_faces(bm, faces=fill_faces)
+        return
+
+def fill_mesh_holes(mesh, max_perimeter=0.0, triangulate_above=8):
+    '''Fills closed boundary loops (holes) in the provided mesh. Holes with more sides than the provided limit are triangle filled, holes with a perimeter larger than the provided maximum (if above 0) are skipped. Returns a report of filled and skipped hole sizes.'''
+    report = {'filled': [], 'skipped': []}
+
+    # Boundary edges are used by exactly one face.
+    boundary_edges = np.flatnonzero(internal_utils.get_edge_face_counts(mesh) == 1)
+    if len(boundary_edges) == 0:
+        return report
+
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    edge_vertices = edge_vertices.reshape(-1, 2)[boundary_edges]
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+    edge_lengths = np.linalg.norm(positions[edge_vertices[:, 0]] - positions[edge_vertices[:, 1]], axis=1)
+
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bm.edges.ensure_lookup_table()
+
+    for chain_vertices, chain_edges, is_closed in internal_utils.get_edge_chains(edge_vertices):
+        if not is_closed:
+            continue
+
+        hole_size = len(chain_edges)
+        perimeter = float(edge_lengths[chain_edges].sum())
+        if max_perimeter > 0 and perimeter > max_perimeter:
+            report['skipped'].append(hole_size)
+            continue
+
+        hole_edges = [bm.edges[int(boundary_edges[edge_row])] for edge_row in chain_edges]
+        if hole_size > triangulate_above:
+            result = bmesh.ops.triangle_fill(bm, use_beauty=True, use_dissolve=False, edges=hole_edges)
+            fill_faces = [element for element in result['geom'] if isinstance(element, bmesh.types.BMFace)]
+        else:
+            fill_faces = bmesh.ops.holes_fill(bm, edges=hole_edges, sides=0)['faces']
+
+        if fill_faces:
+            orient_fill_faces(bm, fill_faces, hole_edges)
+            report['filled'].append(hole_size)
+
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
+    return report
+
+def get_mesh_arrays(mesh):
+    '''Returns the geometry, attribute and normal arrays which fully describe the provided mesh, in a fixed order.'''
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    arrays = [positions, edge_vertices, corner_verts, loop_starts]
+
+    # Attributes include uv maps, materials indices, sharp edges and faces, creases and color attributes.
+    for attribute in sorted(internal_utils.get_copyable_attributes(mesh), key=lambda attribute: attribute.name):
+        arrays.append(internal_utils.get_attribute_array(attribute))
+
+    # Custom split normals aren't stored as an attribute.
+    if mesh.has_custom_normals:
+        mesh.calc_normals_split()
+        corner_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        mesh.loops.foreach_get("normal", corner_normals)
+        arrays.append(corner_normals)
+    return arrays
+
+def get_mesh_signature(mesh):
+    '''Returns a key shared by meshes which are likely identical (element counts, attribute layout, materials and smoothing settings).'''
+    return (
+        len(mesh.vertices),
+        len(mesh.edges),
+        len(mesh.loops),
+        len(mesh.polygons),
+        tuple(sorted((attribute.name, attribute.domain, attribute.data_type) for attribute in internal_utils.get_copyable_attributes(mesh))),
+        tuple(material.name if material else "" for material in mesh.materials),
+        mesh.use_auto_smooth,
+        round(mesh.auto_smooth_angle, 6),
+        mesh.has_custom_normals
+    )
+
+def get_arrays_hash(arrays):
+    '''Returns a hash of the contents of the provided arrays.'''
+    arrays_hash = 0
+    for array in arrays:
+        arrays_hash = zlib.crc32(np.ascontiguousarray(array), arrays_hash)
+    return arrays_hash
+
+def arrays_equal(first_arrays, second_arrays):
+    '''Returns true if all provided arrays are exactly equal.'''
+    return len(first_arrays) == len(second_arrays) and all(np.array_equal(first, second) for first, second in zip(first_arrays, second_arrays))
+
+def can_dedupe_mesh_object(obj):
+    '''Returns true if the mesh of the provided object can be shared with other objects. Meshes with shape keys or vertex groups are skipped because their extra data isn't compared.'''
+    return obj.type == 'MESH' and obj.mode == 'OBJECT' and not obj.data.shape_keys and not obj.vertex_groups and not obj.data.library
+
+def find_duplicate_meshes(objects):
+    '''Groups the meshes of the provided objects into clusters of exactly identical meshes. Returns a list of (shared mesh, objects using an identical mesh) for clusters with more than one mesh.'''
+    clusters = {}
+    mesh_arrays = {}
+    for obj in objects:
+        if not can_dedupe_mesh_object(obj):
+            continue
+        mesh = obj.data
+        if mesh not in mesh_arrays:
+            mesh_arrays[mesh] = get_mesh_arrays(mesh)
+
+        # Meshes with the same signature and hash are confirmed with an exact comparison before being clustered.
+        candidates = clusters.setdefault((get_mesh_signature(mesh), get_arrays_hash(mesh_arrays[mesh])), [])
+        for shared_mesh, cluster_objects in candidates:
+            if shared_mesh == mesh or arrays_equal(mesh_arrays[shared_mesh], mesh_arrays[mesh]):
+                cluster_objects.append(obj)
+                break
+        else:
+            candidates.append((mesh, [obj]))
+
+    duplicate_clusters = []
+    for candidates in clusters.values():
+        for shared_mesh, cluster_objects in candidates:
+            if len({obj.data for obj in cluster_objects}) > 1:
+                duplicate_clusters.append((shared_mesh, cluster_objects))
+    return duplicate_clusters, mesh_arrays
+
+def convert_cluster_to_instances(shared_mesh, cluster_objects):
+    '''Replaces the provided objects sharing a mesh with collection instances of a single object using that mesh. Objects with modifiers, children or a parent are kept as they are. Returns the objects replaced.'''
+    instanced_objects = [obj for obj in cluster_objects if not obj.modifiers and not obj.children and not obj.parent]
+    if len(instanced_objects) < 2:
+        return []
+
+    instance_collection = bpy.data.collections.new("{0}_Instance".format(shared_mesh.name))
+    instance_source = bpy.data.objects.new(shared_mesh.name, shared_mesh)
+    for slot_index, material_slot in enumerate(instanced_objects[0].material_slots):
+        if material_slot.link == 'OBJECT':
+            instance_source.material_slots[slot_index].link = 'OBJECT'
+            instance_source.material_slots[slot_index].material = material_slot.material
+    instance_collection.objects.link(instance_source)
+
+    instance_objects = []
+    for obj in instanced_objects:
+        instance_object = bpy.data.objects.new(obj.name, None)
+        instance_object.instance_type = 'COLLECTION'
+        instance_object.instance_collection = instance_collection
+        internal_utils.link_object_like(instance_object, obj)
+        instance_objects.append((instance_object, obj.name))
+    bpy.data.batch_remove(instanced_objects)
+
+    # Instances take the names of the objects they replace once those are removed.
+    for instance_object, object_name in instance_objects:
+        instance_object.name = object_name
+    return instance_objects
+
+def dedupe_meshes(objects, convert_to_instances=False):
+    '''Relinks objects using identical copies of a mesh to a single shared mesh and removes the unused copies, optionally converting clusters to collection instances. Returns the number of meshes removed, objects instanced and the approximate bytes reclaimed.'''
+    duplicate_clusters, mesh_arrays = find_duplicate_meshes(objects)
+
+    removed_meshes = set()
+    instanced_count = 0
+    for shared_mesh, cluster_objects in duplicate_clusters:
+        for obj in cluster_objects:
+            if obj.data != shared_mesh:
+                duplicate_mesh = obj.data
+                obj.data = shared_mesh
+                if duplicate_mesh.users == 0:
+                    removed_meshes.add(duplicate_mesh)
+
+        if convert_to_instances:
+            instanced_count += len(convert_cluster_to_instances(shared_mesh, cluster_objects))
+
+        rylog.log("Shared mesh {0} between {1} objects.".format(shared_mesh.name, len(cluster_objects)))
+
+    reclaimed_bytes = sum(sum(array.nbytes for array in mesh_arrays[mesh]) for mesh in removed_meshes)
+    removed_count = len(removed_meshes)
+    if removed_meshes:
+        bpy.data.batch_remove(removed_meshes)
+    return removed_count, instanced_count, reclaimed_bytes
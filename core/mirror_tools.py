@@ -0,0 +1,350 @@
+# This module contains the mirror bake engine, which realizes mirror modifiers directly in mesh data with NumPy (reflecting, flipping winding and welding the seam) without evaluating the rest of the modifier stack.
+
+import bpy
+import bmesh
+import mathutils
+from mathutils.kdtree import KDTree
+import numpy as np
+from ..core import internal_utils
+from ..core import modifiers
+
+def get_mirror_plane(obj, axis_index, mirror_object=None):
+    '''Returns the point and normal (in the provided object's local space) of the mirror plane for the provided axis, optionally relative to a mirror object.'''
+    if mirror_object:
+        mirror_matrix = obj.matrix_world.inverted() @ mirror_object.matrix_world
+        plane_normal = mirror_matrix.to_3x3().col[axis_index].normalized()
+        return mirror_matrix.translation.copy(), plane_normal
+
+    plane_normal = mathutils.Vector((0.0, 0.0, 0.0))
+    plane_normal[axis_index] = 1.0
+    return mathutils.Vector((0.0, 0.0, 0.0)), plane_normal
+
+def bisect_mesh(mesh, plane_point, plane_normal, flip=False, tolerance=0.000001):
+    '''Cuts the provided mesh along the provided plane, removing geometry behind the plane (or in front of it when flipped).'''
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bmesh.ops.bisect_plane(
+        bm,
+        geom=bm.verts[:] + bm.edges[:] + bm.faces[:],
+        dist=tolerance,
+        plane_co=plane_point,
+        plane_no=plane_normal,
+        clear_inner=not flip,
+        clear_outer=flip
+    )
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
+
+def get_seam_welds(positions, reflected_positions, plane_distances, merge_threshold):
+    '''Returns the original vertex each reflected vertex welds to (-1 for reflected vertices which stay separate). Only vertices close to the mirror plane are tested, using a kd-tree.'''
+    welds = np.full(len(positions), -1, dtype=np.int64)
+    seam_candidates = np.flatnonzero(np.abs(plane_distances) <= merge_threshold)
+    if len(seam_candidates) == 0:
+        return welds
+
+    kd_tree = KDTree(len(seam_candidates))
+    for candidate in seam_candidates:
+        kd_tree.insert(positions[candidate], int(candidate))
+    kd_tree.balance()
+
+    for candidate in seam_candidates:
+        location, nearest_vertex, distance = kd_tree.find(reflected_positions[candidate])
+        if nearest_vertex is not None and distance <= merge_threshold:
+            welds[candidate] = nearest_vertex
+    return welds
+
+def get_flipped_corner_sources(loop_starts, loop_totals):
+    '''Returns the source corner of every corner of the provided faces with flipped winding, with the flipped faces written one after another. Each flipped face keeps its first corner and reverses the rest.'''
+    corner_faces = np.repeat(np.arange(len(loop_starts)), loop_totals)
+    flipped_starts = np.cumsum(loop_totals) - loop_totals
+    corner_offsets = np.arange(loop_totals.sum()) - flipped_starts[corner_faces]
+    face_sizes = loop_totals[corner_faces]
+    return loop_starts[corner_faces] + (face_sizes - corner_offsets) % face_sizes
+
+def get_corner_normals(mesh):
+    '''Returns the custom split normal of every face corner of the provided mesh, or None if the mesh has no custom normals.'''
+    if not mesh.has_custom_normals:
+        return None
+    mesh.calc_normals_split()
+    corner_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    mesh.loops.foreach_get("normal", corner_normals)
+    return corner_normals.reshape(-1, 3)
+
+def mirror_mesh(mesh, plane_point, plane_normal, use_merge=True, merge_threshold=0.001):
+    '''Adds the reflection of the provided mesh across the provided plane (with flipped winding) to the mesh, welding seam vertices within the merge threshold. Geometry is rewritten in place, so settings stored on the mesh (auto smooth, texture space, materials) are kept. Attributes, seams and custom normals are copied to the reflected geometry, faces lying on the mirror plane aren't duplicated. Returns the source vertex of every vertex and the index of the first reflected vertex.'''
+    vertex_count = len(mesh.vertices)
+    edge_count = len(mesh.edges)
+    corner_count = len(mesh.loops)
+    face_count = len(mesh.polygons)
+
+    positions = np.empty(vertex_count * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+    edge_vertices = np.empty(edge_count * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    edge_vertices = edge_vertices.reshape(-1, 2)
+    edge_seams = np.empty(edge_count, dtype=bool)
+    mesh.edges.foreach_get("use_seam", edge_seams)
+    corner_verts = np.empty(corner_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    loop_starts = np.empty(face_count, dtype=np.int32)
+    loop_totals = np.empty(face_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+
+    # Reflect positions across the plane: p - 2 * ((p - plane point) . n) * n.
+    plane_point = np.array(plane_point, dtype=np.float64)
+    plane_normal = np.array(plane_normal, dtype=np.float64)
+    plane_distances = (positions - plane_point) @ plane_normal
+    reflected_positions = positions - 2.0 * plane_distances[:, np.newaxis] * plane_normal
+
+    # Reflected vertices welded to the seam reuse the original vertex, all others are appended after the original vertices.
+    if use_merge:
+        welds = get_seam_welds(positions, reflected_positions, plane_distances, merge_threshold)
+    else:
+        welds = np.full(vertex_count, -1, dtype=np.int64)
+    new_vertices = np.flatnonzero(welds == -1)
+    vertex_map = welds.copy()
+    vertex_map[new_vertices] = vertex_count + np.arange(len(new_vertices))
+
+    # Reflected edges made of only welded vertices already exist on the seam.
+    reflected_edges = vertex_map[edge_vertices]
+    reflected_edge_sources = internal_utils.get_edge_source_indices(edge_vertices, reflected_edges, vertex_count + len(new_vertices))
+    kept_reflected_edges = np.flatnonzero((reflected_edge_sources == -1) & (reflected_edges[:, 0] != reflected_edges[:, 1]))
+
+    # Faces with every vertex welded to itself lie on the mirror plane, their reflection would duplicate them.
+    if face_count > 0:
+        on_plane_faces = np.logical_and.reduceat(vertex_map[corner_verts] == corner_verts, loop_starts)
+    else:
+        on_plane_faces = np.zeros(0, dtype=bool)
+    reflected_faces = np.flatnonzero(~on_plane_faces)
+    reflected_loop_totals = loop_totals[reflected_faces]
+    flipped_corner_sources = get_flipped_corner_sources(loop_starts[reflected_faces], reflected_loop_totals)
+
+    new_positions = np.concatenate((positions, reflected_positions[new_vertices]))
+    new_edge_vertices = np.concatenate((edge_vertices, reflected_edges[kept_reflected_edges]))
+    new_corner_verts = np.concatenate((corner_verts, vertex_map[corner_verts[flipped_corner_sources]]))
+    new_loop_starts = np.concatenate((loop_starts, corner_count + np.cumsum(reflected_loop_totals) - reflected_loop_totals))
+
+    # Read everything stored per element before the geometry is cleared.
+    attributes = internal_utils.read_attributes(mesh)
+    corner_normals = get_corner_normals(mesh)
+    active_uv_name = mesh.uv_layers.active.name if mesh.uv_layers.active else None
+    render_uv_name = next((uv_layer.name for uv_layer in mesh.uv_layers if uv_layer.active_render), None)
+    active_color_name = mesh.color_attributes.active_color_name
+    default_color_name = mesh.color_attributes.default_color_name
+
+    mesh.clear_geometry()
+    mesh.vertices.add(len(new_positions))
+    mesh.vertices.foreach_set("co", new_positions.astype(np.float32).ravel())
+    mesh.edges.add(len(new_edge_vertices))
+    mesh.edges.foreach_set("vertices", new_edge_vertices.astype(np.int32).ravel())
+    mesh.loops.add(len(new_corner_verts))
+    mesh.loops.foreach_set("vertex_index", new_corner_verts.astype(np.int32))
+    mesh.polygons.add(len(new_loop_starts))
+    mesh.polygons.foreach_set("loop_start", new_loop_starts.astype(np.int32))
+    mesh.update(calc_edges=True)
+
+    # Existing edges are kept in order by the edge calculation, so edge sources can be matched against the edges written above. Edges without a source get default values.
+    new_mesh_edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", new_mesh_edges)
+    edge_matches = internal_utils.get_edge_source_indices(new_edge_vertices, new_mesh_edges.reshape(-1, 2), len(new_positions))
+    written_edge_sources = np.concatenate((np.arange(edge_count), kept_reflected_edges))
+    edge_sources = np.where(edge_matches >= 0, written_edge_sources[np.maximum(edge_matches, 0)], -1)
+
+    vertex_sources = np.concatenate((np.arange(vertex_count), new_vertices))
+    corner_sources = np.concatenate((np.arange(corner_count), flipped_corner_sources))
+    internal_utils.write_attributes(mesh, attributes, {
+        'POINT': vertex_sources,
+        'EDGE': edge_sources,
+        'FACE': np.concatenate((np.arange(face_count), reflected_faces)),
+        'CORNER': corner_sources
+    })
+    mesh.edges.foreach_set("use_seam", np.where(edge_sources >= 0, edge_seams[np.maximum(edge_sources, 0)], False))
+
+    if active_uv_name in mesh.uv_layers:
+        mesh.uv_layers.active = mesh.uv_layers[active_uv_name]
+    if render_uv_name in mesh.uv_layers:
+        mesh.uv_layers[render_uv_name].active_render = True
+    if active_color_name in mesh.color_attributes:
+        mesh.color_attributes.active_color_name = active_color_name
+    if default_color_name in mesh.color_attributes:
+        mesh.color_attributes.default_color_name = default_color_name
+
+    # Custom normals of reflected corners are reflected across the plane as well.
+    if corner_normals is not None:
+        new_corner_normals = corner_normals[corner_sources].astype(np.float64)
+        reflected_normals = new_corner_normals[corner_count:]
+        reflected_normals -= 2.0 * (reflected_normals @ plane_normal)[:, np.newaxis] * plane_normal
+        mesh.normals_split_custom_set(new_corner_normals.astype(np.float32))
+
+    mesh.update()
+    internal_utils.bump_mesh_revision(mesh)
+    return vertex_sources, vertex_count
+
+def get_vertex_group_weights(obj):
+    '''Returns the (group index, weight) pairs of every weighted vertex of the provided object, keyed by vertex index.'''
+    vertex_weights = {}
+    if not obj.vertex_groups:
+        return vertex_weights
+
+    # Vertex group weights aren't exposed as attributes, so they are read per vertex.
+    for vertex in obj.data.vertices:
+        if vertex.groups:
+            vertex_weights[vertex.index] = [(group_element.group, group_element.weight) for group_element in vertex.groups]
+    return vertex_weights
+
+def apply_vertex_group_weights(obj, source_weights, vertex_sources, reflected_start, use_mirror_vertex_groups=True):
+    '''Writes the provided source vertex group weights to every vertex of the provided object's new mesh, flipping group names (e.g. 'Arm.L' to 'Arm.R') for reflected vertices when enabled. Vertices sharing a group and weight are written in a single call.'''
+    group_names = [group.name for group in obj.vertex_groups]
+    weights_by_group = {}
+    for vertex_index, source_vertex in enumerate(vertex_sources):
+        for group_index, weight in source_weights.get(int(source_vertex), []):
+            group_name = group_names[group_index]
+            if vertex_index >= reflected_start and use_mirror_vertex_groups:
+                group_name = bpy.utils.flip_name(group_name)
+            weights_by_group.setdefault((group_name, weight), []).append(vertex_index)
+
+    for (group_name, weight), vertex_indices in weights_by_group.items():
+        vertex_group = obj.vertex_groups.get(group_name) or obj.vertex_groups.new(name=group_name)
+        vertex_group.add(vertex_indices, weight, 'REPLACE')
+
+def bake_mirror(obj, axes, bisect_axes=(False, False, False), flip_axes=(False, False, False), use_merge=True, merge_threshold=0.001, mirror_object=None, use_mirror_vertex_groups=True):
+    '''Realizes a mirror across every enabled axis of the provided mesh object directly in its mesh data, in axis order like the mirror modifier.'''
+    for axis_index in range(3):
+        if not axes[axis_index]:
+            continue
+
+        plane_point, plane_normal = get_mirror_plane(obj, axis_index, mirror_object)
+        if bisect_axes[axis_index]:
+            bisect_mesh(obj.data, plane_point, plane_normal, flip_axes[axis_index])
+
+        source_weights = get_vertex_group_weights(obj)
+        vertex_sources, reflected_start = mirror_mesh(obj.data, plane_point, plane_normal, use_merge, merge_threshold)
+        if source_weights:
+            apply_vertex_group_weights(obj, source_weights, vertex_sources, reflected_start, use_mirror_vertex_groups)
+
+def bake_mirror_modifier(obj, mirror_modifier=None):
+    '''Realizes the provided (or first) mirror modifier of the provided object in its mesh data and removes the modifier, without evaluating the rest of the modifier stack. Returns false if the object has no mirror modifier, its mesh has multiple users or its mesh has shape keys (which aren't mirrored).'''
+    if mirror_modifier is None:
+        mirror_modifier = modifiers.get_modifier_of_type(obj.modifiers, 'MIRROR')
+    if not mirror_modifier or obj.data.users != 1 or obj.data.shape_keys:
+        return False
+
+    bake_mirror(
+        obj,
+        tuple(mirror_modifier.use_axis),
+        tuple(mirror_modifier.use_bisect_axis),
+        tuple(mirror_modifier.use_bisect_flip_axis),
+        mirror_modifier.use_mirror_merge,
+        mirror_modifier.merge_threshold,
+        mirror_modifier.mirror_object,
+        mirror_modifier.use_mirror_vertex_groups
+    )
+    obj.modifiers.remove(mirror_modifier)
+    return True
+
+# Symmetry maps keyed by mesh pointer, each entry holds the key (mesh revision, element counts, axis and tolerance) the map was built for.
+_symmetry_map_cache = {}
+MAX_CACHED_SYMMETRY_MAPS = 16
+
+def get_position_keys(quantized_positions):
+    '''Returns an integer hash key for every row of the provided quantized positions. Keys can collide, matches must be verified against the positions.'''
+    quantized_positions = quantized_positions.astype(np.int64)
+    return (quantized_positions[:, 0] * 73856093) ^ (quantized_positions[:, 1] * 19349663) ^ (quantized_positions[:, 2] * 83492791)
+
+def build_symmetry_map(positions, axis_index, tolerance=0.001):
+    '''Returns the index of the vertex mirroring every provided vertex position across the provided local axis (-1 where no vertex is within the tolerance).'''
+    vertex_count = len(positions)
+    reflected_positions = positions.copy()
+    reflected_positions[:, axis_index] *= -1
+    symmetry_map = np.full(vertex_count, -1, dtype=np.int32)
+    if vertex_count == 0:
+        return symmetry_map
+
+    # Exact matches are found by hashing positions snapped to a grid of the tolerance size.
+    quantized_positions = np.round(positions / tolerance).astype(np.int64)
+    quantized_reflections = np.round(reflected_positions / tolerance).astype(np.int64)
+    position_keys = get_position_keys(quantized_positions)
+    reflection_keys = get_position_keys(quantized_reflections)
+    key_order = np.argsort(position_keys, kind='stable')
+    sorted_keys = position_keys[key_order]
+    matches = key_order[np.clip(np.searchsorted(sorted_keys, reflection_keys), 0, vertex_count - 1)]
+    is_match = (position_keys[matches] == reflection_keys) & np.all(quantized_positions[matches] == quantized_reflections, axis=1)
+    symmetry_map[is_match] = matches[is_match]
+
+    # Vertices snapped to neighbouring grid cells are matched with a kd-tree of the remaining unmatched vertices.
+    unmatched_vertices = np.flatnonzero(symmetry_map == -1)
+    if len(unmatched_vertices) > 0:
+        kd_tree = KDTree(len(unmatched_vertices))
+        for vertex_index in unmatched_vertices:
+            kd_tree.insert(positions[vertex_index], int(vertex_index))
+        kd_tree.balance()
+        for vertex_index in unmatched_vertices:
+            location, nearest_vertex, distance = kd_tree.find(reflected_positions[vertex_index])
+            if nearest_vertex is not None and distance <= tolerance:
+                symmetry_map[vertex_index] = nearest_vertex
+    return symmetry_map
+
+def get_symmetry_map(mesh, axis_index, tolerance=0.001):
+    '''Returns the symmetry map of the provided mesh across the provided local axis and its asymmetry score (the fraction of vertices without a mirror). Maps are cached per mesh revision.'''
+    cache_key = (internal_utils.get_mesh_revision(mesh), len(mesh.vertices), len(mesh.edges), len(mesh.polygons), axis_index, tolerance)
+    cached = _symmetry_map_cache.get(mesh.original.as_pointer())
+    if cached and cached[0] == cache_key:
+        return cached[1], cached[2]
+
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    symmetry_map = build_symmetry_map(positions.reshape(-1, 3), axis_index, tolerance)
+    asymmetry_score = float(np.count_nonzero(symmetry_map == -1)) / max(len(symmetry_map), 1)
+
+    if len(_symmetry_map_cache) >= MAX_CACHED_SYMMETRY_MAPS:
+        _symmetry_map_cache.clear()
+    _symmetry_map_cache[mesh.original.as_pointer()] = (cache_key, symmetry_map, asymmetry_score)
+    return symmetry_map, asymmetry_score
+
+def select_asymmetric_vertices(mesh, axis_index, tolerance=0.001):
+    '''Selects all vertices of the provided mesh without a mirrored vertex across the provided axis, deselecting everything else. Returns the number of vertices selected.'''
+    symmetry_map, asymmetry_score = get_symmetry_map(mesh, axis_index, tolerance)
+    vertex_selection = symmetry_map == -1
+
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    edge_selection = vertex_selection[edge_vertices.reshape(-1, 2)].all(axis=1)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    if len(loop_starts) > 0:
+        face_selection = np.minimum.reduceat(vertex_selection[corner_verts], loop_starts)
+    else:
+        face_selection = np.zeros(0, dtype=bool)
+
+    mesh.vertices.foreach_set("select", vertex_selection)
+    mesh.edges.foreach_set("select", edge_selection)
+    mesh.polygons.foreach_set("select", face_selection)
+    mesh.update()
+    return int(np.count_nonzero(vertex_selection))
+
+def symmetrize_positions(mesh, axis_index, tolerance=0.001, flip=False):
+    '''Moves every vertex on the negative side of the provided axis (positive side when flipped) to the reflected position of its mirrored vertex, and snaps vertices mirroring themselves onto the mirror plane. Returns the number of vertices moved.'''
+    symmetry_map, asymmetry_score = get_symmetry_map(mesh, axis_index, tolerance)
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+
+    source_side = positions[:, axis_index] < 0 if flip else positions[:, axis_index] > 0
+    sources = np.flatnonzero((symmetry_map != -1) & source_side & (symmetry_map != np.arange(len(symmetry_map))))
+    targets = symmetry_map[sources]
+    reflected_sources = positions[sources].copy()
+    reflected_sources[:, axis_index] *= -1
+    positions[targets] = reflected_sources
+
+    centered_vertices = np.flatnonzero(symmetry_map == np.arange(len(symmetry_map)))
+    positions[centered_vertices, axis_index] = 0.0
+
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.update()
+    internal_utils.bump_mesh_revision(mesh)
+    return len(targets) + len(centered_vertices)
@@ -1,13 +1,25 @@
 import bpy
 from bpy.types import Operator, PropertyGroup
-from bpy.props import StringProperty, IntProperty, FloatProperty
+from bpy.props import StringProperty, IntProperty, FloatProperty, BoolProperty, EnumProperty
 import blf
 import gpu
 import bmesh
+import mathutils
+import numpy as np
+from bpy_extras import view3d_utils
 from gpu_extras.batch import batch_for_shader
 from ..core import modifiers
+from ..core import booleans
 from ..core import internal_utils
+from ..core import lod_tools
+from ..core import mesh_analysis
+from ..core import mesh_cleanup
+from ..core import mirror_tools
+from ..core import retopology_tools
 from ..core import rylog
+from ..core import transform_tools
+from ..core import uv_tools
+from ..core import viewport_lod
 
 def toggle_retopology_snapping(self, context):
     if context.scene.retopology_snapping_toggle:
@@ -126,7 +138,12 @@ def delete_vertices_past_axis(mesh_object, axis, flip_axis=False, bisect=True):
             bpy.ops.mesh.bisect(plane_co=(0.0, 0.0, 0.0), plane_no=(0.0, 0.0, 1.0), use_fill=False, clear_inner=False, clear_outer=False, threshold=0.000001, xstart=0, xend=0, ystart=0, yend=0, flip=False, cursor=5)
 
     bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-    bpy.ops.object.modifier_apply(modifier="Mirror")
+
+    # Meshes the mirror bake engine can't handle (e.g. with shape keys) apply the modifier instead.
+    if not mirror_tools.bake_mirror_modifier(mesh_object):
+        mirror_modifier = modifiers.get_modifier_of_type(mesh_object.modifiers, 'MIRROR')
+        if mirror_modifier:
+            bpy.ops.object.modifier_apply(modifier=mirror_modifier.name)
 
     # Delete all vertices past the provided axis.
     bpy.ops.object.mode_set(mode='EDIT', toggle=False)
@@ -178,6 +195,79 @@ class RyModel_DeleteVerticesPastAxis(Operator):
         
         return {'FINISHED'}
 
+class RyModel_BakeMirror(Operator):
+    bl_idname = "rymodel.bake_mirror"
+    bl_label = "Bake Mirror"
+    bl_description = "Realizes the mirror modifier of all selected objects directly in their mesh data (respecting mirror axes, bisect, flip and merge settings) without evaluating the rest of the modifier stack"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        if not internal_utils.verify_active_mesh(self):
+            return {'FINISHED'}
+
+        original_mode = bpy.context.mode
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        objects = list(context.selected_objects)
+        if context.active_object not in objects:
+            objects.append(context.active_object)
+
+        baked_objects = [obj for obj in objects if obj.type == 'MESH' and mirror_tools.bake_mirror_modifier(obj)]
+
+        internal_utils.set_object_interaction_mode(original_mode)
+        update_mirror_properties()
+        if not baked_objects:
+            rylog.log_status("No single user mesh without shape keys and with a mirror modifier selected.", self, 'ERROR')
+        else:
+            rylog.log_status("Baked mirror modifiers on {0} objects.".format(len(baked_objects)), self, 'INFO')
+        return {'FINISHED'}
+
+AXIS_INDICES = {'X': 0, 'Y': 1, 'Z': 2}
+
+class RyModel_SelectAsymmetricVertices(Operator):
+    bl_idname = "rymodel.select_asymmetric_vertices"
+    bl_label = "Select Asymmetric Vertices"
+    bl_description = "Selects all vertices of the active object without a mirrored vertex across the provided local axis"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    axis: StringProperty(default='X')
+    tolerance: FloatProperty(name="Tolerance", description="Maximum distance between a vertex and the reflection of its mirrored vertex", default=0.001, min=0.000001, soft_max=0.1, unit='LENGTH')
+
+    def execute(self, context):
+        if not internal_utils.verify_active_mesh(self):
+            return {'FINISHED'}
+
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+        mesh = context.active_object.data
+        selected_count = mirror_tools.select_asymmetric_vertices(mesh, AXIS_INDICES.get(self.axis, 0), self.tolerance)
+
+        bpy.context.tool_settings.mesh_select_mode = (True, False, False)
+        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+        rylog.log_status("Selected {0} asymmetric vertices on the {1} axis.".format(selected_count, self.axis), self, 'INFO')
+        return {'FINISHED'}
+
+class RyModel_SymmetrizePositions(Operator):
+    bl_idname = "rymodel.symmetrize_positions"
+    bl_label = "Symmetrize Positions"
+    bl_description = "Moves the vertices on one side of the provided local axis to mirror their matching vertices on the other side. Topology is not changed, vertices without a mirrored vertex are left as they are"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    axis: StringProperty(default='X')
+    tolerance: FloatProperty(name="Tolerance", description="Maximum distance between a vertex and the reflection of its mirrored vertex", default=0.001, min=0.000001, soft_max=0.1, unit='LENGTH')
+    flip: BoolProperty(name="Flip", description="Mirrors the negative side onto the positive side instead", default=False)
+
+    def execute(self, context):
+        if not internal_utils.verify_active_mesh(self):
+            return {'FINISHED'}
+
+        original_mode = bpy.context.mode
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+        moved_count = mirror_tools.symmetrize_positions(context.active_object.data, AXIS_INDICES.get(self.axis, 0), self.tolerance, self.flip)
+        internal_utils.set_object_interaction_mode(original_mode)
+
+        rylog.log_status("Symmetrized {0} vertices on the {1} axis.".format(moved_count, self.axis), self, 'INFO')
+        return {'FINISHED'}
+
 def add_mirror_modifier(axis):
     active_object = bpy.context.active_object
 
@@ -207,27 +297,23 @@ def add_mirror_modifier(axis):
     return mirror_modifier
 
 def set_object_origin(location, self):
+    '''Moves the origin of all selected objects to the provided location without moving the 3D cursor.'''
     original_mode = bpy.context.mode
 
+    objects = list(bpy.context.selected_objects)
     active_object = bpy.context.active_object
-    if active_object:
-        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-        match location:
-            case 'WORLD_ORIGIN':
-                bpy.ops.view3d.snap_cursor_to_center()
-                bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN')
-
-            case 'SELECTED':
-                bpy.ops.view3d.snap_cursor_to_selected()
-                bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN')
-
-            case 'TRUE_CENTER':
-                center = internal_utils.get_object_true_center(active_object)
-                bpy.context.scene.cursor.location = center
-                bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN')
+    if active_object and active_object not in objects:
+        objects.append(active_object)
 
+    if objects:
+        # Mesh data is edited directly, which requires object mode (this also writes edit mode selections to the mesh).
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+        skipped_objects = transform_tools.set_origins(objects, location, edit_mode=original_mode == 'EDIT_MESH')
         internal_utils.set_object_interaction_mode(original_mode)
 
+        if skipped_objects:
+            rylog.log_status("Failed setting origins for: {0}".format(", ".join(obj.name for obj in skipped_objects)), self, 'WARNING')
+
     else:
         self.report({'ERROR'}, "No active object, select an object to reset it's origin.")
 
@@ -264,7 +350,7 @@ class RyModel_SetOriginCenter(Operator):
 class RyModel_CenterAxis(Operator):
     bl_idname = "rymodel.center_axis"
     bl_label = "Center Axis"
-    bl_description = "Centers the selected object on the provided axis"
+    bl_description = "Centers the selected objects on the provided axis"
     bl_options = {'REGISTER', 'UNDO'}
 
     axis: StringProperty(default='X')
@@ -276,19 +362,40 @@ class RyModel_CenterAxis(Operator):
         original_mode = bpy.context.mode
         bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-        match self.axis:
-            case 'X':
-                bpy.context.active_object.location[0] = 0.0
-            case 'Y':
-                bpy.context.active_object.location[1] = 0.0
-            case 'Z':
-                bpy.context.active_object.location[2] = 0.0
-            case _:
-                rylog.log("Error: Invalid axis provided for center axis operator.")
+        axis_index = {'X': 0, 'Y': 1, 'Z': 2}.get(self.axis)
+        if axis_index is None:
+            rylog.log("Error: Invalid axis provided for center axis operator.")
+        else:
+            for obj in set(context.selected_objects) | {context.active_object}:
+                obj.location[axis_index] = 0.0
 
         internal_utils.set_object_interaction_mode(original_mode)
         return {'FINISHED'}
 
+def apply_auto_sharpen(mesh, angle):
+    '''Marks edges sharper than the provided angle as sharp with a full bevel weight, and clears both for all other edges.'''
+    sharp_edges = internal_utils.get_edge_dihedral_angles(mesh) > angle
+
+    sharp_attribute = internal_utils.get_or_create_attribute(mesh, 'sharp_edge', 'BOOLEAN', 'EDGE')
+    sharp_attribute.data.foreach_set('value', sharp_edges)
+
+    bevel_weight_attribute = internal_utils.get_or_create_attribute(mesh, 'bevel_weight_edge', 'FLOAT', 'EDGE')
+    bevel_weight_attribute.data.foreach_set('value', sharp_edges.astype(np.float32))
+
+    mesh.update()
+
+def update_auto_sharpen_angle(self, context):
+    '''Re-thresholds the cached edge angles of the active mesh so changes to the auto sharpen angle preview immediately.'''
+    if not context.scene.auto_sharpen_live_preview:
+        return
+
+    # Mesh data can't be written while in edit mode, the preview only runs in object mode.
+    active_object = context.active_object
+    if not active_object or active_object.type != 'MESH' or context.mode != 'OBJECT':
+        return
+
+    apply_auto_sharpen(active_object.data, context.scene.auto_sharpen_angle)
+
 class RyModel_AutoSharpen(Operator):
     bl_idname = "rymodel.auto_sharpen"
     bl_label = "Auto Sharpen"
@@ -314,17 +421,8 @@ class RyModel_AutoSharpen(Operator):
         bpy.context.object.data.use_auto_smooth = True
         bpy.context.object.data.auto_smooth_angle = 1.0472
 
-        # Clear all sharpening.
-        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.mark_sharp(clear=True)
-
-        # Mark bevel weights and sharpening for detected sharp angles.
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='EDGE')
-        bpy.ops.mesh.edges_select_sharp(sharpness=context.scene.auto_sharpen_angle)
-        bpy.ops.mesh.mark_sharp()
-        bpy.ops.transform.edge_bevelweight(value=1.0, snap=False)
+        # Mark bevel weights and sharpening for detected sharp angles (clears sharpening for all other edges).
+        apply_auto_sharpen(mesh_data, context.scene.auto_sharpen_angle)
 
         internal_utils.set_object_interaction_mode(original_mode)
         return {'FINISHED'}
@@ -362,10 +460,93 @@ class RyModel_AutoSmooth(Operator):
         internal_utils.set_object_interaction_mode(original_mode)
         return {'FINISHED'}
 
+def extract_selected_faces(obj):
+    '''Builds a new mesh object from the selected faces of the provided mesh object (copying attributes, UVs and materials). Returns None if no faces are selected.'''
+    obj.update_from_editmode()
+    mesh = obj.data
+
+    face_selection = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("select", face_selection)
+    if not face_selection.any():
+        return None
+
+    face_sizes = mesh_analysis.get_face_sizes(mesh)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+
+    # Gather the corners of the selected faces and re-index the vertices they use.
+    selected_faces = np.flatnonzero(face_selection)
+    selected_face_sizes = face_sizes[selected_faces]
+    selected_corners = np.flatnonzero(np.repeat(face_selection, face_sizes))
+    used_verts, new_corner_verts = np.unique(corner_verts[selected_corners], return_inverse=True)
+    new_face_starts = np.cumsum(selected_face_sizes) - selected_face_sizes
+
+    new_mesh = bpy.data.meshes.new("{0}_Extracted".format(obj.name))
+    new_mesh.vertices.add(len(used_verts))
+    new_mesh.vertices.foreach_set("co", positions.reshape(-1, 3)[used_verts].ravel())
+    new_mesh.loops.add(len(new_corner_verts))
+    new_mesh.loops.foreach_set("vertex_index", new_corner_verts.astype(np.int32))
+    new_mesh.polygons.add(len(selected_faces))
+    new_mesh.polygons.foreach_set("loop_start", new_face_starts.astype(np.int32))
+    new_mesh.update(calc_edges=True)
+
+    # Match the new edges to their source edges so edge data (sharpness, creases, bevel weights) is kept.
+    source_edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", source_edge_vertices)
+    new_edge_vertices = np.empty(len(new_mesh.edges) * 2, dtype=np.int32)
+    new_mesh.edges.foreach_get("vertices", new_edge_vertices)
+    source_edges = internal_utils.get_edge_source_indices(source_edge_vertices.reshape(-1, 2), used_verts[new_edge_vertices.reshape(-1, 2)], len(mesh.vertices))
+
+    internal_utils.copy_attributes(mesh, new_mesh, {
+        'POINT': used_verts,
+        'EDGE': source_edges,
+        'FACE': selected_faces,
+        'CORNER': selected_corners
+    })
+    for material in mesh.materials:
+        new_mesh.materials.append(material)
+    new_mesh.update()
+
+    new_object = bpy.data.objects.new(new_mesh.name, new_mesh)
+    internal_utils.link_object_like(new_object, obj)
+    return new_object
+
+def extract_selected_edges_to_curve(obj):
+    '''Builds a new curve object with a poly spline for every chain of selected edges in the provided mesh object. Returns None if no edges are selected.'''
+    obj.update_from_editmode()
+    mesh = obj.data
+
+    edge_selection = np.empty(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("select", edge_selection)
+    if not edge_selection.any():
+        return None
+
+    edge_vertices = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_vertices)
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+
+    curve = bpy.data.curves.new("{0}_Curve".format(obj.name), 'CURVE')
+    curve.dimensions = '3D'
+    for chain_vertices, chain_edges, is_closed in internal_utils.get_edge_chains(edge_vertices.reshape(-1, 2)[edge_selection]):
+        spline = curve.splines.new('POLY')
+        spline.points.add(len(chain_vertices) - 1)
+        points = np.ones((len(chain_vertices), 4), dtype=np.float32)
+        points[:, :3] = positions[chain_vertices]
+        spline.points.foreach_set("co", points.ravel())
+        spline.use_cyclic_u = is_closed
+
+    new_object = bpy.data.objects.new(curve.name, curve)
+    internal_utils.link_object_like(new_object, obj)
+    return new_object
+
 class RyModel_ExtractFace(Operator):
     bl_idname = "rymodel.extract_face"
     bl_label = "Extract Face"
-    bl_description = "Separates the selected faces from the object into a new object, and applied a solidify modifier to the new object for thickess"
+    bl_description = "Copies the selected faces from the object into a new object, and applied a solidify modifier to the new object for thickess"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
@@ -373,19 +554,15 @@ class RyModel_ExtractFace(Operator):
             return {'FINISHED'}
         
         if bpy.context.mode != 'EDIT_MESH':
-            return
+            return {'FINISHED'}
         
         if not bpy.context.scene.tool_settings.mesh_select_mode[2]:
-            return
-        
-        bpy.ops.mesh.duplicate_move(MESH_OT_duplicate={"mode":1}, TRANSFORM_OT_translate={"value":(0, 0, 0)})
-
-        bpy.ops.mesh.separate(type='SELECTED')
+            return {'FINISHED'}
 
-        new_object = context.selected_objects[0]
-        if len(context.selected_objects) > 1:
-            if context.selected_objects[0] == new_object:
-                new_object = context.selected_objects[1]
+        new_object = extract_selected_faces(context.active_object)
+        if not new_object:
+            rylog.log_status("Select faces to extract.", self, 'ERROR')
+            return {'FINISHED'}
 
         solidify_modifier = new_object.modifiers.new('Solidify', 'SOLIDIFY')
         solidify_modifier.thickness = 0.1
@@ -400,7 +577,7 @@ class RyModel_ExtractFace(Operator):
 class RyModel_ExtractCurve(Operator):
     bl_idname = "rymodel.extract_curve"
     bl_label = "Extract Curve"
-    bl_description = "Separates the selected edges from the object into a new curve, and applies a default amount of bevel width to the new curve"
+    bl_description = "Copies the selected edges from the object into a new curve, and applies a default amount of bevel width to the new curve"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
@@ -408,209 +585,347 @@ class RyModel_ExtractCurve(Operator):
             return {'FINISHED'}
         
         if bpy.context.mode != 'EDIT_MESH':
-            return
+            return {'FINISHED'}
         
         if not bpy.context.scene.tool_settings.mesh_select_mode[1]:
-            return
-
-        bpy.ops.mesh.duplicate_move(MESH_OT_duplicate={"mode":1}, TRANSFORM_OT_translate={"value":(0, 0, 0), "orient_axis_ortho":'X', "orient_type":'GLOBAL', "orient_matrix":((0, 0, 0), (0, 0, 0), (0, 0, 0)), "orient_matrix_type":'GLOBAL', "constraint_axis":(False, False, False), "mirror":False, "use_proportional_edit":False, "proportional_edit_falloff":'SMOOTH', "proportional_size":1, "use_proportional_connected":False, "use_proportional_projected":False, "snap":False, "snap_elements":{'INCREMENT'}, "use_snap_project":False, "snap_target":'CLOSEST', "use_snap_self":True, "use_snap_edit":True, "use_snap_nonedit":True, "use_snap_selectable":False, "snap_point":(0, 0, 0), "snap_align":False, "snap_normal":(0, 0, 0), "gpencil_strokes":False, "cursor_transform":False, "texture_space":False, "remove_on_cancel":False, "view2d_edge_pan":False, "release_confirm":False, "use_accurate":False, "use_automerge_and_split":False})
-
-        bpy.ops.mesh.separate(type='SELECTED')
+            return {'FINISHED'}
 
-        new_object = context.selected_objects[1]
-        if context.selected_objects[1] == context.active_object:
-            new_object = context.selected_objects[0]
+        new_object = extract_selected_edges_to_curve(context.active_object)
+        if not new_object:
+            rylog.log_status("Select edges to extract.", self, 'ERROR')
+            return {'FINISHED'}
+        new_object.data.bevel_depth = 0.1
 
         bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-        bpy.context.view_layer.objects.active = new_object
-
-        bpy.ops.object.convert(target='CURVE')
-        new_object.data.bevel_depth = 0.1
+        internal_utils.select_only(new_object)
 
         return {'FINISHED'}
 
 class RyModel_SelectNgons(Operator):
     bl_idname = "rymodel.select_ngons"
     bl_label = "Select NGons"
-    bl_description = "Selects all NGons in the active object"
+    bl_description = "Selects all NGons in all selected mesh objects"
     bl_options = {'REGISTER', 'UNDO'}
 
+    enter_edit_mode: BoolProperty(name="Enter Edit Mode", default=True, description="Enters edit mode on the objects containing NGons after selecting them. Objects without NGons are deselected")
+
     def execute(self, context):
-        if not internal_utils.verify_active_mesh(self):
-            return {'FINISHED'}
-        
-        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='FACE')
-        bpy.ops.mesh.select_face_by_sides(number=4, type='EQUAL')
-        bpy.ops.mesh.select_all(action='INVERT')
+        mesh_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not mesh_objects:
+            if not internal_utils.verify_active_mesh(self):
+                return {'FINISHED'}
+            mesh_objects = [context.active_object]
+
+        # Selection is written directly to mesh data, which requires object mode.
+        original_mode = bpy.context.mode
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
+        total_ngons = 0
+        ngon_objects = []
+        for obj in mesh_objects:
+            ngon_count = mesh_analysis.select_ngons(obj.data)
+            stats = mesh_analysis.get_topology_stats(obj.data)
+            rylog.log("{0}: {1} tris, {2} quads, {3} ngons, face sizes {4}".format(obj.name, stats['tris'], stats['quads'], stats['ngons'], stats['histogram']))
+            total_ngons += ngon_count
+            if ngon_count > 0:
+                ngon_objects.append(obj)
+
+        # Edit mode is entered on all selected objects, so objects without NGons are deselected first.
+        if self.enter_edit_mode and ngon_objects:
+            for obj in mesh_objects:
+                obj.select_set(obj in ngon_objects)
+            if context.view_layer.objects.active not in ngon_objects:
+                context.view_layer.objects.active = ngon_objects[0]
+            bpy.context.scene.tool_settings.mesh_select_mode = (False, False, True)
+            bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+        else:
+            internal_utils.set_object_interaction_mode(original_mode)
+
+        rylog.log_status("Selected {0} NGons in {1} object(s).".format(total_ngons, len(mesh_objects)), self, 'INFO')
         return {'FINISHED'}
 
 class RyModel_CleanMesh(Operator):
     bl_idname = "rymodel.clean_mesh"
     bl_label = "Clean Mesh"
-    bl_description = "Applies rotation and scale, removes vertex doubles, loose geometry, and recalculates face and vertex normals to point outside"
+    bl_description = "Applies rotation and scale, removes vertex doubles, degenerate and loose geometry, and recalculates face and vertex normals to point outside for all selected meshes"
     bl_options = {'REGISTER', 'UNDO'}
 
+    active_only: BoolProperty(name="Active Object Only", default=False, description="Cleans only the active object instead of all selected meshes")
+    apply_transform: BoolProperty(name="Apply Rotation & Scale", default=True, description="Applies rotation and scale to the mesh data (skipped for meshes shared by multiple objects)")
+    apply_rotation: BoolProperty(name="Include Rotation", default=True, description="Applies rotation along with scale. When off, only scale is applied")
+    merge_by_distance: BoolProperty(name="Merge By Distance", default=True, description="Merges vertices closer than the merge distance")
+    merge_distance: FloatProperty(name="Merge Distance", default=0.0001, min=0.0, soft_max=0.01, precision=5, description="Maximum distance between vertices that are merged")
+    remove_degenerate: BoolProperty(name="Remove Degenerate", default=True, description="Dissolves zero area faces and zero length edges")
+    remove_loose: BoolProperty(name="Remove Loose", default=True, description="Removes loose faces, edges and vertices")
+    loose_verts_only: BoolProperty(name="Loose Vertices Only", default=False, description="Only removes vertices without edges, keeping loose faces and edges")
+    recalculate_normals: BoolProperty(name="Recalculate Normals", default=True, description="Recalculates face normals to point outside")
+
     def execute(self, context):
-        if not internal_utils.verify_active_mesh(self):
-            return {'FINISHED'}
+        mesh_objects = [] if self.active_only else [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not mesh_objects:
+            if not internal_utils.verify_active_mesh(self):
+                return {'FINISHED'}
+            mesh_objects = [context.active_object]
 
-        # Toggle into edit mode, remember the original mode.
+        # Mesh data is edited directly, which requires object mode.
         original_mode = bpy.context.mode
-
         bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-        bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
 
+        reports = mesh_cleanup.clean_mesh_objects(
+            mesh_objects,
+            apply_transform=self.apply_transform,
+            apply_rotation=self.apply_rotation,
+            merge_by_distance=self.merge_by_distance,
+            merge_distance=self.merge_distance,
+            remove_degenerate=self.remove_degenerate,
+            remove_loose=self.remove_loose,
+            loose_verts_only=self.loose_verts_only,
+            recalculate_normals=self.recalculate_normals
+        )
 
-        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+        # Toggle back into the original mode.
+        internal_utils.set_object_interaction_mode(original_mode)
 
-        # Remove loose faces.
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='FACE')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_loose()
-        bpy.ops.mesh.delete(type='FACE')
+        removed_vertices = sum(report['merged_verts'] + report['loose_verts'] for report in reports.values())
+        total_seconds = sum(report['seconds'] for report in reports.values())
+        rylog.log_status("Cleaned {0} mesh(es) in {1:.2f}s, removed {2} vertices (see console for details).".format(len(reports), total_seconds, removed_vertices), self, 'INFO')
+        return {'FINISHED'}
 
-        # Re-calculate outside.
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.normals_make_consistent(inside=False)
-
-        # Remove loose edges.
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='EDGE')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_loose()
-        bpy.ops.mesh.delete(type='EDGE')
-
-        # Remove loose vertices.
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='VERT')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_loose()
-        bpy.ops.mesh.delete(type='VERT')
-
-        # Remove vertex doubles.
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='VERT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.remove_doubles(threshold=0.0001)
+class RyModel_DedupeMeshes(Operator):
+    bl_idname = "rymodel.dedupe_meshes"
+    bl_label = "Dedupe Meshes"
+    bl_description = "Finds objects in the scene using identical copies of a mesh, relinks them to one shared mesh and removes the unused copies"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    convert_to_instances: BoolProperty(name="Convert To Collection Instances", default=False, description="Replaces objects sharing a mesh (without modifiers, parents or children) with instances of a single collection")
+
+    def execute(self, context):
+        # Mesh data can only be relinked in object mode.
+        original_mode = bpy.context.mode
+        if context.active_object:
+            bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        removed_meshes, instanced_objects, reclaimed_bytes = mesh_cleanup.dedupe_meshes(list(context.scene.objects), self.convert_to_instances)
 
         # Toggle back into the original mode.
-        internal_utils.set_object_interaction_mode(original_mode)
+        if context.active_object:
+            internal_utils.set_object_interaction_mode(original_mode)
 
+        message = "Removed {0} duplicate mesh(es), reclaiming approximately {1:.2f} MB".format(removed_meshes, reclaimed_bytes / (1024 * 1024))
+        if self.convert_to_instances:
+            message += ", converted {0} object(s) to collection instances".format(instanced_objects)
+        rylog.log_status(message + ".", self, 'INFO')
         return {'FINISHED'}
 
 class RyModel_FillNonManifold(Operator):
     bl_idname = "rymodel.fill_non_manifold"
     bl_label = "Fill Non-Manifold"
-    bl_description = "Fills non-manifold geometry"
+    bl_description = "Fills holes (closed boundary loops) in all selected meshes"
     bl_options = {'REGISTER', 'UNDO'}
 
+    max_perimeter: FloatProperty(name="Max Perimeter", default=0.0, min=0.0, soft_max=10.0, unit='LENGTH', description="Holes with a perimeter larger than this are left open. 0 fills holes of any size")
+    triangulate_above: IntProperty(name="Triangulate Above", default=8, min=3, soft_max=64, description="Holes with more sides than this are triangle filled instead of filled with a single NGon")
+
     def execute(self, context):
-        if not internal_utils.verify_active_mesh(self):
-            return {'FINISHED'}
-        
+        mesh_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not mesh_objects:
+            if not internal_utils.verify_active_mesh(self):
+                return {'FINISHED'}
+            mesh_objects = [context.active_object]
+
+        # Mesh data is edited directly, which requires object mode.
         original_mode = bpy.context.mode
-        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='EDGE')
-        bpy.ops.mesh.select_non_manifold()
-        bpy.ops.mesh.edge_face_add()
-        internal_utils.set_object_interaction_mode(original_mode)
-        return {'FINISHED'}
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-def draw_callback_px(self, context):
-    # Draw number of point created.
-    font_id = 0
-    blf.position(font_id, 15, 30, 0)
-    blf.size(font_id, 20, 72)
-    blf.draw(font_id, "Points: {0}".format(len(self.verticies)))
+        filled_holes = []
+        skipped_holes = []
+        for mesh in {obj.data for obj in mesh_objects}:
+            report = mesh_cleanup.fill_mesh_holes(mesh, self.max_perimeter, self.triangulate_above)
+            rylog.log("{0}: filled holes with sizes {1}, skipped holes with sizes {2}.".format(mesh.name, report['filled'], report['skipped']))
+            filled_holes += report['filled']
+            skipped_holes += report['skipped']
 
+        internal_utils.set_object_interaction_mode(original_mode)
 
-    render_vertices = []
+        if filled_holes:
+            rylog.log_status("Filled {0} hole(s) with {1} to {2} sides, skipped {3} hole(s) over the perimeter limit.".format(len(filled_holes), min(filled_holes), max(filled_holes), len(skipped_holes)), self, 'INFO')
+        else:
+            rylog.log_status("No holes filled, skipped {0} hole(s) over the perimeter limit.".format(len(skipped_holes)), self, 'INFO')
+        return {'FINISHED'}
 
-    if len(self.verticies) == 1:
-        render_vertices.append(self.verticies[0])
-        render_vertices.append((self.mouse_pos[0], self.mouse_pos[1]))
-        render_vertices.append((self.mouse_pos[0], self.mouse_pos[1]))
+# The shader used to draw shapes is created once and reused for every redraw.
+_draw_shape_shader = None
+
+def get_draw_shape_shader():
+    '''Returns the cached shader used to draw shapes for the draw shape tool.'''
+    global _draw_shape_shader
+    if _draw_shape_shader is None:
+        _draw_shape_shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+    return _draw_shape_shader
+
+def triangulate_polygon(points):
+    '''Triangulates a 2D polygon (an (N, 2) array of points in order) with Blender's polygon tessellator, which runs in C. Returns a list of point index triangles.'''
+    if len(points) < 3:
+        return []
+    return [tuple(triangle) for triangle in mathutils.geometry.tessellate_polygon([[mathutils.Vector((x, y, 0.0)) for x, y in points.tolist()]])]
+
+def draw_shape_callback(self, context):
+    '''Draws the shape being created with the draw shape tool using its cached batches.'''
+    shader = get_draw_shape_shader()
+    shader.bind()
+    gpu.state.blend_set('ALPHA')
 
-    elif len(self.verticies) == 2:
-        render_vertices.append(self.verticies[0])
-        render_vertices.append(self.verticies[1])
-        render_vertices.append((self.mouse_pos[0], self.mouse_pos[1]))
+    if self.fill_batch:
+        shader.uniform_float("color", (1.0, 0.0, 0.0, 0.5))
+        self.fill_batch.draw(shader)
 
-    else:
-        last_tri = []
-        last_tri.append((self.verticies[len(self.verticies) - 2]))
-        last_tri.append((self.verticies[len(self.verticies) - 1]))
-        last_tri.append((self.mouse_pos[0], self.mouse_pos[1]))
+    if self.outline_batch:
+        gpu.state.line_width_set(2.0)
+        shader.uniform_float("color", (1.0, 0.0, 0.0, 1.0))
+        self.outline_batch.draw(shader)
 
-        render_vertices = self.verticies + last_tri
+    # Restore gpu defaults.
+    gpu.state.line_width_set(1.0)
+    gpu.state.blend_set('NONE')
 
+    # Draw the number of points created.
+    font_id = 0
+    blf.position(font_id, 15, 30, 0)
+    blf.size(font_id, 20)
+    blf.draw(font_id, "Points: {0}  (Space: Confirm, Backspace: Undo Point, Esc: Cancel)".format(len(self.points)))
 
-    # Draw the shape to the screen.
-    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-    gpu.state.blend_set('ALPHA')
-    gpu.state.line_width_set(2.0)
-    batch = batch_for_shader(shader, 'TRIS', {"pos": render_vertices})
-    shader.uniform_float("color", (1.0, 0.0, 0.0, 0.5))
-    batch.draw(shader)
+def create_shape_object(context, points, target_object=None):
+    '''Projects the provided region points onto the view plane through the target object (or 3D cursor) and extrudes them along the view direction into a new mesh object.'''
+    region = context.region
+    region_3d = context.region_data
 
-    # restore opengl defaults
-    gpu.state.blend_set('NONE')
+    if target_object:
+        depth_location = internal_utils.get_object_true_center(target_object)
+        depth = max(target_object.dimensions) * 1.25
+    else:
+        depth_location = context.scene.cursor.location
+        depth = 1.0
+    view_direction = region_3d.view_rotation @ mathutils.Vector((0.0, 0.0, -1.0))
+
+    locations = [view3d_utils.region_2d_to_location_3d(region, region_3d, point, depth_location) for point in points.tolist()]
+    origin = sum(locations, mathutils.Vector()) / len(locations)
+
+    # Build the cap face centered on the projection plane, then extrude it through the target.
+    bm = bmesh.new()
+    cap_vertices = [bm.verts.new(location - origin - view_direction * (depth * 0.5)) for location in locations]
+    cap_face = bm.faces.new(cap_vertices)
+    extruded = bmesh.ops.extrude_face_region(bm, geom=[cap_face])
+    extruded_vertices = [element for element in extruded['geom'] if isinstance(element, bmesh.types.BMVert)]
+    bmesh.ops.translate(bm, vec=view_direction * depth, verts=extruded_vertices)
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
+
+    mesh = bpy.data.meshes.new("Shape")
+    bm.to_mesh(mesh)
+    bm.free()
+
+    shape_object = bpy.data.objects.new("Shape", mesh)
+    shape_object.location = origin
+    context.collection.objects.link(shape_object)
+    return shape_object
 
 class RyModel_DrawShape(Operator):
     bl_idname = "rymodel.draw_shape"
     bl_label = "Draw Shape"
     bl_description = "Click to create vertices of a shape, which is automatically extruded and filled. If an object is selected, the new shape will be applied as a boolean object"
+    bl_options = {'REGISTER', 'UNDO'}
 
-    def modal(self, context, event):
-        context.area.tag_redraw()
+    def add_point(self, x, y):
+        '''Adds a point to the shape, then re-triangulates and rebuilds the cached fill batch.'''
+        self.points = np.vstack((self.points, np.array([[x, y]], dtype=np.float32)))
+        self.rebuild_fill_batch()
 
-        if event.type == 'MOUSEMOVE':
-            self.mouse_pos = []
-            self.mouse_pos.append(event.mouse_region_x)
-            self.mouse_pos.append(event.mouse_region_y)
+    def rebuild_fill_batch(self):
+        '''Rebuilds the cached batch used to draw the filled shape.'''
+        triangles = triangulate_polygon(self.points)
+        if triangles:
+            self.fill_batch = batch_for_shader(get_draw_shape_shader(), 'TRIS', {"pos": self.points.tolist()}, indices=triangles)
+        else:
+            self.fill_batch = None
 
-        if event.type == 'LEFTMOUSE':
-            if event.value == 'PRESS':
-                self.verticies.append((event.mouse_region_x, event.mouse_region_y))
+    def rebuild_outline_batch(self):
+        '''Rebuilds the cached batch used to draw the shape outline through the mouse position.'''
+        outline = self.points.tolist() + [self.mouse_position]
+        self.outline_batch = batch_for_shader(get_draw_shape_shader(), 'LINE_LOOP', {"pos": outline})
 
-                # Append the last triangle.
-                if len(self.verticies) > 3:
-                    last_tri = []
-                    last_tri.append((self.verticies[len(self.verticies) - 3]))
-                    last_tri.append((self.verticies[len(self.verticies) - 2]))
-                    last_tri.append((self.mouse_pos[0], self.mouse_pos[1]))
+    def remove_draw_handler(self, context):
+        bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
+        context.area.tag_redraw()
 
-                    self.verticies += last_tri
+    def finish(self, context):
+        '''Creates the drawn shape, and registers it as a boolean cutter when mesh objects are selected.'''
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-                print("-------------------------------------------")
-                print("Mouse clicks: {0}".format(str(self.verticies)))
-                print("Added mouse point: {0},{1}".format(self.mouse_pos[0], self.mouse_pos[1]))
+        target_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        target_object = context.active_object if context.active_object in target_objects else None
+        if target_objects and not target_object:
+            target_object = target_objects[0]
+
+        shape_object = create_shape_object(context, self.points, target_object)
+
+        if target_object:
+            booleans.remove_unused_booleans()
+            booleans.hide_booleans()
+            shape_object.name = booleans.get_new_boolean_name()
+            boolean_modifiers = []
+            for obj in target_objects:
+                boolean_modifiers.append(booleans.add_boolean_mod(obj))
+            booleans.setup_new_boolean(shape_object, target_object, boolean_modifiers, set_location=False)
+        else:
+            internal_utils.select_only(shape_object)
 
-        elif event.type == 'SPACE':
-            bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
+    def modal(self, context, event):
+        context.area.tag_redraw()
+
+        if event.type == 'MOUSEMOVE':
+            self.mouse_position = (event.mouse_region_x, event.mouse_region_y)
+            self.rebuild_outline_batch()
+
+        elif event.type == 'LEFTMOUSE' and event.value == 'PRESS':
+            self.add_point(event.mouse_region_x, event.mouse_region_y)
+
+        elif event.type == 'BACK_SPACE' and event.value == 'PRESS':
+            if len(self.points) > 1:
+                self.points = self.points[:-1]
+                self.rebuild_fill_batch()
+                self.rebuild_outline_batch()
+
+        elif event.type in {'SPACE', 'RET'} and event.value == 'PRESS':
+            self.remove_draw_handler(context)
+            if len(self.points) < 3:
+                self.report({'WARNING'}, "At least 3 points are required to create a shape.")
+                return {'CANCELLED'}
+            self.finish(context)
             return {'FINISHED'}
 
         elif event.type in {'RIGHTMOUSE', 'ESC'}:
-            bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
+            self.remove_draw_handler(context)
             return {'CANCELLED'}
 
+        # Allow navigating the viewport while drawing.
+        elif event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
+            return {'PASS_THROUGH'}
+
         return {'RUNNING_MODAL'}
 
     def invoke(self, context, event):
         if context.area.type == 'VIEW_3D':
-            # the arguments we pass the the callback
-            args = (self, context)
-            # Add the region OpenGL drawing callback
-            # draw in view space with 'POST_VIEW' and 'PRE_VIEW'
-            self._handle = bpy.types.SpaceView3D.draw_handler_add(draw_callback_px, args, 'WINDOW', 'POST_PIXEL')
-
-            self.verticies = []
-            self.mouse_pos = [0, 0]
+            self.points = np.empty((0, 2), dtype=np.float32)
+            self.mouse_position = (event.mouse_region_x, event.mouse_region_y)
+            self.fill_batch = None
+            self.outline_batch = None
 
             # Add the start position.
-            self.verticies.append((event.mouse_region_x, event.mouse_region_y))
-            print("Added mouse start position.")
+            self.add_point(event.mouse_region_x, event.mouse_region_y)
+            self.rebuild_outline_batch()
+
+            # Add the region drawing callback in screen space.
+            args = (self, context)
+            self._handle = bpy.types.SpaceView3D.draw_handler_add(draw_shape_callback, args, 'WINDOW', 'POST_PIXEL')
 
             context.window_manager.modal_handler_add(self)
             return {'RUNNING_MODAL'}
@@ -707,28 +1022,99 @@ class RyModel_3DCursorToFace(Operator):
 class RyModel_AutoSeam(Operator):
     bl_idname = "rymodel.auto_seam"
     bl_label = "Auto Seam"
-    bl_description = "Marks seams for uv unwrapping for the selected object based on the angle geometry"
+    bl_description = "Marks seams for uv unwrapping for all selected objects based on the angle geometry, optionally splitting large uv islands"
     bl_options = {'REGISTER', 'UNDO'}
 
+    angle: FloatProperty(name="Angle", description="Edges sharper than this angle are marked as seams", default=0.523599, min=0, max=3.14159, unit='ROTATION')
+    max_island_faces: IntProperty(name="Max Island Faces", description="Islands with more faces than this are split with additional seams. 0 = no limit", default=0, min=0)
+    clear_existing: BoolProperty(name="Clear Existing Seams", description="Clears existing seams before marking new ones", default=False)
+
     def execute(self, context):
         if not internal_utils.verify_active_mesh(self):
             return {'FINISHED'}
         
         original_mode = bpy.context.mode
-        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.edges_select_sharp()
-        bpy.ops.mesh.mark_seam(clear=False)
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        objects = list(context.selected_objects)
+        if context.active_object not in objects:
+            objects.append(context.active_object)
+        seam_count, island_count = uv_tools.mark_seams_for_objects(objects, self.angle, self.max_island_faces, self.clear_existing)
 
         internal_utils.set_object_interaction_mode(original_mode)
+        rylog.log_status("Marked {0} seams, {1} uv islands.".format(seam_count, island_count), self, 'INFO')
         return {'FINISHED'}
 
+def get_color_grid_image():
+    '''Returns the color grid image, generating it only if it doesn't exist yet.'''
+    color_grid_image = bpy.data.images.get('ColorGrid')
+    if not color_grid_image:
+        color_grid_image = bpy.data.images.new('ColorGrid', width=2048, height=2048, alpha=False)
+        color_grid_image.generated_type = 'COLOR_GRID'
+    return color_grid_image
+
+def get_color_grid_material(procedural=False):
+    '''Returns the color grid material, creating it and its texture node only if they don't exist yet. Procedural color grids use a checker texture node instead of an image.'''
+    material_name = 'ColorGridProcedural' if procedural else 'ColorGrid'
+    color_grid_material = bpy.data.materials.get(material_name)
+    if not color_grid_material:
+        color_grid_material = bpy.data.materials.new(name=material_name)
+        color_grid_material.use_nodes = True
+
+    # Reuse the existing texture node so running the operator again doesn't add duplicate nodes.
+    nodes = color_grid_material.node_tree.nodes
+    texture_node = nodes.get('ColorGridTexture')
+    if not texture_node:
+        if procedural:
+            texture_node = nodes.new('ShaderNodeTexChecker')
+            texture_node.inputs['Scale'].default_value = 16
+            texture_coordinate_node = nodes.new('ShaderNodeTexCoord')
+            texture_coordinate_node.location = (-500, 300)
+            color_grid_material.node_tree.links.new(texture_coordinate_node.outputs['UV'], texture_node.inputs['Vector'])
+        else:
+            texture_node = nodes.new('ShaderNodeTexImage')
+        texture_node.name = 'ColorGridTexture'
+        texture_node.location = (-300, 300)
+
+        principled_bsdf = nodes.get("Principled BSDF")
+        if principled_bsdf:
+            color_grid_material.node_tree.links.new(texture_node.outputs[0], principled_bsdf.inputs[0])
+
+    if not procedural:
+        texture_node.image = get_color_grid_image()
+    return color_grid_material
+
+def assign_material_to_all_slots(objects, material):
+    '''Assigns the provided material to every material slot of the provided objects, adding a slot to objects without one. Meshes shared by multiple objects are only assigned once.'''
+    assigned_data = set()
+    for obj in objects:
+        if not hasattr(obj.data, "materials"):
+            continue
+
+        # Slots linked to the object override the mesh material, those are assigned per object.
+        for slot in obj.material_slots:
+            if slot.link == 'OBJECT':
+                slot.material = material
+
+        if obj.data in assigned_data:
+            continue
+        assigned_data.add(obj.data)
+
+        materials = obj.data.materials
+        if len(materials) <= 0:
+            materials.append(material)
+        else:
+            for i in range(len(materials)):
+                materials[i] = material
+
 class RyModel_ColorGrid(Operator):
     bl_idname = "rymodel.color_grid"
     bl_label = "Color Grid"
     bl_description = "Applies a color grid material ideal for viewing UV unwrapping quality to all material slots on all selected objects. A new material slot is created if one does not exist"
     bl_options = {'REGISTER', 'UNDO'}
 
+    procedural: BoolProperty(name="Procedural", default=False, description="Uses a procedural checker texture instead of a color grid image, which requires no image memory")
+
     def execute(self, context):
         if not internal_utils.verify_active_mesh(self):
             return {'FINISHED'}
@@ -736,42 +1122,124 @@ class RyModel_ColorGrid(Operator):
         # Must be in object mode.
         bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-        # Create a new material.
-        color_grid_material = bpy.data.materials.get('ColorGrid')
-        if not color_grid_material:
-            color_grid_material = bpy.data.materials.new(name='ColorGrid')
-            color_grid_material.use_nodes = True
-
-        # Create a new color grid texture.
-        color_grid_image = bpy.data.images.get('ColorGrid')
-        if color_grid_image:
-            bpy.data.images.remove(color_grid_image)
-        bpy.ops.image.new(name='ColorGrid', width=2048, height=2048, color=(0.0, 0.0, 0.0, 1.0), alpha=False, generated_type='COLOR_GRID', float=False, use_stereo_3d=False, tiled=False)
-        color_grid_image = bpy.data.images.get('ColorGrid')
-
-        # Assign the color grid texture to the image shader node and connect it to the principled bsdf.
-        principled_bsdf = color_grid_material.node_tree.nodes.get("Principled BSDF")
-        image_node = color_grid_material.node_tree.nodes.new('ShaderNodeTexImage')
-        image_node.image = color_grid_image
-        image_node.location = (-300, 300)
-        color_grid_material.node_tree.links.new(image_node.outputs[0], principled_bsdf.inputs[0])
-
-        for obj in bpy.context.selected_objects:
-            # If there is no material slots on the selected object, add one.
-            if len(obj.material_slots) <= 0:
-                obj.data.materials.append(color_grid_material)
-
-            # If the object has material slots, assign the new color grid material to all material slots for all selected objects.
-            else:
-                obj.active_material_index = 0
-                for i in range(len(obj.material_slots)):
-                    obj.material_slots[i].material = color_grid_material
+        color_grid_material = get_color_grid_material(self.procedural)
+        assign_material_to_all_slots(bpy.context.selected_objects, color_grid_material)
 
         # Switch the color space to shading so users can see the applied color grid.
         bpy.context.space_data.shading.type = 'MATERIAL'
 
         return {'FINISHED'}
 
+def get_selected_curve_objects(context):
+    '''Returns all selected curve objects, including the active object.'''
+    curve_objects = [obj for obj in context.selected_objects if obj.type == 'CURVE']
+    active_object = context.active_object
+    if active_object and active_object.type == 'CURVE' and active_object not in curve_objects:
+        curve_objects.append(active_object)
+    return curve_objects
+
+def get_curve_array_parts(curve_object):
+    '''Returns the instancing planes and the original mesh objects of the curve array effects applied to the provided curve.'''
+    array_planes = []
+    source_objects = []
+    for child_object in curve_object.children:
+        # Children with their own children are planes instancing the original mesh along the curve (array along curve), otherwise the child is the deformed original mesh.
+        if len(child_object.children) != 0:
+            array_planes.append(child_object)
+            source_objects.extend(child_object.children)
+        else:
+            source_objects.append(child_object)
+    return array_planes, source_objects
+
+def unparent_keep_transform(obj):
+    '''Clears the parent of the provided object without moving it, and makes it visible and selectable again.'''
+    world_matrix = obj.matrix_world.copy()
+    obj.parent = None
+    obj.matrix_world = world_matrix
+    obj.hide_select = False
+    obj.hide_set(False)
+
+def realize_face_instances(depsgraph, instancer_object, source_object):
+    '''Returns a new mesh (in the source object's local space) containing a copy of the evaluated source object for every instance the instancer object creates of it, or None if there are no instances.'''
+    source_mesh = None
+    instance_matrices = []
+    for instance in depsgraph.object_instances:
+        if not instance.is_instance or not instance.parent or instance.parent.original != instancer_object:
+            continue
+        if instance.object.original != source_object:
+            continue
+        if source_mesh is None:
+            source_mesh = bpy.data.meshes.new_from_object(instance.object)
+        instance_matrices.append(np.array(instance.matrix_world, dtype=np.float64))
+
+    if source_mesh is None:
+        return None
+
+    vertex_count = len(source_mesh.vertices)
+    edge_count = len(source_mesh.edges)
+    corner_count = len(source_mesh.loops)
+    face_count = len(source_mesh.polygons)
+    instance_count = len(instance_matrices)
+
+    positions = np.empty(vertex_count * 3, dtype=np.float64)
+    source_mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+    edge_vertices = np.empty(edge_count * 2, dtype=np.int32)
+    source_mesh.edges.foreach_get("vertices", edge_vertices)
+    corner_verts = np.empty(corner_count, dtype=np.int32)
+    corner_edges = np.empty(corner_count, dtype=np.int32)
+    source_mesh.loops.foreach_get("vertex_index", corner_verts)
+    source_mesh.loops.foreach_get("edge_index", corner_edges)
+    loop_starts = np.empty(face_count, dtype=np.int32)
+    source_mesh.polygons.foreach_get("loop_start", loop_starts)
+
+    # Move every instance into the local space of the source object, which keeps its world transform once unparented.
+    to_local = np.array(source_object.matrix_world.inverted(), dtype=np.float64)
+    local_matrices = [to_local @ matrix for matrix in instance_matrices]
+    instance_positions = [positions @ matrix[:3, :3].T + matrix[:3, 3] for matrix in local_matrices]
+
+    vertex_offsets = np.repeat(np.arange(instance_count) * vertex_count, edge_count * 2)
+    new_mesh = bpy.data.meshes.new(source_object.data.name)
+    new_mesh.vertices.add(vertex_count * instance_count)
+    new_mesh.vertices.foreach_set("co", np.concatenate(instance_positions).astype(np.float32).ravel())
+    new_mesh.edges.add(edge_count * instance_count)
+    new_mesh.edges.foreach_set("vertices", (np.tile(edge_vertices, instance_count) + vertex_offsets).astype(np.int32))
+    new_mesh.loops.add(corner_count * instance_count)
+    new_mesh.loops.foreach_set("vertex_index", (np.tile(corner_verts, instance_count) + np.repeat(np.arange(instance_count) * vertex_count, corner_count)).astype(np.int32))
+    new_mesh.loops.foreach_set("edge_index", (np.tile(corner_edges, instance_count) + np.repeat(np.arange(instance_count) * edge_count, corner_count)).astype(np.int32))
+    new_mesh.polygons.add(face_count * instance_count)
+    new_mesh.polygons.foreach_set("loop_start", (np.tile(loop_starts, instance_count) + np.repeat(np.arange(instance_count) * corner_count, face_count)).astype(np.int32))
+    new_mesh.update()
+
+    # Every instance is an exact copy of the source mesh, so attributes repeat once per instance.
+    internal_utils.copy_attributes(source_mesh, new_mesh, {
+        'POINT': np.tile(np.arange(vertex_count), instance_count),
+        'EDGE': np.tile(np.arange(edge_count), instance_count),
+        'FACE': np.tile(np.arange(face_count), instance_count),
+        'CORNER': np.tile(np.arange(corner_count), instance_count)
+    })
+    for material in source_mesh.materials:
+        new_mesh.materials.append(material)
+    new_mesh.update()
+
+    bpy.data.meshes.remove(source_mesh)
+    return new_mesh
+
+def remove_objects_and_data(objects):
+    '''Removes the provided objects (and their data when no other object uses it) in a single batch.'''
+    removed_ids = set(objects)
+    for obj in objects:
+        if isinstance(obj, bpy.types.Object) and obj.data and obj.data.users == 1:
+            removed_ids.add(obj.data)
+    bpy.data.batch_remove(removed_ids)
+
+def select_restored_objects(context, objects):
+    '''Selects the provided objects, making the first one active.'''
+    for obj in objects:
+        obj.select_set(True)
+    if objects:
+        context.view_layer.objects.active = objects[0]
+
 class RyModel_DeformArrayAlongCurve(Operator):
     bl_idname = "rymodel.deform_array_along_curve"
     bl_label = "Deform Array Along Curve"
@@ -845,8 +1313,8 @@ class RyModel_ArrayAlongCurve(Operator):
         # Add a plane object to array along.
         plane_start_location = original_object.location
         bpy.ops.mesh.primitive_plane_add(size=0.001, enter_editmode=False, align='WORLD', location=plane_start_location, scale=(1, 1, 1))
-        bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
         new_plane_object = context.active_object
+        transform_tools.apply_object_transform(new_plane_object)
         array_mod = modifiers.add_modifier('ARRAY', self, context)
         array_mod.use_relative_offset = False
         array_mod.use_constant_offset = True
@@ -883,115 +1351,78 @@ class RyModel_ArrayAlongCurve(Operator):
 class RyModel_DeleteCurveArray(Operator):
     bl_idname = "rymodel.delete_curve_array"
     bl_label = "Delete Curve Array"
-    bl_description = "Deletes the curve array effect applied to the selected curve"
+    bl_description = "Deletes the curve array effect applied to the selected curves"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
         original_mode = bpy.context.mode
         bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-        original_object = context.active_object
-
-        if original_object.type != 'CURVE':
-            rylog.log_status("Selected object must be a curve to perform this operation.")
+        curve_objects = get_selected_curve_objects(context)
+        if not curve_objects:
+            rylog.log_status("Selected object must be a curve to perform this operation.", self)
             return {'FINISHED'}
 
-        # Unparent all child objects of the curve.
-        for obj in original_object.children:
-            bpy.ops.object.select_all(action='DESELECT')
-            obj.hide_select = False
-            obj.select_set(True)
-            bpy.context.view_layer.objects.active = obj
-            bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-
-            # Unparent child objects for this child object.
-            for child_obj in obj.children:
-                bpy.ops.object.select_all(action='DESELECT')
-                child_obj.hide_select = False
-                child_obj.select_set(True)
-                bpy.context.view_layer.objects.active = child_obj
-                bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-
-            # If child objects of a child object existed, then this is a curve array effect, delete the array mesh.
-            if len(obj.children) != 0:
-                original_mesh_obj = obj.children[0]
-
-                bpy.ops.object.select_all(action='DESELECT')
-                obj.select_set(True)
-                bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.delete()
+        source_objects = []
+        removed_data = []
+        for curve_object in curve_objects:
+            array_planes, curve_sources = get_curve_array_parts(curve_object)
+            for source_object in curve_sources:
+                unparent_keep_transform(source_object)
+            source_objects.extend(curve_sources)
+            removed_data.extend(array_planes)
+            removed_data.append(curve_object)
 
-            else:
-                original_mesh_obj = obj
+        remove_objects_and_data(removed_data)
+        select_restored_objects(context, source_objects)
 
-        # Delete the curve.
-        bpy.ops.object.select_all(action='DESELECT')
-        original_object.select_set(True)
-        bpy.context.view_layer.objects.active = original_object
-        bpy.ops.object.delete()
-
-        # Select the original mesh object used in the curve array effect.
-        bpy.ops.object.select_all(action='DESELECT')
-        original_mesh_obj.hide_set(False)
-        original_mesh_obj.select_set(True)
-        bpy.context.view_layer.objects.active = original_mesh_obj  
-        
         internal_utils.set_object_interaction_mode(original_mode)
         return {'FINISHED'}
 
 class RyModel_CurveArrayToMesh(Operator):
     bl_idname = "rymodel.curve_array_to_mesh"
     bl_label = "Curve Array to Mesh"
-    bl_description = "Converts the selected curve array to a mesh and cleans up objects if they exist"
+    bl_description = "Converts the selected curve arrays to meshes and cleans up objects if they exist"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
         original_mode = bpy.context.mode
         bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-        original_object = context.active_object
-        if original_object.type != 'CURVE':
-            rylog.log_status("Selected object must be a curve to perform this operation.")
+        curve_objects = get_selected_curve_objects(context)
+        if not curve_objects:
+            rylog.log_status("Selected object must be a curve to perform this operation.", self)
             return {'FINISHED'}
 
-        # Convert the curve array to a mesh.
-        child_object = original_object.children[0]
-        if len(child_object.children) != 0:
-            original_mesh_obj = child_object.children[0]
-            bpy.ops.object.select_all(action='DESELECT')
-            original_mesh_obj.hide_select = False
-            original_mesh_obj.hide_set(False)
-            original_mesh_obj.select_set(True)
-            bpy.context.view_layer.objects.active = original_mesh_obj
-            bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-            bpy.ops.object.convert(target='MESH')
-
-            # Delete the plane mesh used for the curve array.
-            bpy.ops.object.select_all(action='DESELECT')
-            child_object.select_set(True)
-            bpy.context.view_layer.objects.active = child_object
-            bpy.ops.object.delete()
-
-        else:
-            original_mesh_obj = original_object.children[0]
-            bpy.ops.object.select_all(action='DESELECT')
-            original_mesh_obj.hide_select = False
-            original_mesh_obj.select_set(True)
-            bpy.context.view_layer.objects.active = original_mesh_obj
-            bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-            bpy.ops.object.convert(target='MESH')
-
-        # Delete the curve.
-        bpy.ops.object.select_all(action='DESELECT')
-        original_object.select_set(True)
-        bpy.context.view_layer.objects.active = original_object
-        bpy.ops.object.delete()
-
-        # Select the original mesh object used in the curve array effect.
-        bpy.ops.object.select_all(action='DESELECT')
-        original_mesh_obj.hide_set(False)
-        original_mesh_obj.select_set(True)
-        bpy.context.view_layer.objects.active = original_mesh_obj  
+        # Build all converted meshes from a single evaluation of the scene before any object is unparented or removed.
+        depsgraph = context.evaluated_depsgraph_get()
+        converted_meshes = []
+        removed_data = []
+        for curve_object in curve_objects:
+            array_planes, curve_sources = get_curve_array_parts(curve_object)
+            for array_plane in array_planes:
+                for source_object in array_plane.children:
+                    converted_meshes.append((source_object, realize_face_instances(depsgraph, array_plane, source_object)))
+            for source_object in curve_sources:
+                if source_object.parent == curve_object:
+                    converted_meshes.append((source_object, bpy.data.meshes.new_from_object(source_object.evaluated_get(depsgraph))))
+            removed_data.extend(array_planes)
+            removed_data.append(curve_object)
+
+        source_objects = []
+        for source_object, converted_mesh in converted_meshes:
+            if converted_mesh is None:
+                continue
+            unparent_keep_transform(source_object)
+            old_mesh = source_object.data
+            source_object.data = converted_mesh
+            source_object.modifiers.clear()
+            if old_mesh.users == 0:
+                removed_data.append(old_mesh)
+            source_objects.append(source_object)
+
+        remove_objects_and_data(removed_data)
+        select_restored_objects(context, source_objects)
 
         internal_utils.set_object_interaction_mode(original_mode)
         return {'FINISHED'}
@@ -1053,36 +1484,54 @@ class RyModel_PrepareManualRetopology(Operator):
 
         return {'FINISHED'}
 
-def reapply_shrinkwrap(self, context):
-    original_mode = bpy.context.mode
-    bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
-
-    # Apply the existing shrinkwrap modifier.
+def reapply_shrinkwrap_modifier(self, context):
+    '''Applies the shrinkwrap modifier of the active object, then adds it again with its original settings and stack index.'''
     shrinkwrap_modifier = modifiers.get_modifier_of_type(bpy.context.active_object.modifiers, 'SHRINKWRAP')
     original_index = modifiers.get_modifier_index(shrinkwrap_modifier.name, bpy.context.active_object.modifiers)
-    original_shrinkwrap_target = shrinkwrap_modifier.target
-    original_wrap_mode = shrinkwrap_modifier.wrap_mode
-    original_offset = shrinkwrap_modifier.offset
-    original_show_on_cage = shrinkwrap_modifier.show_on_cage
+    original_settings = {
+        rna_property.identifier: getattr(shrinkwrap_modifier, rna_property.identifier)
+        for rna_property in shrinkwrap_modifier.bl_rna.properties
+        if not rna_property.is_readonly and rna_property.identifier not in ('name', 'rna_type')
+    }
     bpy.ops.object.modifier_apply(modifier=shrinkwrap_modifier.name)
 
-    # Reapply the shrinkwrap modifier with original settings, and the original modifier stack index.
     new_shrinkwrap_modifier = modifiers.add_modifier('SHRINKWRAP', self, context)
-    new_shrinkwrap_modifier.target = original_shrinkwrap_target
-    new_shrinkwrap_modifier.wrap_mode = original_wrap_mode
-    new_shrinkwrap_modifier.offset = original_offset
-    new_shrinkwrap_modifier.show_on_cage = original_show_on_cage
+    for identifier, value in original_settings.items():
+        setattr(new_shrinkwrap_modifier, identifier, value)
     bpy.ops.object.modifier_move_to_index(modifier=new_shrinkwrap_modifier.name, index=original_index)
 
+def reapply_shrinkwrap(self, context):
+    original_mode = bpy.context.mode
+    bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+    shrinkwrap_modifier, target_object = retopology_tools.get_retopology_target(bpy.context.active_object)
+    if not target_object:
+        internal_utils.set_object_interaction_mode(original_mode)
+        rylog.log_status("Active object has no shrinkwrap modifier with a mesh target.", self, 'ERROR')
+        return
+
+    # Wrap methods the projection service can't reproduce (e.g. projecting along an axis) are applied with the modifier itself.
+    if not retopology_tools.can_reproject(shrinkwrap_modifier):
+        reapply_shrinkwrap_modifier(self, context)
+        internal_utils.set_object_interaction_mode(original_mode)
+        rylog.log_status("Reapplied shrinkwrap modifier.", self, 'INFO')
+        return
+
+    # Project vertices moved since the last projection onto the shrinkwrap target, the shrinkwrap modifier is kept as is.
+    result = retopology_tools.reproject_retopology_object(bpy.context.active_object, project_all=self.project_all)
     internal_utils.set_object_interaction_mode(original_mode)
-    rylog.log_status("Reapplied shrinkwrap modifier.", self, 'INFO')
+
+    projected_count, seconds = result
+    rylog.log_status("Reprojected {0} vertices onto the shrinkwrap target in {1:.1f}ms.".format(projected_count, seconds * 1000), self, 'INFO')
 
 class RyModel_ReApplyShrinkwrap(Operator):
     bl_idname = "rymodel.reapply_shrinkwrap"
     bl_label = "Reapply Shrinkwrap"
-    bl_description = "Applies the shrinkwrap modifier, then adds a new shrinkwrap modifier with the settings of the original shrinkwrap modifier. This effectively resets the vertex placement on the mesh"
+    bl_description = "Snaps vertices moved since the last reapply back onto the shrinkwrap target surface. This effectively resets the vertex placement on the mesh"
     bl_options = {'REGISTER', 'UNDO'}
 
+    project_all: BoolProperty(name="Project All", default=False, description="Re-projects every vertex instead of only vertices moved since the last projection")
+
     def execute(self, context):
         if not internal_utils.verify_active_mesh(self):
             return {'FINISHED'}
@@ -1090,37 +1539,51 @@ class RyModel_ReApplyShrinkwrap(Operator):
         reapply_shrinkwrap(self, context)
         return {'FINISHED'}
     
+LOD_LEVEL_TYPES = [
+    ("RATIO", "Ratio", "LOD levels are ratios of the original triangle count"),
+    ("TRIANGLES", "Triangle Budget", "LOD levels are triangle budgets"),
+    ("ERROR", "Error Budget", "LOD levels are screen space error budgets in percent of the half viewport height. Each LOD uses the most aggressive ratio whose measured error stays within its budget at the screen size the viewport switches to it (see LOD Screen Size)")
+]
+
 class RyModel_AutoGenerateLODs(Operator):
     bl_idname = "rymodel.auto_generate_lods"
     bl_label = "Auto Generate LODs"
-    bl_description = "Automatically generates LOD (level of detail) meshes for all selected meshes"
+    bl_description = "Automatically generates applied LOD (level of detail) meshes for all selected meshes. Objects with LODs generated from the same mesh and settings are skipped"
     bl_options = {'REGISTER', 'UNDO'}
 
+    level_type: EnumProperty(items=LOD_LEVEL_TYPES, name="Level Type", default='RATIO')
+    levels: StringProperty(name="Levels", description="Comma separated ratio, triangle budget or error budget for each LOD level", default="0.5, 0.25, 0.125, 0.0625")
+    use_background_workers: BoolProperty(name="Use Background Workers", description="Decimates large selections in parallel background Blender processes", default=True)
+    background_threshold: IntProperty(name="Background Threshold", description="Minimum number of objects to decimate before background workers are used", default=8, min=1)
+    max_workers: IntProperty(name="Max Workers", description="Maximum number of background workers. 0 = all but one core", default=0, min=0)
+    force: BoolProperty(name="Force", description="Regenerates LODs even for objects with up to date LODs", default=False)
+
     def execute(self, context):
         if not internal_utils.verify_active_mesh(self):
             return {'FINISHED'}
-        
-        selected_objects = context.selected_objects
-        for obj in selected_objects:
 
-            number_of_lods = 5
-            decimate_reduction_per_lod = 1 / (number_of_lods + 1)
-            decimate_ratio = 1 - decimate_reduction_per_lod
+        levels = lod_tools.parse_lod_levels(self.levels)
+        if not levels:
+            rylog.log_status("Provide at least one LOD level.", self, 'ERROR')
+            return {'FINISHED'}
 
-            for i in range(0, number_of_lods):
+        original_mode = bpy.context.mode
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
 
-                # Duplicate the selected object.
-                lod_object = obj.copy()
-                lod_object.data = obj.data.copy()
-                bpy.context.collection.objects.link(lod_object)
-                lod_object.name = "{0}_LOD{1}".format(obj.name, i + 1)
-        
-                # Add a decimate modifier.
-                decimate_modifier = lod_object.modifiers.new('AUTO_DECIMATE', 'DECIMATE')
-                decimate_modifier.ratio = decimate_ratio
-                decimate_ratio -= decimate_reduction_per_lod
+        # LODs are always generated from full detail meshes.
+        viewport_lod.restore_all_lods()
 
-                # Apply the decimate modifier.
-                #lod_object.modifier_apply(modifier=decimate_modifier.modifier_name, report=False)
+        generated_count, skipped_count = lod_tools.generate_lods(
+            list(context.selected_objects),
+            levels,
+            self.level_type,
+            self.use_background_workers,
+            self.background_threshold,
+            self.max_workers,
+            self.force,
+            context.scene.rymodel_viewport_lod_threshold
+        )
 
-        return {'FINISHED'}
\ No newline at end of file
+        internal_utils.set_object_interaction_mode(original_mode)
+        rylog.log_status("Generated LODs for {0} objects, skipped {1} up to date objects.".format(generated_count, skipped_count), self, 'INFO')
+        return {'FINISHED'}
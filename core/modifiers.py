@@ -1,11 +1,13 @@
 import bpy
 from bpy.types import PropertyGroup, Operator
-from bpy.props import IntProperty, FloatProperty, StringProperty
+from bpy.props import IntProperty, FloatProperty, StringProperty, BoolProperty, EnumProperty
 from ..core import property_range_overrides
 from . import booleans
+from ..core import baked_modifiers
 from ..core import modeling_tools
 from ..core import internal_utils
 from ..core import rylog
+from ..core import transform_tools
 from .. import preferences
 import math
 
@@ -24,6 +26,36 @@ def get_modifiers_of_type(modifiers, modifier_type):
             modifiers_of_given_type.append(modifier)
     return modifiers_of_given_type
 
+def get_modifier_key_value(value):
+    '''Returns a value of a modifier setting that stays the same between sessions. Data-blocks are identified by name, nested settings structs (which have no stable identity) are left out.'''
+    if isinstance(value, bpy.types.ID):
+        return value.name
+    if isinstance(value, bpy.types.bpy_struct):
+        return None
+    if isinstance(value, set):
+        return tuple(sorted(value))
+    if hasattr(value, "to_list"):
+        return value.to_list()
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return tuple(value)
+    return value
+
+def get_modifier_stack_key(object_modifiers):
+    '''Returns a key that changes whenever a modifier in the provided stack is added, removed, reordered, toggled or has any of its settings (including geometry node inputs) changed. The key stays the same between sessions, so it can be saved.'''
+    stack_key = []
+    for modifier in object_modifiers:
+        settings = []
+        for rna_property in modifier.bl_rna.properties:
+            if rna_property.type == 'COLLECTION' or rna_property.identifier == 'rna_type':
+                continue
+            settings.append((rna_property.identifier, get_modifier_key_value(getattr(modifier, rna_property.identifier))))
+
+        # Geometry node inputs are stored as custom properties.
+        for input_name in modifier.keys():
+            settings.append((input_name, repr(get_modifier_key_value(modifier[input_name]))))
+        stack_key.append(tuple(settings))
+    return tuple(stack_key)
+
 def organize_modifier_stack(object_modifiers):
     '''Organizes the modifier stack order.'''
 
@@ -132,6 +164,34 @@ class RyModel_AddWeightedNormalModifier(Operator):
         property_range_overrides.update_property_range_overrides()
         return {'FINISHED'}
 
+class RyModel_BakeWeightedNormals(Operator):
+    bl_idname = "rymodel.bake_weighted_normals"
+    bl_label = "Bake Weighted Normals"
+    bl_description = "Writes weighted custom normals directly to the mesh data of all selected objects, replacing their weighted normal modifiers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: EnumProperty(name="Weighting Mode", items=baked_modifiers.WEIGHTED_NORMAL_MODES, default='FACE_AREA_WITH_ANGLE')
+    remove_modifiers: BoolProperty(name="Remove Weighted Normal Modifiers", default=True, description="Removes weighted normal modifiers from the selected objects, since the baked normals replace them")
+
+    def execute(self, context):
+        mesh_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not mesh_objects:
+            if not internal_utils.verify_active_mesh(self):
+                return {'FINISHED'}
+            mesh_objects = [context.active_object]
+
+        # Mesh data is edited directly, which requires object mode.
+        original_mode = bpy.context.mode
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        baked_count = baked_modifiers.bake_weighted_normals_for_objects(mesh_objects, self.mode, self.remove_modifiers)
+
+        # Toggle back into the original mode.
+        internal_utils.set_object_interaction_mode(original_mode)
+
+        rylog.log_status("Baked weighted normals for {0} mesh(es).".format(baked_count), self, 'INFO')
+        return {'FINISHED'}
+
 class RyModel_AddSolidifyModifier(Operator):
     bl_idname = "rymodel.add_solidify_modifier"
     bl_label = "Add Solidify Modifier"
@@ -209,6 +269,44 @@ class RyModel_AddSmoothModifier(Operator):
         property_range_overrides.update_property_range_overrides()
         return {'FINISHED'}
 
+class RyModel_BakeSmoothing(Operator):
+    bl_idname = "rymodel.bake_smoothing"
+    bl_label = "Bake Smoothing"
+    bl_description = "Smooths the vertex positions of all selected meshes once with Laplacian or Taubin smoothing, replacing their smooth modifiers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    method: EnumProperty(name="Method", items=baked_modifiers.SMOOTHING_METHODS, default='TAUBIN')
+    iterations: IntProperty(name="Iterations", default=10, min=1, soft_max=100, description="Number of smoothing iterations")
+    factor: FloatProperty(name="Factor", default=0.5, min=0.0, max=1.0, description="How far vertices move towards the average of their neighbours each iteration")
+    vertex_group: StringProperty(name="Vertex Group", default="", description="Limits smoothing to the vertex group with this name (by weight) on objects which have it")
+    pin_boundaries: BoolProperty(name="Pin Boundaries", default=True, description="Keeps vertices on open boundaries in place")
+    remove_modifiers: BoolProperty(name="Remove Smooth Modifiers", default=True, description="Removes smooth modifiers from the selected objects, since the baked smoothing replaces them")
+
+    def execute(self, context):
+        mesh_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        if not mesh_objects:
+            if not internal_utils.verify_active_mesh(self):
+                return {'FINISHED'}
+            mesh_objects = [context.active_object]
+
+        # Mesh data is edited directly, which requires object mode.
+        original_mode = bpy.context.mode
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+        smoothed_meshes = set()
+        for obj in mesh_objects:
+            if obj.data not in smoothed_meshes and baked_modifiers.bake_smoothing(obj, self.method, self.iterations, self.factor, self.vertex_group, self.pin_boundaries):
+                smoothed_meshes.add(obj.data)
+            if self.remove_modifiers:
+                for modifier in [modifier for modifier in obj.modifiers if modifier.type == 'SMOOTH']:
+                    obj.modifiers.remove(modifier)
+
+        # Toggle back into the original mode.
+        internal_utils.set_object_interaction_mode(original_mode)
+
+        rylog.log_status("Baked smoothing for {0} mesh(es).".format(len(smoothed_meshes)), self, 'INFO')
+        return {'FINISHED'}
+
 class RyModel_ApplyModifier(Operator):
     bl_idname = "rymodel.apply_modifier"
     bl_label = "Apply Modifier"
@@ -405,9 +503,11 @@ class RyModel_CopyModifiers(Operator):
 class RyModel_HSWFModApply(Operator):
     bl_idname = "rymodel.hswf_mod_apply"
     bl_label = "HSWF Mod Apply"
-    bl_description = "Applies all modifiers to the object, excluding bevel and weighted normal modifiers"
+    bl_description = "Applies all modifiers to the object, excluding bevel and weighted normal modifiers. Optionally applies bevels too and bakes weighted normals as the finishing step"
     bl_options = {'REGISTER', 'UNDO'}
 
+    bake_weighted_normals: BoolProperty(name="Bake Weighted Normals", default=False, description="Also applies bevel modifiers, then replaces weighted normal modifiers with weighted custom normals baked into the mesh")
+
     def execute(self, context):
         if not internal_utils.verify_active_mesh(self):
             return {'FINISHED'}
@@ -415,12 +515,20 @@ class RyModel_HSWFModApply(Operator):
         for modifier in context.active_object.modifiers:
             match modifier.type:
                 case 'BEVEL':
-                    continue
+                    if self.bake_weighted_normals:
+                        bpy.ops.object.modifier_apply(modifier=modifier.name)
                 case 'WEIGHTED_NORMAL':
                     continue
                 case _:
                     bpy.ops.object.modifier_apply(modifier=modifier.name)
 
+        # Baked normals are calculated from the applied (beveled) geometry, so they're the last step.
+        if self.bake_weighted_normals:
+            original_mode = bpy.context.mode
+            bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+            baked_modifiers.bake_weighted_normals_for_objects([context.active_object])
+            internal_utils.set_object_interaction_mode(original_mode)
+
         modeling_tools.update_mirror_properties()
         booleans.remove_unused_booleans()
         
@@ -575,7 +683,10 @@ class RyModel_CircularTwist(Operator):
         active_object = context.active_object
 
         # Apply rotation & scale to avoid strange results when applying this modifier.
-        bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
+        if not transform_tools.can_transform_data(active_object):
+            rylog.log_status("Circular twist requires a single user mesh so rotation and scale can be applied.", self)
+            return {'FINISHED'}
+        transform_tools.apply_object_transform(active_object)
 
         # If any modifier exists, assume there is already a circular twist applied to the active object.
         displace_modifier1 = active_object.modifiers.get('CircularTwistDisplacement1')
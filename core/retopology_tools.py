@@ -0,0 +1,129 @@
+# This module contains a projection service for manual retopology which snaps retopology meshes to their target surface with a cached BVH tree, re-projecting only vertices moved since the last projection.
+
+import bpy
+import numpy as np
+import time
+from mathutils.bvhtree import BVHTree
+from ..core import internal_utils
+from ..core import modifiers
+
+# BVH tree of the most recently used retopology target, keyed by the target pointer, the revision of its geometry and the state of its modifier stack.
+_target_bvh_cache = {'key': None, 'bvh': None}
+
+# Vertex positions of retopology meshes right after their last projection, keyed by mesh pointer.
+_projection_snapshots = {}
+MAX_SNAPSHOTS = 64
+
+# Shrinkwrap wrap methods the projection service can reproduce, other wrap methods are applied with the shrinkwrap modifier itself.
+SUPPORTED_WRAP_METHODS = {'NEAREST_SURFACEPOINT'}
+
+def get_target_key(target_object):
+    '''Returns a key that changes whenever the evaluated geometry of the provided target object changes, either through its mesh or its modifiers.'''
+    return (
+        target_object.as_pointer(),
+        internal_utils.get_mesh_revision(target_object.data),
+        len(target_object.data.vertices),
+        len(target_object.data.polygons),
+        modifiers.get_modifier_stack_key(target_object.modifiers)
+    )
+
+def get_target_bvh(target_object, depsgraph, target_key):
+    '''Returns a BVH tree of the evaluated target object in its local space. The tree is cached until the provided target key changes.'''
+    if _target_bvh_cache['key'] != target_key:
+        _target_bvh_cache['bvh'] = BVHTree.FromObject(target_object.evaluated_get(depsgraph), depsgraph)
+        _target_bvh_cache['key'] = target_key
+    return _target_bvh_cache['bvh']
+
+def clear_projection_cache():
+    '''Frees the cached target BVH tree and all projection snapshots.'''
+    _target_bvh_cache['key'] = None
+    _target_bvh_cache['bvh'] = None
+    _projection_snapshots.clear()
+
+def get_moved_vertices(mesh, positions, projection_key):
+    '''Returns the indices of vertices which moved (or were added) since the last projection of the provided mesh. All vertices are returned if the mesh was never projected with the provided projection settings.'''
+    snapshot = _projection_snapshots.get(mesh.as_pointer())
+    if snapshot is None or snapshot[0] != projection_key:
+        return np.arange(len(positions))
+
+    previous_positions = snapshot[1]
+    shared_count = min(len(previous_positions), len(positions))
+    moved = np.flatnonzero(np.any(positions[:shared_count] != previous_positions[:shared_count], axis=1))
+    return np.concatenate((moved, np.arange(shared_count, len(positions))))
+
+def get_nearest_surface_points(bvh, points):
+    '''Returns the nearest surface location and normal in the provided BVH tree for each provided point, along with a mask of points a surface was found for.'''
+    results = [bvh.find_nearest(point) for point in points.tolist()]
+    found = np.array([result[0] is not None for result in results], dtype=bool)
+    locations = np.array([result[0] if result[0] is not None else (0.0, 0.0, 0.0) for result in results], dtype=np.float64).reshape(-1, 3)
+    normals = np.array([result[1] if result[1] is not None else (0.0, 0.0, 0.0) for result in results], dtype=np.float64).reshape(-1, 3)
+    return locations, normals, found
+
+def get_wrapped_points(points, locations, normals, found, offset, wrap_mode):
+    '''Returns the provided points snapped to their nearest surface locations, offset along the surface normal. Inside and outside wrap modes only move points on the wrong side of the surface, matching the shrinkwrap modifier.'''
+    move_mask = found.copy()
+    side = np.einsum('ij,ij->i', points - locations, normals)
+    if wrap_mode == 'INSIDE':
+        move_mask &= side > 0.0
+    elif wrap_mode == 'OUTSIDE':
+        move_mask &= side < 0.0
+
+    wrapped_points = points.copy()
+    wrapped_points[move_mask] = locations[move_mask] + normals[move_mask] * offset
+    return wrapped_points
+
+def project_to_target(obj, target_object, offset=0.0, project_all=False, wrap_mode='ON_SURFACE'):
+    '''Projects the vertices of the provided mesh object moved since their last projection onto the nearest surface of the target object, offset along the surface normal and following the provided shrinkwrap wrap mode. Returns the number of vertices projected.'''
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    target_key = get_target_key(target_object)
+    bvh = get_target_bvh(target_object, depsgraph, target_key)
+
+    mesh = obj.data
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+
+    # Object transforms are part of the projection key, moving either object re-projects every vertex.
+    to_target = target_object.matrix_world.inverted() @ obj.matrix_world
+    projection_key = (target_key, tuple(map(tuple, to_target)), offset, wrap_mode)
+    if project_all:
+        _projection_snapshots.pop(mesh.as_pointer(), None)
+    moved_vertices = get_moved_vertices(mesh, positions, projection_key)
+
+    if len(moved_vertices) > 0:
+        to_target = np.array(to_target, dtype=np.float64)
+        from_target = np.linalg.inv(to_target)
+        target_positions = positions[moved_vertices].astype(np.float64) @ to_target[:3, :3].T + to_target[:3, 3]
+
+        locations, normals, found = get_nearest_surface_points(bvh, target_positions)
+        projected_positions = get_wrapped_points(target_positions, locations, normals, found, offset, wrap_mode)
+
+        positions[moved_vertices] = projected_positions @ from_target[:3, :3].T + from_target[:3, 3]
+        mesh.vertices.foreach_set("co", positions.ravel())
+        mesh.update()
+
+    if len(_projection_snapshots) >= MAX_SNAPSHOTS:
+        _projection_snapshots.clear()
+    _projection_snapshots[mesh.as_pointer()] = (projection_key, positions.copy())
+    return len(moved_vertices)
+
+def get_retopology_target(obj):
+    '''Returns the shrinkwrap modifier and target used to retopologize the provided object, or (None, None) if it has no valid target.'''
+    shrinkwrap_modifier = modifiers.get_modifier_of_type(obj.modifiers, 'SHRINKWRAP')
+    if not shrinkwrap_modifier or not shrinkwrap_modifier.target or shrinkwrap_modifier.target.type != 'MESH':
+        return None, None
+    return shrinkwrap_modifier, shrinkwrap_modifier.target
+
+def can_reproject(shrinkwrap_modifier):
+    '''Returns true if the projection service can reproduce the wrap method of the provided shrinkwrap modifier.'''
+    return shrinkwrap_modifier.wrap_method in SUPPORTED_WRAP_METHODS
+
+def reproject_retopology_object(obj, project_all=False):
+    '''Re-projects the provided retopology object onto its shrinkwrap target. Returns the number of vertices projected and the time taken, or None if the object has no target or uses a wrap method that can't be reproduced (see can_reproject).'''
+    shrinkwrap_modifier, target_object = get_retopology_target(obj)
+    if not target_object or not can_reproject(shrinkwrap_modifier):
+        return None
+
+    start_time = time.perf_counter()
+    projected_count = project_to_target(obj, target_object, shrinkwrap_modifier.offset, project_all, shrinkwrap_modifier.wrap_mode)
+    return projected_count, time.perf_counter() - start_time
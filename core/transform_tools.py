@@ -0,0 +1,160 @@
+# This module contains a data level transform engine which moves object origins and applies object transforms by editing mesh vertex arrays directly, without moving the 3D cursor or running object operators on the active object.
+
+import bpy
+import mathutils
+import numpy as np
+from ..core import internal_utils
+from ..core import rylog
+
+def transform_vertex_array(collection, matrix):
+    '''Transforms the 'co' values of the provided vertex (or shape key point) collection by the provided 4x4 matrix.'''
+    positions = np.empty(len(collection) * 3, dtype=np.float64)
+    collection.foreach_get("co", positions)
+    positions = positions.reshape(-1, 3)
+    matrix = np.array(matrix, dtype=np.float64)
+    positions = positions @ matrix[:3, :3].T + matrix[:3, 3]
+    collection.foreach_set("co", positions.astype(np.float32).ravel())
+
+def transform_mesh_data(mesh, matrix):
+    '''Transforms all vertices (including shape keys) of the provided mesh by the provided 4x4 matrix.'''
+    transform_vertex_array(mesh.vertices, matrix)
+    if mesh.shape_keys:
+        for key_block in mesh.shape_keys.key_blocks:
+            transform_vertex_array(key_block.data, matrix)
+    mesh.update()
+    internal_utils.bump_mesh_revision(mesh)
+
+def can_transform_data(obj):
+    '''Returns true if the data of the provided object can be transformed without affecting other objects.'''
+    return obj.type == 'MESH' and obj.data.users == 1
+
+def compensate_children(obj, data_matrix):
+    '''Keeps the children of the provided object in place after its object matrix was changed by the inverse of the provided data matrix.'''
+    for child in obj.children:
+        child.matrix_parent_inverse = data_matrix @ child.matrix_parent_inverse
+
+def set_object_origin(obj, world_location):
+    '''Moves the origin of the provided mesh object to the provided world location without moving its geometry or its children.'''
+    local_offset = obj.matrix_world.inverted() @ mathutils.Vector(world_location)
+    data_matrix = mathutils.Matrix.Translation(-local_offset)
+    transform_mesh_data(obj.data, data_matrix)
+    obj.matrix_world = obj.matrix_world @ mathutils.Matrix.Translation(local_offset)
+    compensate_children(obj, data_matrix)
+
+def apply_object_transform(obj, location=False, rotation=True, scale=True):
+    '''Applies the chosen components of the provided mesh object's transform to its mesh data, without moving its geometry or its children.'''
+    basis_location, basis_rotation, basis_scale = obj.matrix_basis.decompose()
+    kept_basis = mathutils.Matrix.Identity(4)
+    if not location:
+        kept_basis = kept_basis @ mathutils.Matrix.Translation(basis_location)
+    if not rotation:
+        kept_basis = kept_basis @ basis_rotation.to_matrix().to_4x4()
+    if not scale:
+        kept_basis = kept_basis @ mathutils.Matrix.Diagonal(basis_scale.to_4d())
+
+    data_matrix = kept_basis.inverted() @ obj.matrix_basis
+    if data_matrix == mathutils.Matrix.Identity(4):
+        return
+
+    transform_mesh_data(obj.data, data_matrix)
+    obj.matrix_basis = kept_basis
+    compensate_children(obj, data_matrix)
+
+def get_selection_median(objects):
+    '''Returns the world space median of the selected vertices of the provided mesh objects, or None if no vertices are selected.'''
+    selected_positions = []
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.data
+        vertex_selection = np.empty(len(mesh.vertices), dtype=bool)
+        mesh.vertices.foreach_get("select", vertex_selection)
+        if not vertex_selection.any():
+            continue
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+        mesh.vertices.foreach_get("co", positions)
+        positions = positions.reshape(-1, 3)[vertex_selection]
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        selected_positions.append(positions @ matrix[:3, :3].T + matrix[:3, 3])
+
+    if not selected_positions:
+        return None
+    return mathutils.Vector(np.concatenate(selected_positions).mean(axis=0))
+
+def get_origin_target(objects, target, edit_mode=False):
+    '''Returns the world location origins should be moved to for the provided target type. True center targets are per object, so None is returned for them.'''
+    match target:
+        case 'WORLD_ORIGIN':
+            return mathutils.Vector((0.0, 0.0, 0.0))
+
+        case 'SELECTED':
+            # Matches snapping the 3D cursor to the selection: selected vertices in edit mode, object origins in object mode.
+            if edit_mode:
+                return get_selection_median(objects)
+            return sum((obj.matrix_world.translation for obj in objects), mathutils.Vector()) / len(objects)
+
+        case _:
+            return None
+
+def set_origins_with_operator(objects, target_locations):
+    '''Moves the origins of the provided objects the data level engine can't transform (curves, text and multi-user meshes) with Blender's origin operator, one object at a time. Objects without a target location (None) get the center of their bounds. The 3D cursor is restored afterwards. Returns the objects that failed.'''
+    failed_objects = []
+    handled_data = set()
+    cursor = bpy.context.scene.cursor
+    original_cursor_location = cursor.location.copy()
+    try:
+        for obj, location in zip(objects, target_locations):
+            # The operator moves the origin of every user of shared data, so shared data is only moved once.
+            if obj.data is None or obj.data in handled_data:
+                continue
+            handled_data.add(obj.data)
+            try:
+                with bpy.context.temp_override(selected_editable_objects=[obj], active_object=obj, object=obj):
+                    if location is None:
+                        bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
+                    else:
+                        cursor.location = location
+                        bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
+            except RuntimeError as error:
+                rylog.log("Failed setting the origin of {0}: {1}".format(obj.name, error))
+                failed_objects.append(obj)
+    finally:
+        cursor.location = original_cursor_location
+    return failed_objects
+
+def set_origins(objects, target, edit_mode=False):
+    '''Moves the origin of all provided objects to the provided target ('WORLD_ORIGIN', 'SELECTED' or 'TRUE_CENTER'). Single user meshes are edited directly, other objects fall back to Blender's origin operator. Returns the objects that were skipped.'''
+    if not objects:
+        return []
+
+    target_location = get_origin_target(objects, target, edit_mode)
+    if target == 'SELECTED' and target_location is None:
+        return list(objects)
+
+    if target == 'TRUE_CENTER':
+        target_locations = [internal_utils.get_object_true_center(obj) if obj.type == 'MESH' else None for obj in objects]
+    else:
+        target_locations = [target_location] * len(objects)
+
+    fallback_objects = []
+    fallback_locations = []
+    for obj, location in zip(objects, target_locations):
+        if can_transform_data(obj):
+            set_object_origin(obj, location)
+        else:
+            fallback_objects.append(obj)
+            fallback_locations.append(location)
+    return set_origins_with_operator(fallback_objects, fallback_locations)
+
+def apply_transforms(objects, location=False, rotation=True, scale=True):
+    '''Applies the chosen transform components to all provided mesh objects. Returns the objects that were skipped.'''
+    skipped_objects = []
+    for obj in objects:
+        if can_transform_data(obj):
+            apply_object_transform(obj, location, rotation, scale)
+        else:
+            skipped_objects.append(obj)
+
+    if skipped_objects:
+        rylog.log("Skipped applying transforms to non-mesh or multi-user objects: {0}".format(", ".join(obj.name for obj in skipped_objects)))
+    return skipped_objects
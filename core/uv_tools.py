@@ -0,0 +1,79 @@
+# This module contains a vectorized seam engine which marks uv seams on many meshes at once by edge angle, optionally splitting oversized uv islands.
+
+import bpy
+import numpy as np
+from ..core import internal_utils
+from ..core import mesh_analysis
+from ..core import rylog
+
+MAX_SPLIT_ROUNDS = 32
+
+def split_oversized_islands(mesh, seam_mask, max_island_faces):
+    '''Adds seams to the provided seam mask, bisecting every uv island with more faces than the provided limit along the longest axis of its bounds until all islands are within the limit. Returns the number of islands.'''
+    manifold_edge_faces = internal_utils.get_manifold_edge_faces(mesh)
+    manifold_edges, first_faces, second_faces = manifold_edge_faces
+    face_centers = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("center", face_centers)
+    face_centers = face_centers.reshape(-1, 3)
+
+    for split_round in range(MAX_SPLIT_ROUNDS):
+        island_labels, island_count = mesh_analysis.get_face_islands(mesh, seam_mask, manifold_edge_faces)
+        oversized_islands = np.flatnonzero(np.bincount(island_labels, minlength=island_count) > max_island_faces)
+        if len(oversized_islands) == 0:
+            break
+
+        # Faces are split by the median of their centers, so both halves of an island get a similar face count.
+        face_sides = np.zeros(len(mesh.polygons), dtype=bool)
+        split_any = False
+        for island in oversized_islands:
+            island_faces = np.flatnonzero(island_labels == island)
+            island_centers = face_centers[island_faces]
+            axis = np.argmax(island_centers.max(axis=0) - island_centers.min(axis=0))
+            axis_values = island_centers[:, axis]
+            upper_side = axis_values > np.median(axis_values)
+            if upper_side.all() or not upper_side.any():
+                continue
+            face_sides[island_faces] = upper_side
+            split_any = True
+
+        if not split_any:
+            break
+
+        oversized_faces = np.isin(island_labels, oversized_islands)
+        new_seams = oversized_faces[first_faces] & (island_labels[first_faces] == island_labels[second_faces]) & (face_sides[first_faces] != face_sides[second_faces])
+        seam_mask[manifold_edges[new_seams]] = True
+
+    return mesh_analysis.get_face_islands(mesh, seam_mask, manifold_edge_faces)[1]
+
+def mark_seams(mesh, angle, max_island_faces=0, clear_existing=False):
+    '''Marks seams on all edges of the provided mesh sharper than the provided angle, then splits islands with more faces than the provided limit (if above 0). Returns the number of seams and islands.'''
+    seam_mask = np.zeros(len(mesh.edges), dtype=bool)
+    if not clear_existing:
+        mesh.edges.foreach_get("use_seam", seam_mask)
+
+    seam_mask |= internal_utils.get_edge_dihedral_angles(mesh) > angle
+
+    if max_island_faces > 0:
+        island_count = split_oversized_islands(mesh, seam_mask, max_island_faces)
+    else:
+        island_count = mesh_analysis.get_face_islands(mesh, seam_mask)[1]
+
+    mesh.edges.foreach_set("use_seam", seam_mask)
+    mesh.update()
+    return int(np.count_nonzero(seam_mask)), island_count
+
+def mark_seams_for_objects(objects, angle, max_island_faces=0, clear_existing=False):
+    '''Marks seams on all provided mesh objects, marking meshes shared by multiple objects only once. Returns the total number of seams and islands.'''
+    total_seams = 0
+    total_islands = 0
+    marked_meshes = set()
+    for obj in objects:
+        if obj.type != 'MESH' or obj.data in marked_meshes:
+            continue
+        marked_meshes.add(obj.data)
+
+        seam_count, island_count = mark_seams(obj.data, angle, max_island_faces, clear_existing)
+        rylog.log("Marked {0} seams on {1}, {2} uv islands.".format(seam_count, obj.name, island_count))
+        total_seams += seam_count
+        total_islands += island_count
+    return total_seams, total_islands
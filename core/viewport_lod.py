@@ -0,0 +1,177 @@
+# This module contains the viewport LOD manager, which swaps the mesh of objects with generated LODs to a lower detail LOD based on their largest projected size in the open 3D views. LOD0 is restored automatically for rendering, saving and exporting.
+
+import bpy
+from bpy.app.handlers import persistent
+import math
+import numpy as np
+from ..core import lod_tools
+
+LOD0_MESH_PROPERTY = "rymodel_lod0_mesh"
+DISABLED_MODIFIERS_PROPERTY = "rymodel_lod_disabled_modifiers"
+UPDATE_INTERVAL = 0.25
+VIEW_MATRIX_TOLERANCE = 0.001
+
+# The last view matrices (of all visible views) LODs were updated for, and whether LOD swapping is suspended (while rendering).
+_viewport_lod_state = {'view_matrix': None, 'suspended': False}
+
+def get_visible_regions_3d():
+    '''Returns the 3D regions of all 3D viewports in the open windows, including every view of viewports split into quad views.'''
+    regions_3d = []
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            space = area.spaces.active
+            regions_3d.append(space.region_3d)
+            regions_3d.extend(space.region_quadviews)
+    return regions_3d
+
+def get_screen_size(obj, region_3d):
+    '''Returns the approximate fraction of the half viewport height covered by the bounding sphere of the provided object.'''
+    matrix_world = np.array(obj.matrix_world)
+    corners = np.array(obj.bound_box) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+    center = corners.mean(axis=0)
+    radius = np.linalg.norm(corners - center, axis=1).max()
+
+    # The projection matrix scales view space by the inverse of the half view height (at a distance of 1 for perspective views).
+    projection_scale = region_3d.window_matrix[1][1]
+    if not region_3d.is_perspective:
+        return radius * projection_scale
+
+    view_location = np.array(region_3d.view_matrix.inverted().translation)
+    distance = max(np.linalg.norm(center - view_location), 1e-6)
+    return radius * projection_scale / distance
+
+def get_lod_index(screen_size, threshold, lod_count):
+    '''Returns the LOD to display for the provided screen size. LOD1 starts below the provided threshold, every further LOD starts at half the screen size of the previous one.'''
+    if screen_size >= threshold or lod_count == 0:
+        return 0
+    return min(int(math.log2(threshold / max(screen_size, 1e-9))) + 1, lod_count)
+
+def is_managed_object(obj):
+    '''Returns true if the provided object has generated LODs the viewport LOD manager can swap to.'''
+    return obj.type == 'MESH' and bool(obj.get(lod_tools.LOD_COLLECTION_PROPERTY))
+
+def restore_object_lod0(obj, lod0_mesh):
+    '''Displays the provided LOD0 mesh on the provided object again, re-enabling the modifiers disabled while a LOD was displayed.'''
+    obj.data = lod0_mesh
+    for modifier_name in obj.get(DISABLED_MODIFIERS_PROPERTY, []):
+        modifier = obj.modifiers.get(modifier_name)
+        if modifier:
+            modifier.show_viewport = True
+    del obj[LOD0_MESH_PROPERTY]
+    del obj[DISABLED_MODIFIERS_PROPERTY]
+
+def set_object_lod(obj, lod_index):
+    '''Displays the provided LOD of the provided object by swapping its mesh. Modifiers are disabled in the viewport while a LOD (which has modifiers applied) is displayed.'''
+    lod_objects = lod_tools.get_lod_objects(obj)
+    lod_meshes = [lod_object.data for lod_object in lod_objects]
+    lod0_mesh = obj.get(LOD0_MESH_PROPERTY)
+
+    # Objects duplicated while displaying a LOD with their mesh copied hold a copy of the LOD, not a LOD mesh. They get their own copy of LOD0 instead.
+    if lod0_mesh and obj.data != lod0_mesh and obj.data not in lod_meshes:
+        copied_mesh = obj.data
+        restore_object_lod0(obj, lod0_mesh.copy())
+        if copied_mesh.users == 0:
+            bpy.data.meshes.remove(copied_mesh)
+        lod0_mesh = None
+
+    lod0_mesh = lod0_mesh or obj.data
+    if lod_index == 0:
+        target_mesh = lod0_mesh
+    else:
+        if not lod_meshes:
+            return
+        target_mesh = lod_meshes[min(lod_index, len(lod_meshes)) - 1]
+
+    if obj.data == target_mesh:
+        return
+
+    if target_mesh == lod0_mesh:
+        restore_object_lod0(obj, lod0_mesh)
+        return
+
+    if LOD0_MESH_PROPERTY not in obj:
+        obj[LOD0_MESH_PROPERTY] = obj.data
+        disabled_modifiers = [modifier.name for modifier in obj.modifiers if modifier.show_viewport]
+        for modifier_name in disabled_modifiers:
+            obj.modifiers[modifier_name].show_viewport = False
+        obj[DISABLED_MODIFIERS_PROPERTY] = disabled_modifiers
+    obj.data = target_mesh
+
+def restore_all_lods():
+    '''Displays LOD0 for all objects which currently display a lower detail LOD. The next viewport LOD update swaps LODs again.'''
+    for obj in bpy.data.objects:
+        if LOD0_MESH_PROPERTY in obj:
+            set_object_lod(obj, 0)
+    _viewport_lod_state['view_matrix'] = None
+
+def update_object_lods(regions_3d, threshold):
+    '''Swaps all managed objects in the view layer to the LOD matching their largest screen size in the provided 3D regions, so no visible view displays a LOD that is too coarse for it. Selected objects and objects being edited always display LOD0.'''
+    for obj in bpy.context.view_layer.objects:
+        if not is_managed_object(obj):
+            continue
+        if obj.mode != 'OBJECT' or obj.select_get():
+            set_object_lod(obj, 0)
+            continue
+        lod_count = len(lod_tools.get_lod_objects(obj))
+        screen_size = max(get_screen_size(obj, region_3d) for region_3d in regions_3d)
+        set_object_lod(obj, get_lod_index(screen_size, threshold, lod_count))
+
+def update_viewport_lods():
+    '''Timer which updates viewport LODs when the view changed meaningfully since the last update. Stops (restoring LOD0) when viewport LODs are turned off.'''
+    scene = bpy.context.scene
+    if not scene or not scene.rymodel_viewport_lods:
+        restore_all_lods()
+        return None
+
+    if _viewport_lod_state['suspended']:
+        return UPDATE_INTERVAL
+
+    regions_3d = get_visible_regions_3d()
+    if not regions_3d:
+        return UPDATE_INTERVAL
+
+    # The view matrices of all visible views are compared, so moving any of them (or opening and closing views) updates LODs.
+    view_matrix = np.array([region_3d.perspective_matrix for region_3d in regions_3d])
+    last_view_matrix = _viewport_lod_state['view_matrix']
+    if last_view_matrix is not None and last_view_matrix.shape == view_matrix.shape and np.abs(view_matrix - last_view_matrix).max() < VIEW_MATRIX_TOLERANCE:
+        return UPDATE_INTERVAL
+
+    _viewport_lod_state['view_matrix'] = view_matrix
+    update_object_lods(regions_3d, scene.rymodel_viewport_lod_threshold)
+    return UPDATE_INTERVAL
+
+def start_viewport_lods():
+    '''Starts the viewport LOD update timer if it isn't running.'''
+    _viewport_lod_state['view_matrix'] = None
+    if not bpy.app.timers.is_registered(update_viewport_lods):
+        bpy.app.timers.register(update_viewport_lods, first_interval=UPDATE_INTERVAL, persistent=True)
+
+def update_viewport_lod_toggle(self, context):
+    '''Starts or stops viewport LOD swapping when the viewport LOD toggle changes.'''
+    if context.scene.rymodel_viewport_lods:
+        start_viewport_lods()
+    else:
+        restore_all_lods()
+
+def update_viewport_lod_threshold(self, context):
+    '''Forces a viewport LOD update when the LOD screen size threshold changes.'''
+    _viewport_lod_state['view_matrix'] = None
+
+@persistent
+def suspend_viewport_lods(*args):
+    '''Restores LOD0 for all objects and pauses viewport LOD swapping (before rendering).'''
+    _viewport_lod_state['suspended'] = True
+    restore_all_lods()
+
+@persistent
+def resume_viewport_lods(*args):
+    '''Resumes viewport LOD swapping (after rendering).'''
+    _viewport_lod_state['suspended'] = False
+    _viewport_lod_state['view_matrix'] = None
+
+@persistent
+def restore_lods_before_saving(*args):
+    '''Restores LOD0 for all objects so blend files are always saved with full detail meshes.'''
+    restore_all_lods()
@@ -0,0 +1,34 @@
+# This script runs inside a background Blender process. It loads a single mesh from an input blend file, creates a decimated copy of it for every provided ratio, and writes the decimated meshes to an output blend file.
+# Usage: blender --background --factory-startup --python decimate_worker.py -- <input.blend> <output.blend> <ratio,ratio,...>
+
+import bpy
+import sys
+
+def main():
+    arguments = sys.argv[sys.argv.index("--") + 1:]
+    input_path, output_path = arguments[0], arguments[1]
+    ratios = [float(ratio) for ratio in arguments[2].split(",")]
+
+    with bpy.data.libraries.load(input_path) as (data_from, data_to):
+        data_to.meshes = data_from.meshes[:1]
+    source_mesh = data_to.meshes[0]
+
+    source_object = bpy.data.objects.new("LODSource", source_mesh)
+    bpy.context.scene.collection.objects.link(source_object)
+    decimate_modifier = source_object.modifiers.new("LODDecimate", 'DECIMATE')
+
+    lod_meshes = set()
+    for lod_index, ratio in enumerate(ratios):
+        decimate_modifier.ratio = ratio
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        depsgraph.update()
+        lod_mesh = bpy.data.meshes.new_from_object(source_object.evaluated_get(depsgraph))
+        lod_mesh.name = "LOD{0}".format(lod_index + 1)
+
+        # Materials are re-assigned from the source object when the meshes are loaded back, don't write copies of them.
+        lod_mesh.materials.clear()
+        lod_meshes.add(lod_mesh)
+
+    bpy.data.libraries.write(output_path, lod_meshes, fake_user=True)
+
+main()
@@ -0,0 +1,38 @@
+# This script runs inside a background Blender process opened with the blend file to export from. It exports each provided object to its own file with the add-on's export templates, and writes a report of exported files and errors.
+# Usage: blender --background --factory-startup <file.blend> --python export_worker.py -- <add-on folder> <template> <export directory> <objects.json> <report.json>
+
+import bpy
+import importlib
+import json
+import os
+import sys
+import traceback
+
+def main():
+    arguments = sys.argv[sys.argv.index("--") + 1:]
+    addon_folder, template_name, directory, objects_path, report_path = arguments[:5]
+
+    # The add-on isn't enabled in worker processes, its export templates are imported directly from its folder.
+    sys.path.insert(0, os.path.dirname(addon_folder))
+    exporting_tools = importlib.import_module(os.path.basename(addon_folder) + ".core.exporting_tools")
+
+    with open(objects_path, 'r') as objects_file:
+        object_names = json.load(objects_file)
+
+    report = {}
+    for object_name in object_names:
+        obj = bpy.data.objects.get(object_name)
+        if not obj:
+            report[object_name] = {'error': "Object not found in the exported blend file."}
+            continue
+
+        try:
+            export_filepath = exporting_tools.export_atomically(template_name, os.path.join(directory, object_name), None, [obj])
+            report[object_name] = {'filepath': export_filepath, 'error': None}
+        except Exception:
+            report[object_name] = {'error': traceback.format_exc()}
+
+    with open(report_path, 'w') as report_file:
+        json.dump(report, report_file)
+
+main()
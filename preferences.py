@@ -2,7 +2,7 @@
 
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import StringProperty, BoolProperty, EnumProperty, FloatProperty
+from bpy.props import StringProperty, BoolProperty, EnumProperty, FloatProperty, IntProperty
 
 ADDON_NAME = __package__
 
@@ -33,6 +33,12 @@ class AddonPreferences(AddonPreferences):
         description="Hides booleans in the modifier stack"
     )
 
+    use_volume_center: BoolProperty(
+        name="Use Volume Center",
+        default=False,
+        description="When true, the true center of objects (used for placing new booleans and setting origins) is the centroid of their enclosed volume instead of the average of their vertices. The vertex average is biased toward densely modeled areas"
+    )
+
     export_template: EnumProperty(
         items=EXPORTING_TEMPLATE,
         default='FBX',
@@ -45,6 +51,20 @@ class AddonPreferences(AddonPreferences):
         description="If true, all selected objects will be exported as individual files when using the export button in this add-on"
     )
 
+    export_in_parallel: BoolProperty(
+        name="Export In Parallel",
+        default=False,
+        description="If true, objects exported as individual files are split between multiple background Blender processes which export at the same time. Unsaved changes are written to a temporary copy of the blend file for the background processes to read"
+    )
+
+    export_workers: IntProperty(
+        name="Export Workers",
+        default=0,
+        min=0,
+        soft_max=64,
+        description="Maximum number of background Blender processes used when exporting in parallel. 0 uses all cores but one"
+    )
+
     def draw(self, context):
         layout = self.layout
         #layout.prop(self, "auto_delete_unused_images")
\ No newline at end of file
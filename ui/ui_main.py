@@ -6,6 +6,7 @@ from bpy.utils import resource_path
 from bpy.types import Operator, Menu
 from bpy.props import StringProperty
 from ..core import modifiers
+from ..core import mesh_analysis
 from .. import preferences
 from pathlib import Path
 import os
@@ -35,8 +36,11 @@ class MirrorSubMenu(Menu):
                 layout.prop(mirror_modifier, "use_bisect_flip_axis", text="Flip Bisect X", index=0, toggle=True)
                 layout.prop(mirror_modifier, "use_bisect_flip_axis", text="Flip Bisect Y", index=1, toggle=True)
                 layout.prop(mirror_modifier, "use_bisect_flip_axis", text="Flip Bisect Z", index=2, toggle=True)
+                layout.operator("rymodel.bake_mirror", text="Bake Mirror")
             else:
                 layout.label(text="No mirror modifier applied.")
+            layout.operator("rymodel.select_asymmetric_vertices", text="Select Asymmetric Vertices")
+            layout.operator("rymodel.symmetrize_positions", text="Symmetrize Positions")
 
 def load_custom_icons():
     global custom_icons
@@ -78,6 +82,58 @@ def draw_mesh_fix_tools(layout):
     row.operator("rymodel.auto_smooth", text="Smooth")
     row.operator("rymodel.auto_sharpen", text="Sharpen")
     row.prop(bpy.context.scene, "auto_sharpen_angle", text="", slider=False)
+    row.prop(bpy.context.scene, "auto_sharpen_live_preview", text="", icon='HIDE_OFF')
+
+    row = second_column.row(align=True)
+    row.scale_y = UI_Y_SCALE
+    row.operator("rymodel.dedupe_meshes", text="Dedupe Meshes")
+
+def draw_mesh_health(layout, mesh_object):
+    '''Draws the last computed mesh health of the provided mesh object, with warnings and one-click fixes. Health is computed by a background timer, never while drawing.'''
+    health, is_current = mesh_analysis.get_mesh_health(mesh_object)
+    if health is None:
+        row = layout.row(align=True)
+        row.scale_y = UI_Y_SCALE
+        row.label(text="Checking mesh health...", icon='TIME')
+    else:
+        row = layout.row(align=True)
+        row.scale_y = UI_Y_SCALE
+        row.active = is_current
+        row.label(text="Tris: {0}".format(health['tris']))
+        row.label(text="Quads: {0}".format(health['quads']))
+        row.operator("rymodel.select_ngons", text="Ngons: {0}".format(health['ngons']), emboss=health['ngons'] > 0)
+
+        if health['non_manifold_edges'] > 0:
+            row = layout.row(align=True)
+            row.scale_y = UI_Y_SCALE
+            row.active = is_current
+            row.label(text="Non-Manifold Edges: {0}".format(health['non_manifold_edges']), icon='ERROR')
+            row.operator("rymodel.fill_non_manifold", text="Fill Holes")
+
+        if health['loose_verts'] > 0:
+            row = layout.row(align=True)
+            row.scale_y = UI_Y_SCALE
+            row.active = is_current
+            row.label(text="Loose Verts: {0}".format(health['loose_verts']), icon='ERROR')
+            operator = row.operator("rymodel.clean_mesh", text="Remove")
+            operator.active_only = True
+            operator.loose_verts_only = True
+            operator.apply_transform = False
+            operator.merge_by_distance = False
+            operator.remove_degenerate = False
+            operator.recalculate_normals = False
+
+    if mesh_analysis.has_unapplied_scale(mesh_object):
+        row = layout.row(align=True)
+        row.scale_y = UI_Y_SCALE
+        row.label(text="Unapplied Scale", icon='ERROR')
+        operator = row.operator("rymodel.clean_mesh", text="Apply")
+        operator.active_only = True
+        operator.apply_rotation = False
+        operator.merge_by_distance = False
+        operator.remove_degenerate = False
+        operator.remove_loose = False
+        operator.recalculate_normals = False
 
 def draw_contextual_object_menu(layout):
     '''Draws frequently used settings based on context.'''
@@ -85,6 +141,7 @@ def draw_contextual_object_menu(layout):
     match active_object.type:
         case 'MESH':
             draw_mesh_fix_tools(layout)
+            draw_mesh_health(layout, active_object)
             draw_boolean_tools(layout)
 
             boolean_mod = modifiers.get_modifier_of_type(active_object.modifiers, 'BOOLEAN')
@@ -199,6 +256,7 @@ def draw_boolean_tools(layout):
     row.operator("rymodel.add_cube_boolean", icon='MESH_CUBE', text="")
     row.operator("rymodel.add_cylinder_boolean", icon='MESH_CYLINDER', text="")
     row.operator("rymodel.selected_object_to_boolean", icon='SELECT_SET', text="")
+    row.operator("rymodel.draw_shape", text="", icon_value=custom_icons["NGON_DRAW"].icon_id)
     
     #row.prop_menu_enum(bpy.context.scene, "rymodel_boolean_mode", text='')
 
@@ -217,6 +275,8 @@ def draw_origin_tools(layout):
     row.operator("rymodel.set_origin_world_center", text="", icon='WORLD')
     row.operator("rymodel.set_origin_selected", text="", icon='SELECT_INTERSECT')
     row.operator("rymodel.set_origin_center", text="", icon='ANCHOR_CENTER')
+    addon_preferences = bpy.context.preferences.addons[preferences.ADDON_NAME].preferences
+    row.prop(addon_preferences, "use_volume_center", text="", icon='MESH_ICOSPHERE')
 
 def draw_retopology_tools(layout):
     split = layout.split(factor=0.25)
@@ -252,6 +312,11 @@ def draw_lod_options(layout):
     row.scale_x = 4
     row.scale_y = UI_Y_SCALE
     row.operator("rymodel.auto_generate_lods", text="Auto Generate LOD")
+    row.prop(bpy.context.scene, "rymodel_viewport_lods", text="", icon='VIEW_CAMERA')
+    if bpy.context.scene.rymodel_viewport_lods:
+        row = second_column.row(align=True)
+        row.scale_y = UI_Y_SCALE
+        row.prop(bpy.context.scene, "rymodel_viewport_lod_threshold", slider=True)
 
 def draw_exporting_options(layout):
     addon_preferences = bpy.context.preferences.addons[preferences.ADDON_NAME].preferences
@@ -272,6 +337,12 @@ def draw_exporting_options(layout):
     row.prop(addon_preferences, "export_selected_objects_individually", text="", icon_value=custom_icons["INDIVIDUAL_OBJECTS"].icon_id)
     row.prop(addon_preferences, "export_template", text="")
 
+    if addon_preferences.export_selected_objects_individually:
+        row = second_column.row(align=True)
+        row.scale_y = UI_Y_SCALE
+        row.prop(addon_preferences, "export_in_parallel", text="Parallel", icon='SYSTEM')
+        row.prop(addon_preferences, "export_workers", text="Workers")
+
 def draw_unwrapping_tools(layout):
     split = layout.split(factor=0.25)
     first_column = split.column()
@@ -286,6 +357,8 @@ def draw_unwrapping_tools(layout):
     row.scale_y = UI_Y_SCALE
     row.operator("rymodel.auto_seam", text="Auto Seam")
     row.operator("rymodel.color_grid", text="Color Grid")
+    op = row.operator("rymodel.color_grid", text="", icon='TEXTURE')
+    op.procedural = True
 
 def draw_backup_options(layout):
     '''Draws operators for backing up asset data.'''
@@ -553,6 +626,8 @@ def draw_modifiers(layout):
     row.prop(addon_preferences, "hide_booleans", icon='MOD_BOOLEAN', text="")
     row.operator("rymodel.copy_modifiers", icon='COPYDOWN', text="")
     row.operator("rymodel.hswf_mod_apply", text="Apply All")
+    row.operator("rymodel.bake_weighted_normals", icon='NORMALS_VERTEX_FACE', text="")
+    row.operator("rymodel.bake_smoothing", icon='SMOOTHCURVE', text="")
 
     draw_modifier_properties(layout)
 